@@ -5,6 +5,11 @@
 
 import os
 import sys
+import json
+import shutil
+import functools
+import threading
+import time
 import importlib
 import logging
 from typing import Dict, List, Type, Optional, Any
@@ -15,6 +20,17 @@ from config.config_manager import config_manager
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _which(tool: str, search_path: str) -> Optional[str]:
+    """在 PATH 中查找工具，結果依 (工具, PATH) 快取，PATH 變更時自然失效"""
+    return shutil.which(tool, path=search_path)
+
+
+def _tool_in_path(tool: str) -> bool:
+    """檢查工具是否存在於目前的 PATH 中"""
+    return _which(tool, os.environ.get('PATH', os.defpath)) is not None
+
+
 class PluginInterface(ABC):
     """插件接口基類 - 所有插件必須實現此接口"""
     
@@ -81,28 +97,140 @@ class PluginInterface(ABC):
     
     def _check_tool_availability(self, tool: str) -> bool:
         """檢查單個工具是否可用"""
-        try:
-            import subprocess
-            result = subprocess.run([tool, '--help'], 
-                                  capture_output=True, 
-                                  timeout=5)
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
-            return False
+        return _tool_in_path(tool)
+
+
+class PluginProxy(PluginInterface):
+    """
+    以 manifest.json 描述的插件代理
+    發現階段只讀取中繼資料，直到真正需要插件功能時才導入插件模組
+    """
+    
+    MANIFEST_NAME = "manifest.json"
+    
+    def __init__(self, manifest: Dict[str, Any]):
+        self._manifest = manifest
+        self._target: Optional[PluginInterface] = None
+        # 多個執行緒同時首次使用插件時，只導入並建立一次實際插件
+        self._load_lock = threading.Lock()
+    
+    @classmethod
+    def from_manifest_file(cls, manifest_path: Path) -> 'PluginProxy':
+        """從 manifest.json 建立插件代理"""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def _load(self) -> PluginInterface:
+        """導入插件模組並建立實際的插件實例（只執行一次）"""
+        if self._target is None:
+            with self._load_lock:
+                if self._target is None:
+                    module = importlib.import_module(self._manifest['entry_module'])
+                    if hasattr(module, 'create_plugin'):
+                        self._target = module.create_plugin()
+                    else:
+                        self._target = getattr(module, self._manifest['entry_class'])()
+                    logger.debug(f"Loaded plugin implementation: {self._manifest['entry_module']}")
+        return self._target
+    
+    @property
+    def is_loaded(self) -> bool:
+        """插件模組是否已導入"""
+        return self._target is not None
+    
+    @property
+    def manifest_version(self) -> Optional[str]:
+        """manifest 宣告的版本，未宣告時為 None（讀取時不導入插件）"""
+        return self._manifest.get('version')
+    
+    def _metadata(self, key: str):
+        """優先讀取 manifest，缺少的欄位（例如動態偵測的版本）交由實際插件提供"""
+        if key in self._manifest:
+            return self._manifest[key]
+        return getattr(self._load(), key)
+    
+    @property
+    def name(self) -> str:
+        return self._metadata('name')
+    
+    @property
+    def display_name(self) -> str:
+        return self._metadata('display_name')
+    
+    @property
+    def description(self) -> str:
+        return self._metadata('description')
+    
+    @property
+    def version(self) -> str:
+        return self._metadata('version')
+    
+    @property
+    def required_tools(self) -> List[str]:
+        return list(self._metadata('required_tools'))
+    
+    def is_available(self) -> bool:
+        """
+        所需工具都在 PATH 中即為可用；否則交由插件自行檢查（可能使用設定的執行檔路徑）
+        
+        不論插件是否已導入都套用同一規則，可用性不會因載入狀態而改變
+        """
+        if all(_tool_in_path(tool) for tool in self.required_tools):
+            return True
+        return self._load().is_available()
+    
+    def check_tools_availability(self) -> bool:
+        return self._load().check_tools_availability()
+    
+    def initialize(self) -> bool:
+        return self._load().initialize()
+    
+    def create_view(self, *args, **kwargs):
+        return self._load().create_view(*args, **kwargs)
+    
+    def create_model(self, *args, **kwargs):
+        return self._load().create_model(*args, **kwargs)
+    
+    def create_controller(self, model, view, *args, **kwargs):
+        return self._load().create_controller(model, view, *args, **kwargs)
+    
+    def cleanup(self):
+        if self.is_loaded:
+            self._target.cleanup()
+    
+    def __getattr__(self, attr):
+        # 其餘插件專屬方法（get_widget、execute_command 等）轉交實際插件
+        if attr.startswith('__') or attr in ('_manifest', '_target', '_load_lock'):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
 
 
 class PluginManager:
     """插件管理器 - 負責插件的載入、管理和協調"""
     
+    # 可用插件快取的有效期（秒），過期後重新檢查，之後安裝或移除的工具不必重啟即可反映
+    AVAILABLE_CACHE_TTL = 30.0
+    
     def __init__(self):
         self.plugins: Dict[str, PluginInterface] = {}
         self.plugin_instances: Dict[str, Dict[str, Any]] = {}
         self._initialized = False
+        # 插件發現結果快取，以插件目錄的修改時間作為失效依據
+        self._discovery_cache: Optional[Dict[str, PluginInterface]] = None
+        self._cache_sig: Optional[tuple] = None
+        # 保護插件表：發現可能在背景執行緒進行，註冊、載入與查詢可用插件時都需持有；
+        # 可重入，讓發現過程中呼叫 register_plugin
+        self._plugins_lock = threading.RLock()
+        # 可用插件快取，插件註冊或移除時失效，超過有效期也會重新檢查
+        self._available_cache: Optional[Dict[str, PluginInterface]] = None
+        self._available_cache_time = 0.0
         
-    def initialize(self):
-        """初始化插件管理器"""
-        if self._initialized:
+    def initialize(self, force: bool = False):
+        """初始化插件管理器，已初始化時直接返回；force=True 時清除現有插件並重新發現"""
+        if self._initialized and not force:
             return
+        if force:
+            self.cleanup()
             
         logger.info("Initializing Plugin Manager...")
         self.discover_plugins()
@@ -110,29 +238,59 @@ class PluginManager:
         self._initialized = True
         logger.info(f"Plugin Manager initialized with {len(self.plugins)} plugins")
     
+    def ensure_initialized(self) -> 'PluginManager':
+        """確保插件管理器已初始化，重複呼叫不會重新掃描插件目錄"""
+        if not self._initialized:
+            self.initialize()
+        return self
+    
+    def _reset_for_tests(self):
+        """重置管理器狀態，讓下一次 ensure_initialized() 重新發現插件（僅供測試使用）"""
+        self.cleanup()
+    
+    def _plugin_dirs(self) -> List[Path]:
+        """取得所有存在的插件搜尋目錄"""
+        dirs = [config_manager.get_resource_path("tools")]
+        dirs.extend(Path(path) for path in config_manager.get('plugins.extra_paths', []))
+        return [directory for directory in dirs if directory.exists()]
+    
     def discover_plugins(self) -> List[str]:
-        """自動發現可用的插件"""
-        logger.info("Discovering plugins...")
-        
-        # 從 tools 目錄載入插件
-        tools_dir = config_manager.get_resource_path("tools")
-        if tools_dir.exists():
-            self._discover_plugins_in_directory(tools_dir)
-        
-        # 從配置中載入額外的插件路徑
-        extra_plugin_paths = config_manager.get('plugins.extra_paths', [])
-        for path in extra_plugin_paths:
-            plugin_path = Path(path)
-            if plugin_path.exists():
-                self._discover_plugins_in_directory(plugin_path)
-        
-        # 返回已發現的插件名稱列表
-        return list(self.plugins.keys())
+        """自動發現可用的插件（插件目錄未變更時直接重用上次的結果）"""
+        with self._plugins_lock:
+            plugin_dirs = self._plugin_dirs()
+            sig = tuple((str(directory), directory.stat().st_mtime_ns) for directory in plugin_dirs)
+            
+            if self._discovery_cache is not None and sig == self._cache_sig:
+                logger.debug("Plugin directories unchanged, reusing discovery cache")
+                # 在 load_plugins 中因載入失敗而移除的插件維持移除，不從快取補回
+                return list(self.plugins.keys())
+            
+            logger.info("Discovering plugins...")
+            
+            # 從 tools 目錄及配置中的額外插件路徑載入插件
+            for directory in plugin_dirs:
+                self._discover_plugins_in_directory(directory)
+            
+            self._discovery_cache = dict(self.plugins)
+            self._cache_sig = sig
+            
+            # 返回已發現的插件名稱列表
+            return list(self.plugins.keys())
     
     def _discover_plugins_in_directory(self, directory: Path):
-        """在指定目錄中發現插件"""
+        """在指定目錄中發現插件（有 manifest.json 的插件不會在此階段導入）"""
         for item in directory.iterdir():
             if item.is_dir() and not item.name.startswith('_'):
+                manifest_path = item / PluginProxy.MANIFEST_NAME
+                if manifest_path.exists():
+                    try:
+                        plugin = PluginProxy.from_manifest_file(manifest_path)
+                        self.register_plugin(plugin)
+                        logger.info(f"Discovered plugin: {plugin.name} (manifest)")
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Invalid plugin manifest {manifest_path}, falling back to import: {e}")
+                
                 plugin_module_path = f"tools.{item.name}.plugin"
                 try:
                     module = importlib.import_module(plugin_module_path)
@@ -150,39 +308,48 @@ class PluginManager:
     
     def register_plugin(self, plugin: PluginInterface):
         """註冊插件"""
-        if plugin.name in self.plugins:
-            logger.warning(f"Plugin '{plugin.name}' already registered, replacing...")
-        
-        self.plugins[plugin.name] = plugin
-        logger.info(f"Registered plugin: {plugin.name} v{plugin.version}")
+        with self._plugins_lock:
+            if plugin.name in self.plugins:
+                logger.warning(f"Plugin '{plugin.name}' already registered, replacing...")
+            
+            self.plugins[plugin.name] = plugin
+            self._available_cache = None
+        # manifest 未宣告版本的代理插件需導入模組才能取得版本，記錄日誌時不為此觸發導入
+        if isinstance(plugin, PluginProxy) and not plugin.is_loaded:
+            version = plugin.manifest_version or '?'
+        else:
+            version = plugin.version
+        logger.info(f"Registered plugin: {plugin.name} v{version}")
     
     def load_plugins(self):
         """載入和初始化所有插件（不創建 UI 視圖）"""
         logger.info("Loading plugins...")
         
-        failed_plugins = []
-        for name, plugin in self.plugins.items():
-            try:
-                if plugin.is_available():
-                    if plugin.initialize():
-                        # 只創建插件實例記錄，不創建 UI 組件
-                        # UI 組件將在主線程中創建
-                        logger.info(f"Successfully initialized plugin: {name}")
+        with self._plugins_lock:
+            failed_plugins = []
+            for name, plugin in self.plugins.items():
+                try:
+                    if plugin.is_available():
+                        if plugin.initialize():
+                            # 只創建插件實例記錄，不創建 UI 組件
+                            # UI 組件將在主線程中創建
+                            logger.info(f"Successfully initialized plugin: {name}")
+                        else:
+                            failed_plugins.append(name)
+                            logger.error(f"Failed to initialize plugin: {name}")
                     else:
                         failed_plugins.append(name)
-                        logger.error(f"Failed to initialize plugin: {name}")
-                else:
+                        logger.warning(f"Plugin '{name}' not available (missing required tools)")
+                        
+                except Exception as e:
                     failed_plugins.append(name)
-                    logger.warning(f"Plugin '{name}' not available (missing required tools)")
-                    
-            except Exception as e:
-                failed_plugins.append(name)
-                logger.error(f"Error loading plugin '{name}': {e}")
-        
-        # 移除載入失敗的插件
-        for name in failed_plugins:
-            if name in self.plugins:
-                del self.plugins[name]
+                    logger.error(f"Error loading plugin '{name}': {e}")
+            
+            # 移除載入失敗的插件
+            for name in failed_plugins:
+                if name in self.plugins:
+                    del self.plugins[name]
+            self._available_cache = None
     
     def get_plugin(self, name: str) -> Optional[PluginInterface]:
         """獲取指定的插件"""
@@ -194,12 +361,19 @@ class PluginManager:
     
     def get_all_plugins(self) -> Dict[str, PluginInterface]:
         """獲取所有已註冊的插件"""
-        return self.plugins.copy()
+        with self._plugins_lock:
+            return self.plugins.copy()
     
     def get_available_plugins(self) -> Dict[str, PluginInterface]:
-        """獲取所有可用的插件"""
-        return {name: plugin for name, plugin in self.plugins.items() 
-                if plugin.is_available()}
+        """獲取所有可用的插件（結果會快取到插件清單變更或超過有效期為止）"""
+        with self._plugins_lock:
+            now = time.monotonic()
+            if (self._available_cache is None
+                    or now - self._available_cache_time >= self.AVAILABLE_CACHE_TTL):
+                self._available_cache = {name: plugin for name, plugin in self.plugins.items()
+                                         if plugin.is_available()}
+                self._available_cache_time = now
+            return self._available_cache.copy()
     
     def get_plugin_views(self) -> Dict[str, Any]:
         """獲取所有插件的視圖，用於添加到主界面"""
@@ -211,16 +385,20 @@ class PluginManager:
     def cleanup(self):
         """清理所有插件資源"""
         logger.info("Cleaning up plugins...")
-        for name, plugin in self.plugins.items():
-            try:
-                plugin.cleanup()
-                logger.debug(f"Cleaned up plugin: {name}")
-            except Exception as e:
-                logger.error(f"Error cleaning up plugin '{name}': {e}")
-        
-        self.plugins.clear()
-        self.plugin_instances.clear()
-        self._initialized = False
+        with self._plugins_lock:
+            for name, plugin in self.plugins.items():
+                try:
+                    plugin.cleanup()
+                    logger.debug(f"Cleaned up plugin: {name}")
+                except Exception as e:
+                    logger.error(f"Error cleaning up plugin '{name}': {e}")
+            
+            self.plugins.clear()
+            self.plugin_instances.clear()
+            self._discovery_cache = None
+            self._cache_sig = None
+            self._available_cache = None
+            self._initialized = False
 
 
 # 全域插件管理器實例
@@ -0,0 +1,87 @@
+"""
+pytest 共用設定
+將專案根目錄加入匯入路徑，並在任何 PyQt5 導入之前設定無頭顯示平台，讓測試可在 pytest-xdist 多個 worker 上並行執行
+"""
+
+import gc
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 專案根目錄只加入一次，測試模組各自的插入會因已存在而略過
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# 必須在導入 PyQt5 之前設定，否則 QApplication 會嘗試連接實體顯示器
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def pytest_configure(config):
+    """註冊自訂標記（未安裝 pytest-xdist 時也不會產生 unknown marker 警告）"""
+    config.addinivalue_line(
+        "markers",
+        "xdist_group(name): 需要共用同一個 worker 的測試群組（搭配 --dist loadgroup）",
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def discovered_plugins():
+    """整個測試階段只掃描一次插件目錄，之後的 discover_plugins() 直接命中快取"""
+    from core.plugin_manager import plugin_manager
+    return plugin_manager.discover_plugins()
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """整個測試階段共用同一個 QApplication，避免每個測試重複初始化 Qt 平台插件"""
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture(scope="session")
+def initialized_plugin_manager(discovered_plugins):
+    """整個測試階段共用已初始化的插件管理器，已完成的探索與載入不會重做"""
+    from core.plugin_manager import plugin_manager
+    return plugin_manager.ensure_initialized()
+
+
+@pytest.fixture(autouse=True)
+def _qt_gc():
+    """每個測試結束後處理延遲刪除事件並回收，確保 deleteLater() 的 Qt 物件真正被釋放"""
+    yield
+    if "PyQt5.QtWidgets" not in sys.modules:
+        return
+    from PyQt5.QtCore import QEvent
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance()
+    if app is None:
+        return
+    app.processEvents()
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+
+
+@pytest.fixture(autouse=True)
+def _no_bat_warm_up(monkeypatch):
+    """建立 BatModel 時不在背景執行真正的 bat 預熱，避免其 subprocess 呼叫混入其他測試的替身"""
+    if "tools.bat.bat_model" not in sys.modules:
+        return
+    monkeypatch.setattr(sys.modules["tools.bat.bat_model"], "_warm_up_bat", lambda executable_path: None)
+
+
+@pytest.fixture(scope="session")
+def csvkit_model():
+    """整個測試階段共用的 CsvkitModel，工具可用性檢查只執行一次"""
+    from tools.csvkit.csvkit_model import CsvkitModel
+    return CsvkitModel()
+
+
+@pytest.fixture(scope="session")
+def csvkit_controller(qapp, csvkit_model):
+    """整個測試階段共用的 CsvkitController，沿用同一個模型"""
+    from tools.csvkit.csvkit_controller import CsvkitController
+    return CsvkitController(model=csvkit_model)
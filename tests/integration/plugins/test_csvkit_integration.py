@@ -11,13 +11,12 @@ import csv
 from pathlib import Path
 
 # 添加專案根目錄到 Python 路徑
-project_root = Path(__file__).parent / "../../.."
-sys.path.insert(0, str(project_root))
+project_root = str((Path(__file__).parent / "../../..").resolve())
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
-from tools.csvkit.csvkit_controller import CsvkitController
-from tools.csvkit.csvkit_model import CsvkitModel
+# 在導入 PyQt5 之前設置環境變數（可由外部覆寫以顯示實體視窗）
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
 
 
 def create_sample_csv():
@@ -46,6 +45,8 @@ def test_csvkit_model():
     """測試 csvkit 模型"""
     print("\n=== Testing csvkit Model ===")
     
+    from tools.csvkit.csvkit_model import CsvkitModel
+    
     model = CsvkitModel()
     print(f"csvkit available: {model.csvkit_available}")
     print(f"Available tools: {len(model.available_tools)}")
@@ -80,6 +81,10 @@ def test_csvkit_controller():
     """測試 csvkit 控制器和視圖"""
     print("\n=== Testing csvkit Controller and View ===")
     
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from tools.csvkit.csvkit_controller import CsvkitController
+    
     app = QApplication.instance()
     if app is None:
         app = QApplication(sys.argv)
@@ -118,7 +123,7 @@ def test_plugin_integration():
     from core.plugin_manager import plugin_manager
     
     # 初始化插件管理器
-    plugin_manager.initialize()
+    plugin_manager.ensure_initialized()
     
     # 檢查 csvkit 插件
     plugins = plugin_manager.get_all_plugins()
@@ -140,6 +145,11 @@ def test_plugin_integration():
             print(f"View created: {view is not None}")
             print(f"Controller created: {controller is not None}")
             
+            # 重複呼叫應重用同一組 MVC 實例
+            assert csvkit_plugin.create_model() is model
+            assert csvkit_plugin.create_view() is view
+            assert csvkit_plugin.create_controller(model, view) is controller
+            
             return True
             
         except Exception as e:
@@ -152,8 +162,9 @@ def test_plugin_integration():
 
 def main():
     """主測試函數"""
-    print("csvkit Plugin Integration Test")
-    print("=" * 50)
+    show_banner = not os.environ.get("PYTEST_CURRENT_TEST")
+    if show_banner:
+        sys.stdout.write(f"csvkit Plugin Integration Test\n{'=' * 50}\n")
     
     # 測試模型
     model = test_csvkit_model()
@@ -165,12 +176,16 @@ def main():
     if model.csvkit_available and plugin_success:
         test_csvkit_controller()
     
-    print("\n" + "=" * 50)
-    print("Test completed!")
+    if not show_banner:
+        return
+    
+    sys.stdout.write(f"\n{'=' * 50}\nTest completed!\n")
     
     if model.csvkit_available and plugin_success:
-        print("✅ csvkit plugin integration successful!")
-        print("✅ All components working correctly")
+        sys.stdout.write(
+            "✅ csvkit plugin integration successful!\n"
+            "✅ All components working correctly\n"
+        )
     else:
         print("❌ Some issues found:")
         if not model.csvkit_available:
@@ -180,4 +195,7 @@ def main():
 
 
 if __name__ == "__main__":
+    if sys.platform == "win32":
+        # 一次性設定輸出編碼，避免 cp950/cp1252 主控台逐字元編碼失敗
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
     main()
\ No newline at end of file
@@ -7,14 +7,15 @@ import sys
 import os
 
 # 添加專案根目錄到 Python 路徑
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
-
-from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget, QTextBrowser, QPushButton, QTextEdit
-from PyQt5.QtCore import Qt
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 def test_glow_integration():
     """測試 Glow 集成效果"""
     
+    from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget, QTextBrowser, QPushButton, QTextEdit
+    
     app = QApplication(sys.argv)
     
     # 創建測試窗口
@@ -5,7 +5,24 @@
 
 import sys
 import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+import time
+import logging
+
+import pytest
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 在導入 PyQt5 之前設置環境變數（可由外部覆寫以顯示實體視窗）
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+logger = logging.getLogger(__name__)
+
+def _bat_available() -> bool:
+    """bat 插件所需工具是否可用（沿用插件自己的檢查，包含設定的執行檔路徑）"""
+    from tools.bat.plugin import create_plugin
+    return create_plugin().check_tools_availability()
 
 def test_plugin_discovery():
     """測試插件發現功能"""
@@ -14,122 +31,107 @@ def test_plugin_discovery():
     from core.plugin_manager import plugin_manager
     
     # 初始化插件管理器
-    plugin_manager.initialize()
+    plugin_manager.ensure_initialized()
     
     # 檢查可用插件
     available_plugins = plugin_manager.get_available_plugins()
     print(f"Available plugins: {list(available_plugins.keys())}")
     
-    # 檢查 bat 插件是否被發現
-    if 'bat' in available_plugins:
-        bat_plugin = available_plugins['bat']
-        print(f"[PASS] bat plugin discovered")
-        print(f"  Name: {bat_plugin.name}")
-        print(f"  Version: {bat_plugin.version}")
-        print(f"  Description: {bat_plugin.description}")
-        print(f"  Required tools: {bat_plugin.required_tools}")
-        print(f"  Tool available: {bat_plugin.check_tools_availability()}")
-        
-        return True
-    else:
-        print("[FAIL] bat plugin not discovered")
-        return False
+    # 檢查 bat 插件是否被發現（工具不可用的插件在載入時會被移除）
+    if not _bat_available():
+        pytest.skip("bat not available")
+    assert 'bat' in available_plugins, "bat plugin not discovered"
+    bat_plugin = available_plugins['bat']
+    print(f"[PASS] bat plugin discovered")
+    print(f"  Name: {bat_plugin.name}")
+    print(f"  Version: {bat_plugin.version}")
+    print(f"  Description: {bat_plugin.description}")
+    print(f"  Required tools: {bat_plugin.required_tools}")
+    print(f"  Tool available: {bat_plugin.check_tools_availability()}")
 
-def test_plugin_initialization():
+def test_plugin_initialization(qapp):
     """測試插件初始化"""
     print("\nTesting plugin initialization...")
     
-    from core.plugin_manager import plugin_manager
     from tools.bat.plugin import create_plugin
     
     # 創建插件實例
     plugin = create_plugin()
     
     # 檢查初始化
-    init_success = plugin.initialize()
-    print(f"Plugin initialization: {'PASS' if init_success else 'FAIL'}")
-    
-    if init_success:
-        print(f"  Plugin initialized: {plugin.is_initialized()}")
-        
-        # 獲取 widget
-        widget = plugin.get_widget()
-        print(f"  Widget available: {widget is not None}")
-        
-        if widget:
-            print(f"  Widget type: {type(widget).__name__}")
-        
-        # 清理
-        plugin.cleanup()
-        print("  Plugin cleanup completed")
-        
-        return True
+    assert plugin.initialize(), "Plugin initialization failed"
+    assert plugin.is_initialized()
+    print("Plugin initialization: PASS")
+    
+    # 獲取 widget
+    widget = plugin.get_widget()
+    assert widget is not None, "Plugin widget not available"
+    print(f"  Widget type: {type(widget).__name__}")
     
-    return False
+    # 初始化時建立的視圖應被重用
+    assert plugin.create_view() is widget
+    
+    # 清理
+    plugin.cleanup()
+    print("  Plugin cleanup completed")
 
-def test_main_window_integration():
+def test_main_window_integration(qapp):
     """測試主窗口整合"""
-    print("\nTesting main window integration...")
-    
-    try:
-        from PyQt5.QtWidgets import QApplication
-        from ui.main_window import ModernMainWindow
-        
-        # 創建應用程式（如果不存在）
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication(sys.argv)
-        
-        # 創建主窗口（但不顯示）
-        main_window = ModernMainWindow()
-        
-        # 檢查插件視圖是否正確載入
-        if hasattr(main_window, 'plugin_views'):
-            plugin_views = main_window.plugin_views
-            print(f"Plugin views: {list(plugin_views.keys())}")
-            
-            if 'bat' in plugin_views:
-                print("[PASS] bat plugin integrated into main window")
-                bat_view = plugin_views['bat']
-                print(f"  View type: {type(bat_view).__name__}")
-                return True
-            else:
-                print("[FAIL] bat plugin not found in main window")
-                return False
-        else:
-            print("[FAIL] No plugin views found in main window")
-            return False
-            
-    except Exception as e:
-        print(f"[ERROR] Main window integration test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    logger.info("Testing main window integration...")
+    
+    from ui.main_window import ModernMainWindow
+    from core.plugin_manager import plugin_manager
+    
+    # 創建主窗口（但不顯示）
+    main_window = ModernMainWindow()
+    
+    # 插件在事件迴圈中非同步載入，完成時一定會加入主題選擇器視圖
+    plugin_views = main_window.plugin_views
+    deadline = time.monotonic() + 10
+    while 'themes' not in plugin_views and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert 'themes' in plugin_views, "Plugin loading did not finish in time"
+    logger.info("Plugin views: %s", list(plugin_views))
+    
+    # 可用的 bat 插件必須整合到主窗口，不可用時則不應建立視圖
+    manager = main_window.optimized_plugin_manager or plugin_manager
+    bat_available = 'bat' in manager.get_available_plugins()
+    assert ('bat' in plugin_views) == bat_available, "bat plugin view does not match its availability"
+    if bat_available:
+        assert main_window.content_stack.indexOf(plugin_views['bat']) != -1
+        logger.info("[PASS] bat plugin integrated into main window")
+        logger.info("  View type: %s", type(plugin_views['bat']).__name__)
+    main_window.deleteLater()
 
 def main():
     """主測試函數"""
-    print("Bat Plugin Integration Test")
-    print("=" * 50)
+    show_banner = not os.environ.get("PYTEST_CURRENT_TEST")
+    if show_banner:
+        sys.stdout.write(f"Bat Plugin Integration Test\n{'=' * 50}\n")
+    
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
     
     tests = [
         ("Plugin Discovery", test_plugin_discovery),
-        ("Plugin Initialization", test_plugin_initialization),
-        ("Main Window Integration", test_main_window_integration)
+        ("Plugin Initialization", lambda: test_plugin_initialization(app)),
+        ("Main Window Integration", lambda: test_main_window_integration(app))
     ]
     
     results = []
     
     for test_name, test_func in tests:
         try:
-            result = test_func()
-            results.append((test_name, result))
+            test_func()
+            results.append((test_name, True))
+        except pytest.skip.Exception as e:
+            print(f"[SKIP] {test_name}: {e}")
         except Exception as e:
             print(f"[ERROR] {test_name} failed with exception: {e}")
             results.append((test_name, False))
     
-    print("\n" + "=" * 50)
-    print("Integration Test Summary")
-    print("=" * 50)
+    if show_banner:
+        sys.stdout.write(f"\n{'=' * 50}\nIntegration Test Summary\n{'=' * 50}\n")
     
     passed = 0
     for test_name, result in results:
@@ -6,188 +6,188 @@
 import sys
 import os
 import logging
-from PyQt5.QtWidgets import QApplication
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
-# 設定路徑
-sys.path.append(os.path.dirname(__file__))
+import pytest
 
-# 導入核心模組
-from core.plugin_manager import plugin_manager
-from ui.main_window import ModernMainWindow
+# 設定路徑，直接執行本腳本時也能導入專案模組
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 logger = logging.getLogger(__name__)
 
+def _discover_ripgrep():
+    """以新的插件管理器發現插件並回傳 ripgrep 插件，不受其他測試已載入或移除的插件影響"""
+    from core.plugin_manager import PluginManager
+    
+    manager = PluginManager()
+    manager.discover_plugins()
+    return manager.get_plugin('ripgrep')
+
 def test_plugin_discovery():
     """測試插件發現機制"""
-    print("測試插件發現...")
+    logger.debug("測試插件發現...")
     
-    try:
-        # 初始化插件管理器
-        plugins = plugin_manager.discover_plugins()
+    from core.plugin_manager import PluginManager, PluginProxy
+    
+    # 使用新的插件管理器，發現結果不受其他測試載入時移除的插件影響
+    manager = PluginManager()
+    manager.discover_plugins()
+    plugins = manager.get_all_plugins()
+    
+    logger.debug("發現 %s 個插件:", len(plugins))
+    for name, plugin in plugins.items():
+        logger.debug("  - %s: %s (版本: %s)", name, getattr(plugin, 'display_name', name), plugin.version)
+        logger.debug("    描述: %s", plugin.description)
+        logger.debug("    所需工具: %s", plugin.required_tools)
         
-        print(f"發現 {len(plugins)} 個插件:")
-        for name, plugin in plugins.items():
-            print(f"  - {name}: {plugin.display_name} (版本: {plugin.version})")
-            print(f"    描述: {plugin.description}")
-            print(f"    所需工具: {plugin.required_tools}")
-            print(f"    可用性: {'OK' if plugin.is_available() else 'NOT AVAILABLE'}")
-            print()
+        # manifest 插件讀取中繼資料時不應導入插件模組
+        if isinstance(plugin, PluginProxy) and not plugin.is_loaded:
+            assert plugin.name == name
+            assert plugin.required_tools
+            assert not plugin.is_loaded
         
-        # 檢查 ripgrep 插件是否存在
-        if 'ripgrep' in plugins:
-            print("Ripgrep 插件成功發現！")
-            return True, plugins['ripgrep']
-        else:
-            print("Ripgrep 插件未發現！")
-            return False, None
-            
-    except Exception as e:
-        print(f"❌ 插件發現失敗: {e}")
-        import traceback
-        traceback.print_exc()
-        return False, None
+        logger.debug("    可用性: %s", 'OK' if plugin.is_available() else 'NOT AVAILABLE')
+    
+    # 檢查 ripgrep 插件是否存在
+    assert 'ripgrep' in plugins, "Ripgrep 插件未發現"
+    logger.debug("Ripgrep 插件成功發現！")
 
-def test_plugin_initialization(plugin):
+def test_plugin_initialization(qapp):
     """測試插件初始化"""
-    print("🚀 測試插件初始化...")
+    logger.debug("🚀 測試插件初始化...")
     
-    try:
-        # 測試初始化
-        init_success = plugin.initialize()
-        print(f"插件初始化: {'✅' if init_success else '❌'}")
-        
-        # 測試 MVC 組件創建
-        print("創建 MVC 組件:")
-        
-        model = plugin.create_model()
-        print(f"  Model: {'✅' if model else '❌'}")
-        
-        if model:
-            print(f"    - 可用性: {'✅' if model.is_available() else '❌'}")
-            print(f"    - 版本: {model.get_version_info()}")
-        
-        view = plugin.create_view()
-        print(f"  View: {'✅' if view else '❌'}")
-        
-        if model and view:
-            controller = plugin.create_controller(model, view)
-            print(f"  Controller: {'✅' if controller else '❌'}")
-            
-            # 清理資源
-            if hasattr(controller, 'cleanup'):
-                controller.cleanup()
-            if hasattr(view, 'deleteLater'):
-                view.deleteLater()
-            if hasattr(model, 'cleanup'):
-                model.cleanup()
-        
-        return init_success
-        
-    except Exception as e:
-        print(f"❌ 插件初始化失敗: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    plugin = _discover_ripgrep()
+    assert plugin is not None, "Ripgrep 插件未發現"
+    if not plugin.is_available():
+        pytest.skip("ripgrep 不可用")
+    
+    # 測試初始化
+    assert plugin.initialize(), "插件初始化失敗"
+    logger.debug("插件初始化: ✅")
+    
+    # 測試 MVC 組件創建
+    logger.debug("創建 MVC 組件:")
+    
+    model = plugin.create_model()
+    assert model, "Model 建立失敗"
+    logger.debug("    - 可用性: %s", '✅' if model.is_available() else '❌')
+    logger.debug("    - 版本: %s", model.get_version_info())
+    
+    view = plugin.create_view()
+    assert view, "View 建立失敗"
+    
+    controller = plugin.create_controller(model, view)
+    assert controller, "Controller 建立失敗"
+    logger.debug("  Model / View / Controller: ✅")
+    
+    # 清理資源
+    if hasattr(controller, 'cleanup'):
+        controller.cleanup()
+    view.deleteLater()
+    if hasattr(model, 'cleanup'):
+        model.cleanup()
 
-def test_main_window_integration():
+def test_main_window_integration(qapp):
     """測試主窗口整合"""
-    print("🏠 測試主窗口整合...")
+    logger.debug("🏠 測試主窗口整合...")
     
-    try:
-        # 創建 QApplication（如果不存在）
-        if not QApplication.instance():
-            app = QApplication(sys.argv)
-        
-        # 創建主窗口
-        main_window = ModernMainWindow()
-        
-        # 檢查插件是否已載入到導航欄
-        navigation_sidebar = getattr(main_window, 'navigation_sidebar', None)
-        if navigation_sidebar:
-            print("✅ 導航側邊欄存在")
-            
-            # 獲取導航按鈕
-            nav_buttons = navigation_sidebar.nav_buttons if hasattr(navigation_sidebar, 'nav_buttons') else {}
-            
-            ripgrep_found = False
-            for name, button in nav_buttons.items():
-                button_text = button.text() if hasattr(button, 'text') else str(button)
-                print(f"  導航按鈕: {button_text}")
-                if 'ripgrep' in name.lower() or '🔎' in button_text:
-                    ripgrep_found = True
-            
-            if ripgrep_found:
-                print("✅ Ripgrep 導航按鈕找到")
-            else:
-                print("❌ Ripgrep 導航按鈕未找到")
-        else:
-            print("❌ 導航側邊欄未找到")
-        
-        # 清理
-        main_window.deleteLater()
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ 主窗口整合測試失敗: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    from ui.main_window import ModernMainWindow
+    
+    # 創建主窗口
+    main_window = ModernMainWindow()
+    
+    # 插件在事件迴圈中非同步載入，完成時一定會加入主題選擇器視圖
+    deadline = time.monotonic() + 10
+    while 'themes' not in main_window.plugin_views and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert 'themes' in main_window.plugin_views, "插件載入未在時限內完成"
+    
+    # 可用的 ripgrep 插件必須建立視圖並加入內容堆疊，不可用時則不應出現
+    from core.plugin_manager import plugin_manager
+    manager = main_window.optimized_plugin_manager or plugin_manager
+    ripgrep_available = 'ripgrep' in manager.get_available_plugins()
+    ripgrep_view = main_window.plugin_views.get('ripgrep')
+    assert (ripgrep_view is not None) == ripgrep_available
+    if ripgrep_view is not None:
+        assert main_window.content_stack.indexOf(ripgrep_view) != -1
+        logger.debug("✅ Ripgrep 視圖已加入主窗口")
+    else:
+        logger.debug("ℹ️ Ripgrep 不可用，主窗口未建立其視圖")
+    
+    # 清理
+    main_window.deleteLater()
 
 def run_integration_tests():
     """運行所有整合測試"""
-    print("=" * 60)
-    print("Ripgrep 插件整合測試")
-    print("=" * 60)
+    logger.debug("=" * 60)
+    logger.debug("Ripgrep 插件整合測試")
+    logger.debug("=" * 60)
     
     results = []
     
-    # 測試 1: 插件發現
-    success, plugin = test_plugin_discovery()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    def run(test_func, *args) -> bool:
+        """執行單一測試，斷言失敗或例外都記為失敗"""
+        try:
+            test_func(*args)
+            return True
+        except pytest.skip.Exception as e:
+            logger.debug("略過: %s", e)
+            return True
+        except Exception:
+            logger.error("測試失敗:\n%s", traceback.format_exc())
+            return False
+    
+    # 測試 1 在背景執行緒進行插件發現；Qt 元件只能在主執行緒建立，
+    # 因此測試 3 的主窗口整合同時在主執行緒執行
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        discovery = executor.submit(run, test_plugin_discovery)
+        window_success = run(test_main_window_integration, app)
+        success = discovery.result()
     results.append(("插件發現", success))
     
     if not success:
-        print("\n❌ 插件發現失敗，終止後續測試")
+        logger.debug("\n❌ 插件發現失敗，終止後續測試")
         return False
     
-    print("-" * 60)
+    logger.debug("-" * 60)
     
     # 測試 2: 插件初始化
-    success = test_plugin_initialization(plugin)
-    results.append(("插件初始化", success))
-    
-    print("-" * 60)
-    
-    # 測試 3: 主窗口整合
-    success = test_main_window_integration()
-    results.append(("主窗口整合", success))
+    results.append(("插件初始化", run(test_plugin_initialization, app)))
+    results.append(("主窗口整合", window_success))
     
     # 測試結果摘要
-    print("\n" + "=" * 60)
-    print("📊 測試結果摘要")
-    print("=" * 60)
+    logger.debug("\n" + "=" * 60)
+    logger.debug("📊 測試結果摘要")
+    logger.debug("=" * 60)
     
     all_passed = True
     for test_name, passed in results:
         status = "✅ 通過" if passed else "❌ 失敗"
-        print(f"{test_name}: {status}")
+        logger.debug("%s: %s", test_name, status)
         if not passed:
             all_passed = False
     
-    print("-" * 60)
+    logger.debug("-" * 60)
     if all_passed:
-        print("🎉 所有測試通過！Ripgrep 插件整合成功！")
+        logger.debug("🎉 所有測試通過！Ripgrep 插件整合成功！")
     else:
-        print("⚠️  部分測試失敗，請檢查問題。")
+        logger.debug("⚠️  部分測試失敗，請檢查問題。")
     
     return all_passed
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     try:
         success = run_integration_tests()
         sys.exit(0 if success else 1)
     except Exception as e:
-        print(f"💥 測試運行失敗: {e}")
-        import traceback
+        logger.debug("💥 測試運行失敗: %s", e)
         traceback.print_exc()
         sys.exit(1)
\ No newline at end of file
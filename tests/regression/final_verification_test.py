@@ -5,23 +5,17 @@
 
 import sys
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication
 
 # 添加專案根目錄到 Python 路徑
 project_root = Path(__file__).parent / "../.."
 sys.path.insert(0, str(project_root))
 
-def test_navigation_fix():
+def test_navigation_fix(qapp):
     """測試導航修復"""
     print("Testing csvkit navigation fix...")
     print("=" * 40)
     
     try:
-        # 創建 QApplication
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication(sys.argv)
-        
         # 測試插件載入
         print("1. Testing plugin loading...")
         from core.plugin_manager import plugin_manager
@@ -63,35 +57,9 @@ def test_navigation_fix():
         
         # 測試吐司通知映射
         print("5. Testing toast notification mapping...")
-        page_names = {
-            "welcome": "歡迎頁面",
-            "fd": "檔案搜尋",
-            "ripgrep": "文本搜尋", 
-            "poppler": "PDF 處理",
-            "glow": "Markdown 閱讀器",
-            "pandoc": "文檔轉換",
-            "bat": "語法高亮查看器",
-            "dust": "磁碟空間分析器",
-            "csvkit": "CSV 數據處理",
-            "themes": "主題設定",
-            "components": "UI 組件"
-        }
-        
-        icon_map = {
-            "welcome": "🏠",
-            "fd": "🔍", 
-            "ripgrep": "🔎",
-            "poppler": "📄",
-            "glow": "📖",
-            "pandoc": "🔄",
-            "bat": "🌈",
-            "dust": "💾",
-            "csvkit": "📊",
-            "themes": "🎨",
-            "components": "🧩"
-        }
+        from ui.main_window import NAVIGATION_PAGE_NAMES, NAVIGATION_ICONS
         
-        if 'csvkit' in page_names and 'csvkit' in icon_map:
+        if 'csvkit' in NAVIGATION_PAGE_NAMES and 'csvkit' in NAVIGATION_ICONS:
             print("   PASS: csvkit properly mapped in navigation toast")
         else:
             print("   FAIL: csvkit missing from navigation toast mapping")
@@ -117,7 +85,9 @@ def main():
     print("Final Verification Test for csvkit Navigation Fix")
     print("=" * 50)
     
-    success = test_navigation_fix()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    success = test_navigation_fix(app)
     
     print("\nFINAL RESULT:")
     if success:
@@ -5,80 +5,86 @@
 """
 
 import sys
+import logging
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
 import time
 
+import pytest
+
 project_root = Path(__file__).parent / "../../.."
 sys.path.insert(0, str(project_root))
 
-def test_auto_monitoring():
+logger = logging.getLogger(__name__)
+
+# 自動啟動監控所需的視圖成員
+AUTO_START_MEMBERS = ['showEvent', 'auto_start_attempted', '_auto_start_monitoring']
+
+@pytest.fixture(scope="module")
+def glances_view(qapp):
+    """同一模組內共用的 Glances 視圖"""
+    from tools.glances.glances_view import GlancesView
+    view = GlancesView()
+    yield view
+    # 停止尚未觸發的自動啟動計時器，避免在後續測試中發出啟動監控信號
+    view._init_start_timer.stop()
+    view._show_start_timer.stop()
+    view.deleteLater()
+
+@pytest.mark.parametrize("member", AUTO_START_MEMBERS)
+def test_glances_view_has_auto_start_member(glances_view, member):
+    """測試視圖提供自動啟動監控所需的成員"""
+    assert hasattr(glances_view, member), f"GlancesView.{member} missing"
+
+def test_auto_monitoring(qapp):
     """測試自動監控功能"""
-    app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+    from PyQt5.QtCore import QTimer
     
-    try:
-        print("Testing auto-start monitoring...")
-        
-        # 創建 Glances 視圖
-        from tools.glances.glances_view import GlancesView
-        view = GlancesView()
-        
-        print("Created GlancesView")
-        
-        # 檢查是否有 showEvent 方法
-        if hasattr(view, 'showEvent'):
-            print("+ showEvent method exists")
-        else:
-            print("- showEvent method missing")
-            
-        # 檢查是否有自動啟動標記
-        if hasattr(view, 'auto_start_attempted'):
-            print("+ auto_start_attempted flag exists")
-        else:
-            print("- auto_start_attempted flag missing")
-            
-        # 檢查是否有 _auto_start_monitoring 方法
-        if hasattr(view, '_auto_start_monitoring'):
-            print("+ _auto_start_monitoring method exists")
-        else:
-            print("- _auto_start_monitoring method missing")
-        
-        # 模擬顯示視圖並檢查監控是否會啟動
-        monitor_started = False
-        
-        def on_start_monitoring():
-            nonlocal monitor_started
-            monitor_started = True
-            print("+ Monitoring signal emitted!")
-            
-        view.start_monitoring.connect(on_start_monitoring)
-        
-        print("Showing view to trigger showEvent...")
-        view.show()
-        
-        # 等待自動啟動 - 延長等待時間
-        QTimer.singleShot(2500, app.quit)  # 2.5秒後退出
-        app.exec_()
+    logger.debug("Testing auto-start monitoring...")
+    
+    # 創建 Glances 視圖
+    from tools.glances.glances_view import GlancesView
+    view = GlancesView()
+    
+    logger.debug("Created GlancesView")
+    
+    # 模擬顯示視圖並檢查監控是否會啟動
+    monitor_started = False
+    
+    def on_start_monitoring():
+        nonlocal monitor_started
+        monitor_started = True
+        logger.debug("+ Monitoring signal emitted!")
+        qapp.quit()
         
-        if monitor_started:
-            print("+ Auto-start monitoring SUCCESSFUL!")
-            return True
-        else:
-            print("- Auto-start monitoring FAILED")
-            return False
-            
-    except Exception as e:
-        print(f"Error testing auto-start monitoring: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    view.start_monitoring.connect(on_start_monitoring)
+    
+    logger.debug("Showing view to trigger showEvent...")
+    view.show()
+    
+    # 信號觸發即結束事件迴圈，計時器只作為 2.5 秒的上限
+    ceiling = QTimer()
+    ceiling.setSingleShot(True)
+    ceiling.timeout.connect(qapp.quit)
+    start = time.perf_counter()
+    ceiling.start(2500)
+    qapp.exec_()
+    ceiling.stop()
+    elapsed = time.perf_counter() - start
+    view.close()
+    view.deleteLater()
+    
+    assert monitor_started, "Auto-start monitoring signal was not emitted"
+    assert elapsed < 2.5, f"Auto-start monitoring took {elapsed:.2f}s"
+    logger.debug("+ Auto-start monitoring SUCCESSFUL! (%.2fs)", elapsed)
 
 if __name__ == "__main__":
-    print("Auto-Start Monitoring Test")
-    print("=" * 50)
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    logger.debug("Auto-Start Monitoring Test")
+    logger.debug("=" * 50)
     
-    success = test_auto_monitoring()
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    test_auto_monitoring(app)
     
-    print("=" * 50)
-    print(f"Result: {'SUCCESS' if success else 'FAILED'}")
\ No newline at end of file
+    logger.debug("=" * 50)
+    logger.debug("Result: SUCCESS")
\ No newline at end of file
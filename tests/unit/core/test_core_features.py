@@ -5,262 +5,214 @@
 """
 
 import sys
+import logging
 import tempfile
 import os
 from pathlib import Path
 
+import pytest
+
 # 添加專案根目錄到 Python 路徑
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-def test_model_import():
+logger = logging.getLogger(__name__)
+
+def test_model_import(csvkit_model):
     """測試模型導入和基本功能"""
-    print("Testing model import...")
+    logger.debug("Testing model import...")
     
-    try:
-        from tools.csvkit.csvkit_model import CsvkitModel
-        model = CsvkitModel()
-        print("SUCCESS: CsvkitModel imported successfully")
-        
-        # 檢查編碼方法存在
-        if hasattr(model, '_execute_command'):
-            print("SUCCESS: _execute_command method exists")
-        else:
-            print("ERROR: _execute_command method missing")
-            return False
-            
-        if hasattr(model, 'save_result_to_file'):
-            print("SUCCESS: save_result_to_file method exists")
-        else:
-            print("ERROR: save_result_to_file method missing")
-            return False
-        
-        return True
-        
-    except Exception as e:
-        print(f"ERROR: Failed to import model - {e}")
-        return False
+    # 檢查編碼方法存在
+    assert hasattr(csvkit_model, '_execute_command'), "_execute_command method missing"
+    assert hasattr(csvkit_model, 'save_result_to_file'), "save_result_to_file method missing"
+    logger.debug("SUCCESS: CsvkitModel exposes encoding and save methods")
 
-def test_encoding_logic():
+def test_encoding_logic(csvkit_model):
     """測試編碼處理邏輯"""
-    print("\nTesting encoding logic...")
+    logger.debug("\nTesting encoding logic...")
     
-    try:
-        from tools.csvkit.csvkit_model import CsvkitModel
-        model = CsvkitModel()
-        
-        # 檢查編碼設定
-        expected_encodings = ['utf-8', 'cp950', 'big5', 'gbk', 'latin-1']
-        
-        # 通過檢查 _execute_command 方法的實現來驗證編碼邏輯
-        import inspect
-        source = inspect.getsource(model._execute_command)
-        
-        encodings_found = 0
-        for encoding in expected_encodings:
-            if encoding in source:
-                encodings_found += 1
-        
-        if encodings_found >= 4:  # 至少找到4種編碼
-            print("SUCCESS: Multiple encoding support implemented")
-        else:
-            print("WARNING: Limited encoding support found")
-        
-        # 檢查錯誤處理
-        if 'UnicodeDecodeError' in source and 'errors=' in source:
-            print("SUCCESS: Unicode error handling implemented")
-        else:
-            print("WARNING: Limited error handling found")
-        
-        return True
-        
-    except Exception as e:
-        print(f"ERROR: Failed to test encoding logic - {e}")
-        return False
+    # 檢查宣告的讀取編碼
+    expected_encodings = {'utf-8', 'cp950', 'big5', 'gbk', 'latin-1'}
+    assert expected_encodings.issubset(csvkit_model.SUPPORTED_READ_ENCODINGS)
+    assert csvkit_model.SUPPORTED_READ_ENCODINGS[0] == 'utf-8'
+    logger.debug("SUCCESS: Multiple encoding support implemented")
 
-def test_save_logic():
+def test_save_logic(csvkit_model):
     """測試保存邏輯"""
-    print("\nTesting save logic...")
+    logger.debug("\nTesting save logic...")
     
-    try:
-        from tools.csvkit.csvkit_model import CsvkitModel
-        model = CsvkitModel()
-        
-        # 檢查保存方法實現
-        import inspect
-        source = inspect.getsource(model.save_result_to_file)
-        
-        # 檢查多編碼保存支援
-        save_encodings = ['utf-8-sig', 'utf-8', 'cp950', 'big5']
-        encodings_found = 0
-        for encoding in save_encodings:
-            if encoding in source:
-                encodings_found += 1
-        
-        if encodings_found >= 3:
-            print("SUCCESS: Multiple encoding save support implemented")
-        else:
-            print("WARNING: Limited save encoding support")
-        
-        # 檢查檔案對話框支援
-        if 'QFileDialog' in source:
-            print("SUCCESS: File dialog integration implemented")
-        else:
-            print("WARNING: No file dialog integration found")
-        
-        # 檢查錯誤處理
-        if 'UnicodeEncodeError' in source:
-            print("SUCCESS: Save error handling implemented")
-        else:
-            print("WARNING: Limited save error handling")
-        
-        return True
-        
-    except Exception as e:
-        print(f"ERROR: Failed to test save logic - {e}")
-        return False
+    # 檢查宣告的保存編碼（優先使用帶 BOM 的 UTF-8，方便 Excel 開啟）
+    save_encodings = {'utf-8-sig', 'utf-8', 'cp950', 'big5'}
+    assert save_encodings.issubset(csvkit_model.SUPPORTED_SAVE_ENCODINGS)
+    assert csvkit_model.SUPPORTED_SAVE_ENCODINGS[0] == 'utf-8-sig'
+    logger.debug("SUCCESS: Multiple encoding save support implemented")
+
+# 視圖、控制器需提供的保存相關成員
+VIEW_METHODS = ['set_result_for_saving', 'save_current_result', 'save_result']
+CONTROLLER_METHODS = ['handle_save_result']
 
-def test_view_integration():
-    """測試視圖集成"""
-    print("\nTesting view integration...")
+@pytest.mark.parametrize("method", VIEW_METHODS)
+def test_csvkit_view_has_method(method):
+    """測試視圖提供保存相關方法與信號"""
+    from tools.csvkit.csvkit_view import CsvkitView
+    assert hasattr(CsvkitView, method), f"CsvkitView.{method} missing"
+
+@pytest.mark.parametrize("method", CONTROLLER_METHODS)
+def test_csvkit_controller_has_method(method):
+    """測試控制器提供保存處理方法"""
+    from tools.csvkit.csvkit_controller import CsvkitController
+    assert hasattr(CsvkitController, method), f"CsvkitController.{method} missing"
+
+def check_view_integration():
+    """腳本模式下依序檢查所有視圖集成成員"""
+    logger.debug("\nTesting view integration...")
     
-    try:
-        from tools.csvkit.csvkit_view import CsvkitView
-        from tools.csvkit.csvkit_controller import CsvkitController
-        
-        # 檢查視圖類
-        view_methods = ['set_result_for_saving', 'save_current_result']
-        for method in view_methods:
-            if hasattr(CsvkitView, method):
-                print(f"SUCCESS: CsvkitView.{method} exists")
-            else:
-                print(f"ERROR: CsvkitView.{method} missing")
-                return False
-        
-        # 檢查控制器類
-        controller_methods = ['handle_save_result']
-        for method in controller_methods:
-            if hasattr(CsvkitController, method):
-                print(f"SUCCESS: CsvkitController.{method} exists")
-            else:
-                print(f"ERROR: CsvkitController.{method} missing")
-                return False
-        
-        # 檢查信號定義
-        if hasattr(CsvkitView, 'save_result'):
-            print("SUCCESS: save_result signal defined")
-        else:
-            print("ERROR: save_result signal missing")
-            return False
-        
-        return True
-        
-    except Exception as e:
-        print(f"ERROR: Failed to test view integration - {e}")
-        return False
+    for method in VIEW_METHODS:
+        test_csvkit_view_has_method(method)
+        logger.debug("SUCCESS: CsvkitView.%s exists", method)
+    
+    for method in CONTROLLER_METHODS:
+        test_csvkit_controller_has_method(method)
+        logger.debug("SUCCESS: CsvkitController.%s exists", method)
 
 def test_file_operations():
     """測試檔案操作（不使用GUI）"""
-    print("\nTesting file operations...")
+    logger.debug("\nTesting file operations...")
     
-    try:
-        # 測試內容
-        test_content = """Product,Price,Stock
+    # 測試內容
+    test_content = """Product,Price,Stock
 Laptop,25000,50
 Phone,15000,120
 Tablet,12000,80"""
-        
-        # 創建臨時文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8') as f:
-            f.write(test_content)
-            temp_file = f.name
-        
-        print(f"SUCCESS: Created test file - {temp_file}")
+    
+    # 創建臨時文件
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8') as f:
+        f.write(test_content)
+        temp_file = f.name
+    
+    try:
+        logger.debug("SUCCESS: Created test file - %s", temp_file)
         
         # 驗證文件內容
         with open(temp_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        if content == test_content:
-            print("SUCCESS: File content matches expected")
-        else:
-            print("ERROR: File content mismatch")
-            return False
-        
+        assert content == test_content, "File content mismatch"
+        logger.debug("SUCCESS: File content matches expected")
+    finally:
         # 清理
         os.unlink(temp_file)
-        print("SUCCESS: File cleaned up")
-        
-        return True
-        
-    except Exception as e:
-        print(f"ERROR: File operations failed - {e}")
-        return False
+
+def test_csvkit_result_cache_skips_worker(csvkit_controller, tmp_path, monkeypatch):
+    """測試相同的 csvlook 命令在檔案未變更時直接重用結果，不啟動背景任務"""
+    from tools.csvkit import csvkit_controller as controller_module
+    
+    sample = tmp_path / "sample.csv"
+    sample.write_text("a,b\n1,2\n", encoding="utf-8")
+    controller = csvkit_controller
+    args = (str(sample), 5, 3, 10, [])
+    
+    key = controller._result_cache_key('csvlook', args)
+    assert key is not None
+    assert controller._result_cache_key('csvsql', args) is None
+    controller._pending_cache_key = key
+    controller._on_command_finished("| a | b |", "", 0)
+    
+    shown = []
+    monkeypatch.setattr(controller_module, "CsvkitTask", lambda *a: pytest.fail("task started"))
+    monkeypatch.setattr(controller.view, "display_result", lambda *a: shown.append(a))
+    controller._execute_command('csvlook', *args)
+    assert shown == [("| a | b |",)]
+    
+    sample.write_text("a,b\n1,22\n", encoding="utf-8")
+    assert controller._result_cache_key('csvlook', args) != key
+    controller._result_cache.clear()
+
+def test_csvkit_task_runs_on_pool(csvkit_controller, qapp, monkeypatch):
+    """測試命令在控制器的執行緒池中執行，完成信號回到 GUI 執行緒顯示結果"""
+    import time
+    
+    controller = csvkit_controller
+    shown = []
+    monkeypatch.setattr(controller.model, "get_tool_help", lambda tool: (f"usage: {tool}", "", 0))
+    monkeypatch.setattr(controller.view, "display_result", lambda *a: shown.append(a))
+    
+    controller._execute_command('help', 'fake-tool')
+    deadline = time.monotonic() + 5
+    while controller._task_signals is not None and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert shown == [("usage: fake-tool",)]
+    assert controller._pool.maxThreadCount() == 1
+    controller._result_cache.clear()
 
 def main():
     """主測試函數"""
-    print("csvkit Core Features Test")
-    print("=" * 40)
+    logger.debug("csvkit Core Features Test")
+    logger.debug("=" * 40)
+    
+    from tools.csvkit.csvkit_model import CsvkitModel
+    model = CsvkitModel()
     
     tests = [
-        ("Model Import", test_model_import),
-        ("Encoding Logic", test_encoding_logic),
-        ("Save Logic", test_save_logic),
-        ("View Integration", test_view_integration),
+        ("Model Import", lambda: test_model_import(model)),
+        ("Encoding Logic", lambda: test_encoding_logic(model)),
+        ("Save Logic", lambda: test_save_logic(model)),
+        ("View Integration", check_view_integration),
         ("File Operations", test_file_operations)
     ]
     
     results = []
     
     for test_name, test_func in tests:
-        print(f"\n--- {test_name} ---")
+        logger.debug("\n--- %s ---", test_name)
         try:
-            result = test_func()
-            results.append((test_name, result))
+            test_func()
+            results.append((test_name, True))
         except Exception as e:
-            print(f"CRITICAL ERROR in {test_name}: {e}")
+            logger.error("FAILED %s: %s", test_name, e)
             results.append((test_name, False))
     
     # 結果摘要
-    print("\n" + "=" * 40)
-    print("Test Results Summary:")
+    logger.debug("\n" + "=" * 40)
+    logger.debug("Test Results Summary:")
     
     passed = 0
     total = len(results)
     
     for test_name, result in results:
         status = "PASS" if result else "FAIL"
-        print(f"  {test_name}: {status}")
+        logger.debug("  %s: %s", test_name, status)
         if result:
             passed += 1
     
-    print(f"\nOverall: {passed}/{total} tests passed")
+    logger.debug("\nOverall: %s/%s tests passed", passed, total)
     
     if passed == total:
-        print("\nALL TESTS PASSED!")
-        print("\nImplemented Features:")
-        print("  - Multi-encoding command execution")
-        print("  - Smart encoding fallback system")
-        print("  - File save functionality")
-        print("  - GUI integration with file dialogs")
-        print("  - Error handling for encoding issues")
-        print("  - Unicode character support")
-        
-        print("\nEncoding Support:")
-        print("  - UTF-8 (primary)")
-        print("  - CP950 (Traditional Chinese)")
-        print("  - BIG5 (Traditional Chinese)")
-        print("  - GBK (Simplified Chinese)")
-        print("  - Latin-1 (fallback)")
-        
-        print("\nFile Save Features:")
-        print("  - Automatic file type detection")
-        print("  - Multiple encoding attempts")
-        print("  - User-friendly file dialogs")
-        print("  - Error recovery mechanisms")
+        logger.debug("\nALL TESTS PASSED!")
+        logger.debug("\nImplemented Features:")
+        logger.debug("  - Multi-encoding command execution")
+        logger.debug("  - Smart encoding fallback system")
+        logger.debug("  - File save functionality")
+        logger.debug("  - GUI integration with file dialogs")
+        logger.debug("  - Error handling for encoding issues")
+        logger.debug("  - Unicode character support")
+        
+        logger.debug("\nEncoding Support:")
+        logger.debug("  - UTF-8 (primary)")
+        logger.debug("  - CP950 (Traditional Chinese)")
+        logger.debug("  - BIG5 (Traditional Chinese)")
+        logger.debug("  - GBK (Simplified Chinese)")
+        logger.debug("  - Latin-1 (fallback)")
+        
+        logger.debug("\nFile Save Features:")
+        logger.debug("  - Automatic file type detection")
+        logger.debug("  - Multiple encoding attempts")
+        logger.debug("  - User-friendly file dialogs")
+        logger.debug("  - Error recovery mechanisms")
         
     else:
-        print(f"\n{total - passed} tests failed. Please check the implementation.")
+        logger.debug("\n%s tests failed. Please check the implementation.", total - passed)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     main()
\ No newline at end of file
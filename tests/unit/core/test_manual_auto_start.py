@@ -4,63 +4,55 @@
 測試手動調用自動啟動監控功能
 """
 
+import os
 import sys
+import logging
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
-import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
 project_root = Path(__file__).parent / "../../.."
 sys.path.insert(0, str(project_root))
 
-def test_manual_auto_start():
+logger = logging.getLogger(__name__)
+
+def test_manual_auto_start(qapp):
     """測試手動調用自動啟動"""
-    app = QApplication(sys.argv) if QApplication.instance() is None else QApplication.instance()
+    logger.debug("Testing manual auto-start...")
     
-    try:
-        print("Testing manual auto-start...")
-        
-        # 創建 Glances 視圖
-        from tools.glances.glances_view import GlancesView
-        view = GlancesView()
-        
-        print("Created GlancesView")
-        
-        # 監聽監控啟動信號
-        monitor_started = False
-        
-        def on_start_monitoring():
-            nonlocal monitor_started
-            monitor_started = True
-            print("+ Monitoring signal emitted!")
-            
-        view.start_monitoring.connect(on_start_monitoring)
-        
-        # 手動調用 _auto_start_monitoring 方法
-        print("Manually calling _auto_start_monitoring...")
-        view._auto_start_monitoring()
-        
-        # 給一點時間讓信號處理
-        app.processEvents()
+    # 創建 Glances 視圖
+    from tools.glances.glances_view import GlancesView
+    view = GlancesView()
+    
+    logger.debug("Created GlancesView")
+    
+    # 監聽監控啟動信號
+    monitor_started = False
+    
+    def on_start_monitoring():
+        nonlocal monitor_started
+        monitor_started = True
+        logger.debug("+ Monitoring signal emitted!")
         
-        if monitor_started:
-            print("+ Manual auto-start monitoring SUCCESSFUL!")
-            return True
-        else:
-            print("- Manual auto-start monitoring FAILED")
-            return False
-            
-    except Exception as e:
-        print(f"Error testing manual auto-start: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    view.start_monitoring.connect(on_start_monitoring)
+    
+    # 手動調用 _auto_start_monitoring 方法
+    logger.debug("Manually calling _auto_start_monitoring...")
+    view._auto_start_monitoring()
+    
+    # 給一點時間讓信號處理
+    qapp.processEvents()
+    
+    assert monitor_started, "Manual auto-start monitoring did not emit start_monitoring"
+    logger.debug("+ Manual auto-start monitoring SUCCESSFUL!")
 
 if __name__ == "__main__":
-    print("Manual Auto-Start Test")
-    print("=" * 50)
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    logger.debug("Manual Auto-Start Test")
+    logger.debug("=" * 50)
     
-    success = test_manual_auto_start()
+    from PyQt5.QtWidgets import QApplication
+    test_manual_auto_start(QApplication.instance() or QApplication(sys.argv))
     
-    print("=" * 50)
-    print(f"Result: {'SUCCESS' if success else 'FAILED'}")
\ No newline at end of file
+    logger.debug("=" * 50)
+    logger.debug("Result: SUCCESS")
\ No newline at end of file
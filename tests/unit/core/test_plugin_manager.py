@@ -0,0 +1,191 @@
+import sys
+from pathlib import Path
+
+from core.plugin_manager import PluginManager, PluginProxy, _tool_in_path
+
+
+def _counting_manager(monkeypatch):
+    manager = PluginManager()
+    calls = []
+    monkeypatch.setattr(manager, "discover_plugins", lambda: calls.append(1) or [])
+    monkeypatch.setattr(manager, "load_plugins", lambda: None)
+    return manager, calls
+
+
+def test_ensure_initialized_discovers_once(monkeypatch):
+    manager, calls = _counting_manager(monkeypatch)
+    assert manager.ensure_initialized() is manager
+    manager.ensure_initialized()
+    manager.initialize()
+    assert len(calls) == 1
+
+
+def test_initialize_force_rediscovers(monkeypatch):
+    manager, calls = _counting_manager(monkeypatch)
+    manager.initialize()
+    manager.initialize(force=True)
+    assert len(calls) == 2
+    assert manager.ensure_initialized() is manager
+    assert len(calls) == 2
+
+
+def test_reset_for_tests_forces_rediscovery(monkeypatch):
+    manager, calls = _counting_manager(monkeypatch)
+    manager.ensure_initialized()
+    manager._reset_for_tests()
+    manager.ensure_initialized()
+    assert len(calls) == 2
+
+
+def test_discover_plugins_reuses_cache_until_cleanup(monkeypatch):
+    manager = PluginManager()
+    scanned = []
+    monkeypatch.setattr(manager, "_discover_plugins_in_directory", scanned.append)
+    manager.discover_plugins()
+    first_pass = len(scanned)
+    assert first_pass > 0
+    manager.discover_plugins()
+    assert len(scanned) == first_pass
+    manager.cleanup()
+    manager.discover_plugins()
+    assert len(scanned) == 2 * first_pass
+
+
+def test_plugin_proxy_reads_metadata_without_import():
+    proxy = PluginProxy({
+        "name": "demo",
+        "version": "1.0.0",
+        "description": "demo plugin",
+        "required_tools": [Path(sys.executable).name],
+        "entry_module": "tools.does_not_exist.plugin",
+        "entry_class": "DemoPlugin",
+    })
+    assert proxy.name == "demo"
+    assert proxy.version == "1.0.0"
+    assert proxy.is_available()
+    assert not proxy.is_loaded
+
+
+def test_register_proxy_without_version_stays_unloaded():
+    manager = PluginManager()
+    proxy = PluginProxy({
+        "name": "demo",
+        "required_tools": [],
+        "entry_module": "tools.does_not_exist.plugin",
+        "entry_class": "DemoPlugin",
+    })
+    manager.register_plugin(proxy)
+    assert not proxy.is_loaded
+
+
+def test_tool_lookup_follows_path_changes(monkeypatch, tmp_path):
+    tool = Path(sys.executable).name
+    monkeypatch.setenv("PATH", str(Path(sys.executable).parent))
+    assert _tool_in_path(tool)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert not _tool_in_path(tool)
+
+
+def test_available_plugins_cached_until_registration():
+    manager = PluginManager()
+    checks = []
+
+    class _Plugin(PluginProxy):
+        def is_available(self):
+            checks.append(self.name)
+            return True
+
+    manager.register_plugin(_Plugin({"name": "one", "version": "1.0.0"}))
+    assert list(manager.get_available_plugins()) == ["one"]
+    manager.get_available_plugins()
+    assert checks == ["one"]
+    manager.register_plugin(_Plugin({"name": "two", "version": "1.0.0"}))
+    assert set(manager.get_available_plugins()) == {"one", "two"}
+    assert len(checks) == 3
+
+
+def _demo_module(monkeypatch, create_plugin):
+    import types
+    module = types.ModuleType("demo_plugin_module")
+    module.create_plugin = create_plugin
+    monkeypatch.setitem(sys.modules, "demo_plugin_module", module)
+    return {"name": "demo", "version": "1.0.0", "required_tools": [Path(sys.executable).name],
+            "entry_module": "demo_plugin_module", "entry_class": "DemoPlugin"}
+
+
+def test_plugin_proxy_loads_once_across_threads(monkeypatch):
+    import threading
+    import time
+    created = []
+
+    def create_plugin():
+        time.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    proxy = PluginProxy(_demo_module(monkeypatch, create_plugin))
+    threads = [threading.Thread(target=proxy._load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert proxy._load() is created[0]
+
+
+def test_plugin_proxy_availability_ignores_load_state(monkeypatch):
+    class _Unavailable:
+        def is_available(self):
+            return False
+
+    proxy = PluginProxy(_demo_module(monkeypatch, _Unavailable))
+    assert proxy.manifest_version == "1.0.0"
+    assert proxy.is_available()
+    proxy._load()
+    assert proxy.is_available()
+
+    missing = PluginProxy({**proxy._manifest, "required_tools": ["no-such-tool-for-demo"]})
+    assert not missing.is_available()
+    assert not missing.is_available()
+
+
+def test_discovery_cache_hit_keeps_failed_plugins_removed(monkeypatch):
+    manager = PluginManager()
+
+    class _Plugin(PluginProxy):
+        def is_available(self):
+            return self.name == "ok"
+
+        def initialize(self):
+            return True
+
+    def discover(directory):
+        for name in ("ok", "missing"):
+            manager.register_plugin(_Plugin({"name": name, "version": "1.0.0"}))
+
+    monkeypatch.setattr(manager, "_discover_plugins_in_directory", discover)
+    manager.discover_plugins()
+    manager.load_plugins()
+    assert list(manager.get_all_plugins()) == ["ok"]
+    assert manager.discover_plugins() == ["ok"]
+    assert list(manager.get_available_plugins()) == ["ok"]
+
+
+def test_available_plugins_rechecked_after_ttl(monkeypatch):
+    import core.plugin_manager as plugin_manager_module
+    manager = PluginManager()
+    installed = {"demo": True}
+    now = [1000.0]
+    monkeypatch.setattr(plugin_manager_module.time, "monotonic", lambda: now[0])
+
+    class _Plugin(PluginProxy):
+        def is_available(self):
+            return installed[self.name]
+
+    manager.register_plugin(_Plugin({"name": "demo", "version": "1.0.0"}))
+    assert list(manager.get_available_plugins()) == ["demo"]
+    installed["demo"] = False
+    now[0] += manager.AVAILABLE_CACHE_TTL / 2
+    assert list(manager.get_available_plugins()) == ["demo"]
+    now[0] += manager.AVAILABLE_CACHE_TTL
+    assert manager.get_available_plugins() == {}
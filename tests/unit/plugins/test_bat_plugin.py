@@ -10,10 +10,25 @@ import time
 # 添加專案根目錄到路徑  
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
 
-from tools.bat.bat_model import BatModel
+import subprocess
+
+import pytest
+
+from tools.bat.bat_model import (BatModel, reset_raw_cache, _ansi_to_html_fragment,
+                                 _file_has_long_line, _text_has_long_line)
 from tools.bat.plugin import BatPlugin
 
 
+PROJECT_ROOT = os.path.join(os.path.dirname(__file__), "../../..")
+
+
+def _require_bat(model: BatModel):
+    """bat 不可用時略過需要實際執行 bat 的測試"""
+    available, _, error = model.check_bat_availability()
+    if not available:
+        pytest.skip(f"bat 不可用: {error}")
+
+
 def test_bat_availability():
     """測試 bat 工具可用性"""
     print("=" * 60)
@@ -23,14 +38,15 @@ def test_bat_availability():
     model = BatModel()
     available, version, error = model.check_bat_availability()
     
+    # 可用時必須回報版本，不可用時必須說明原因
     if available:
         print(f"✓ bat 工具可用")
         print(f"  版本信息: {version}")
-        return True
+        assert version and not error
     else:
         print(f"✗ bat 工具不可用")
         print(f"  錯誤信息: {error}")
-        return False
+        assert error
 
 
 def test_theme_and_language_support():
@@ -40,6 +56,7 @@ def test_theme_and_language_support():
     print("=" * 60)
     
     model = BatModel()
+    _require_bat(model)
     
     # 測試獲取主題列表
     print("獲取可用主題...")
@@ -59,7 +76,8 @@ def test_theme_and_language_support():
     else:
         print("✗ 無法獲取語言列表")
     
-    return len(themes) > 0 and len(languages) > 0
+    assert themes, "無法獲取主題列表"
+    assert languages, "無法獲取語言列表"
 
 
 def test_file_highlighting():
@@ -69,39 +87,28 @@ def test_file_highlighting():
     print("=" * 60)
     
     model = BatModel()
+    _require_bat(model)
     
     # 使用專案中的現有檔案進行測試
     test_files = [
-        "D:\\ClaudeCode\\projects\\cli_tool\\test_final_result.py",
-        "D:\\ClaudeCode\\projects\\cli_tool\\tools\\bat\\bat_model.py",
-        "D:\\ClaudeCode\\projects\\cli_tool\\config\\cli_tool_config.json"
+        os.path.join(PROJECT_ROOT, "tools", "bat", "bat_model.py"),
+        os.path.join(PROJECT_ROOT, "config", "cli_tool_config.json"),
     ]
     
-    results = []
-    
     for test_file in test_files:
-        if os.path.exists(test_file):
-            print(f"\n測試檔案: {os.path.basename(test_file)}")
-            
-            start_time = time.time()
-            success, html_content, error = model.highlight_file(
-                test_file, "Monokai Extended", True, True, 4, False, None, False
-            )
-            end_time = time.time()
-            
-            if success:
-                print(f"  ✓ 高亮成功")
-                print(f"  ✓ HTML 長度: {len(html_content)} 字符")
-                print(f"  ✓ 處理時間: {end_time - start_time:.2f} 秒")
-                print(f"  ✓ 包含 HTML 標籤: {'<div' in html_content}")
-                results.append(True)
-            else:
-                print(f"  ✗ 高亮失敗: {error}")
-                results.append(False)
-        else:
-            print(f"\n跳過不存在的檔案: {test_file}")
-    
-    return all(results) if results else False
+        print(f"\n測試檔案: {os.path.basename(test_file)}")
+        
+        start_time = time.time()
+        success, html_content, error = model.highlight_file(
+            test_file, "Monokai Extended", True, True, 4, False, None, False
+        )
+        end_time = time.time()
+        
+        assert success, f"{os.path.basename(test_file)} 高亮失敗: {error}"
+        print(f"  ✓ 高亮成功")
+        print(f"  ✓ HTML 長度: {len(html_content)} 字符")
+        print(f"  ✓ 處理時間: {end_time - start_time:.2f} 秒")
+        assert '<div' in html_content
 
 
 def test_text_highlighting():
@@ -111,6 +118,7 @@ def test_text_highlighting():
     print("=" * 60)
     
     model = BatModel()
+    _require_bat(model)
     
     # 測試不同語言的代碼片段
     test_cases = [
@@ -141,8 +149,6 @@ helloWorld();
 """)
     ]
     
-    results = []
-    
     for language, code in test_cases:
         print(f"\n測試 {language.upper()} 高亮...")
         
@@ -152,16 +158,10 @@ helloWorld();
         )
         end_time = time.time()
         
-        if success:
-            print(f"  ✓ {language} 高亮成功")
-            print(f"  ✓ HTML 長度: {len(html_content)} 字符")
-            print(f"  ✓ 處理時間: {end_time - start_time:.2f} 秒")
-            results.append(True)
-        else:
-            print(f"  ✗ {language} 高亮失敗: {error}")
-            results.append(False)
-    
-    return all(results)
+        assert success, f"{language} 高亮失敗: {error}"
+        print(f"  ✓ {language} 高亮成功")
+        print(f"  ✓ HTML 長度: {len(html_content)} 字符")
+        print(f"  ✓ 處理時間: {end_time - start_time:.2f} 秒")
 
 
 def test_cache_functionality():
@@ -171,6 +171,7 @@ def test_cache_functionality():
     print("=" * 60)
     
     model = BatModel()
+    _require_bat(model)
     
     # 清除現有快取
     model.clear_cache()
@@ -192,9 +193,7 @@ print(fibonacci(10))
     )
     time1 = time.time() - start_time
     
-    if not success1:
-        print(f"✗ 第一次渲染失敗: {error1}")
-        return False
+    assert success1, f"第一次渲染失敗: {error1}"
     
     # 第二次渲染（使用快取）
     print("第二次渲染（使用快取）...")
@@ -204,27 +203,677 @@ print(fibonacci(10))
     )
     time2 = time.time() - start_time
     
-    if not success2:
-        print(f"✗ 第二次渲染失敗: {error2}")
-        return False
+    assert success2, f"第二次渲染失敗: {error2}"
     
     # 檢查快取效果
-    if html1 == html2:
-        speedup = time1 / time2 if time2 > 0 else 0
-        print(f"✓ 快取功能正常")
-        print(f"✓ 第一次時間: {time1:.3f} 秒")
-        print(f"✓ 第二次時間: {time2:.3f} 秒")
-        print(f"✓ 提速倍數: {speedup:.1f}x")
-        
-        # 檢查快取信息
-        cache_info = model.get_cache_info()
-        print(f"✓ 快取項目數: {cache_info.get('total_entries', 0)}")
-        print(f"✓ 快取大小: {cache_info.get('total_size_mb', 0)} MB")
-        
-        return True
-    else:
-        print("✗ 快取內容不一致")
-        return False
+    assert html1 == html2, "快取內容不一致"
+    speedup = time1 / time2 if time2 > 0 else 0
+    print(f"✓ 快取功能正常")
+    print(f"✓ 第一次時間: {time1:.3f} 秒")
+    print(f"✓ 第二次時間: {time2:.3f} 秒")
+    print(f"✓ 提速倍數: {speedup:.1f}x")
+    
+    # 檢查快取信息
+    cache_info = model.get_cache_info()
+    print(f"✓ 快取項目數: {cache_info.get('total_entries', 0)}")
+    print(f"✓ 快取大小: {cache_info.get('total_size_mb', 0)} MB")
+    assert cache_info.get('total_entries', 0) >= 1
+
+
+def test_highlight_files_preserves_order(monkeypatch):
+    """測試批次高亮結果與輸入順序一致"""
+    model = BatModel()
+    monkeypatch.setattr(model, "highlight_file",
+                        lambda path, **options: (True, path, options.get("theme", "")))
+    
+    paths = [f"file{i}.py" for i in range(10)]
+    results = model.highlight_files(paths, theme="GitHub")
+    assert [html for _, html, _ in results] == paths
+    assert all(theme == "GitHub" for _, _, theme in results)
+    assert model.highlight_files([]) == []
+
+
+def test_text_cache_key_covers_whole_text():
+    """測試文本中段的等長修改也會產生不同的快取鍵"""
+    model = BatModel()
+    original = "a" * 1000
+    edited = "a" * 499 + "b" + "a" * 500
+    options = ("python", "Monokai Extended", True, 4, False)
+    
+    assert model._generate_text_cache_key(original, *options) == model._generate_text_cache_key(original, *options)
+    assert model._generate_text_cache_key(original, *options) != model._generate_text_cache_key(edited, *options)
+
+
+def test_cache_evicts_least_recently_used():
+    """測試快取超出大小上限時淘汰最久未使用的項目，並維持總大小計數"""
+    model = BatModel()
+    model.max_cache_size = 30
+    model._cache_result("a", "x" * 10)
+    model._cache_result("b", "y" * 10)
+    model._cache_result("c", "z" * 10)
+    assert model._get_cached_result("a") == "x" * 10
+    
+    model._cache_result("d", "w" * 10)
+    assert list(model.cache) == ["c", "a", "d"]
+    assert model.get_cache_info()["total_size_bytes"] == 30
+    
+    model.clear_cache()
+    assert model.get_cache_info()["total_size_bytes"] == 0
+
+
+def test_raw_output_shared_between_models(monkeypatch):
+    """測試相同文本與參數的 bat 輸出跨模型實例重用，重置後重新執行"""
+    calls = []
+    
+    def fake_run_bat(self, cmd, input_text=None, on_process=None):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="\x1b[31mprint\x1b[0m", stderr="")
+    
+    monkeypatch.setattr(BatModel, "_run_bat", fake_run_bat)
+    reset_raw_cache()
+    
+    first = BatModel().highlight_text("print()", "python")
+    second = BatModel().highlight_text("print()", "python")
+    assert first == second and first[0]
+    assert len(calls) == 1
+    
+    reset_raw_cache()
+    BatModel().highlight_text("print()", "python")
+    assert len(calls) == 2
+    reset_raw_cache()
+
+
+def test_long_line_detection(tmp_path):
+    """測試文本與檔案的超長單行偵測，跨讀取區塊的長行也能找到"""
+    assert not _text_has_long_line("short\nlines\n", 100)
+    assert _text_has_long_line("a\n" + "x" * 101 + "\nb", 100)
+    
+    normal = tmp_path / "normal.txt"
+    normal.write_text("line\n" * 50000)
+    assert not _file_has_long_line(str(normal), normal.stat().st_size, 100)
+    
+    minified = tmp_path / "minified.json"
+    minified.write_text("line\n" * 20000 + "x" * 200000 + "\nend\n")
+    size = minified.stat().st_size
+    assert _file_has_long_line(str(minified), size, 100000)
+    assert not _file_has_long_line(str(minified), size, 300000)
+
+
+def test_worker_cancel_kills_running_process(qapp):
+    """測試取消工作線程時直接終止執行中的程序，且不送出過期結果"""
+    from tools.bat.bat_controller import TextHighlightWorker
+    
+    model = BatModel()
+    slow_cmd = [sys.executable, "-c", "import time; time.sleep(30)"]
+    model.highlight_text = lambda *args, on_process=None, **kwargs: (
+        model._run_bat(slow_cmd, on_process=on_process).returncode == 0, "", "")
+    
+    worker = TextHighlightWorker(model, "x", "python", "Monokai Extended", True, 4, False, False)
+    emitted = []
+    worker.highlight_completed.connect(lambda *result: emitted.append(result))
+    worker.start()
+    
+    deadline = time.monotonic() + 10
+    while worker._process is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert worker._process is not None
+    
+    worker.cancel()
+    assert worker.wait(5000)
+    assert worker._process.returncode is not None
+    qapp.processEvents()
+    assert emitted == []
+
+
+def test_capabilities_probed_once(monkeypatch):
+    """測試版本與主題清單只執行一次 bat，清除快取後重新偵測"""
+    import tools.bat.bat_model as bat_model
+    
+    calls = []
+    monkeypatch.setattr(bat_model, "_CAPABILITIES", {})
+    
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[1])
+        return subprocess.CompletedProcess(cmd, 0, stdout="bat 0.24.0\nDracula\n", stderr="")
+    
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    model = BatModel()
+    model.executable_path = "fake-bat-for-capabilities"
+    
+    assert model.check_bat_availability() == (True, "bat 0.24.0\nDracula", "")
+    other = BatModel()
+    other.executable_path = model.executable_path
+    assert other.check_bat_availability()[0]
+    model.get_available_themes().append("mutated")
+    assert model.get_available_themes() == ["bat 0.24.0", "Dracula"]
+    assert calls == ["--version", "--list-themes"]
+    
+    model.clear_cache()
+    model.check_bat_availability()
+    assert calls[-1] == "--version" and len(calls) == 3
+    model.invalidate_capabilities()
+
+
+def test_run_bat_streams_large_input():
+    """測試大段輸入分塊寫入 stdin 後輸出完整，程序提前結束時不會因管道中斷而失敗"""
+    model = BatModel()
+    text = "héllo wörld\n" * 50000
+    echo_cmd = [sys.executable, "-c",
+                "import shutil, sys; shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer)"]
+    
+    result = model._run_bat(echo_cmd, text)
+    assert result.returncode == 0
+    assert result.stdout == text
+    
+    early_exit = model._run_bat([sys.executable, "-c", "import sys; sys.exit(3)"], text)
+    assert early_exit.returncode == 3
+
+
+def test_ansi_fragment_merges_spans_and_escapes():
+    """測試 SGR 轉換會跳脫 HTML、合併空白到目前的 span，並對非 SGR 序列回退"""
+    ansi = ("\x1b[1;38;2;249;38;114mdef\x1b[0m\x1b[38;2;248;248;242m \x1b[0m"
+            "\x1b[38;5;148mf<x>\x1b[0m\x1b[48;5;22m \x1b[0m&")
+    assert _ansi_to_html_fragment(ansi) == (
+        '<span style="font-weight: bold; color: #f92672">def </span>'
+        '<span style="color: #afd700">f&lt;x&gt;</span>'
+        '<span style="background: #005f00"> </span>&amp;'
+    )
+    assert _ansi_to_html_fragment("plain text") == "plain text"
+    assert _ansi_to_html_fragment("\x1b]8;;https://example.com\x1b\\link") is None
+
+
+def test_concurrent_identical_requests_run_bat_once(monkeypatch):
+    """測試同一份輸入的並行請求只執行一次 bat，其餘等待並共用結果"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    
+    calls = []
+    release = threading.Event()
+    
+    def slow_run_bat(self, cmd, input_text=None, on_process=None):
+        calls.append(cmd)
+        release.wait(5)
+        return subprocess.CompletedProcess(cmd, 0, stdout="\x1b[31mx\x1b[0m", stderr="")
+    
+    monkeypatch.setattr(BatModel, "_run_bat", slow_run_bat)
+    reset_raw_cache()
+    model = BatModel()
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(model.highlight_text, "x = 1", "python") for _ in range(4)]
+        time.sleep(0.2)
+        release.set()
+        results = [future.result() for future in futures]
+    
+    assert len(calls) == 1
+    assert all(result == results[0] and result[0] for result in results)
+    assert model._inflight == {}
+    reset_raw_cache()
+
+
+def test_warm_up_runs_once_per_executable(monkeypatch):
+    """測試同一個執行檔只在第一次建立模型時背景預熱"""
+    import tools.bat.bat_model as bat_model
+    
+    warmed = []
+    monkeypatch.setattr(bat_model, "_WARMED_UP", set())
+    monkeypatch.setattr(bat_model, "_warm_up_bat", warmed.append)
+    
+    first = BatModel()
+    BatModel()
+    deadline = time.monotonic() + 5
+    while not warmed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert warmed == [first.executable_path]
+
+
+def test_cache_stores_body_without_wrapper(monkeypatch):
+    """測試快取只保存 HTML 內文，命中時回傳與首次相同的完整 HTML"""
+    monkeypatch.setattr(BatModel, "_run_bat", lambda self, cmd, input_text=None, on_process=None:
+                        subprocess.CompletedProcess(cmd, 0, stdout="\x1b[31mx\x1b[0m", stderr=""))
+    reset_raw_cache()
+    model = BatModel()
+    
+    first = model.highlight_text("x", "python")
+    entry = next(iter(model.cache.values()))
+    assert entry["content"] == '<span style="color: #aa0000">x</span>'
+    assert model.get_cache_info()["total_size_bytes"] == len(entry["content"])
+    assert model.highlight_text("x", "python") == first
+    assert first[1].startswith("<div")
+    reset_raw_cache()
+
+
+def test_worker_passes_html_by_reference(qapp):
+    """測試工作線程跨線程送出的 HTML 是同一個字串物件，沒有經過複製"""
+    from tools.bat.bat_controller import FileHighlightWorker
+    
+    html = "<div>" + "x" * 100000 + "</div>"
+    model = BatModel()
+    model.highlight_file = lambda *args, **kwargs: (True, html, "")
+    
+    worker = FileHighlightWorker(model, "demo.py", "Monokai Extended", True, False, 4, False, "", False)
+    received = []
+    worker.highlight_completed.connect(lambda success, content, error: received.append(content))
+    worker.start()
+    assert worker.wait(5000)
+    qapp.processEvents()
+    assert len(received) == 1 and received[0] is html
+
+
+def test_controller_drops_results_from_replaced_worker(qapp, monkeypatch):
+    """測試已被新請求取代的工作線程，其排在佇列中的結果與錯誤都不會顯示"""
+    from tools.bat.bat_controller import BatController, TextHighlightWorker
+    from tools.bat.bat_view import BatView
+    
+    model = BatModel()
+    model.highlight_file = lambda file_path, *args, **kwargs: (True, f"content of {file_path}", "")
+    view = BatView()
+    shown = []
+    monkeypatch.setattr(view, "display_file_content", shown.append)
+    controller = BatController(view, model)
+    
+    args = ("Monokai Extended", True, False, 4, False, "", False)
+    controller._handle_file_highlight_request("old.py", *args)
+    assert controller.file_highlight_worker.wait(5000)
+    controller._handle_file_highlight_request("new.py", *args)
+    assert controller.file_highlight_worker.wait(5000)
+    qapp.processEvents()
+    assert shown == ["content of new.py"]
+    controller.cleanup()
+    
+    def failing_highlight(*args, **kwargs):
+        raise RuntimeError("bat crashed")
+    
+    model.highlight_text = failing_highlight
+    worker = TextHighlightWorker(model, "x", "python", "Monokai Extended", True, 4, False, False)
+    emitted = []
+    worker.highlight_completed.connect(lambda *result: emitted.append(result))
+    worker.cancel()
+    worker.run()
+    assert emitted == []
+
+
+def test_repeated_text_request_skips_cache_key(monkeypatch):
+    """測試同一個文本物件的重複請求直接命中單格快取，不重新計算快取鍵"""
+    monkeypatch.setattr(BatModel, "_run_bat", lambda self, cmd, input_text=None, on_process=None:
+                        subprocess.CompletedProcess(cmd, 0, stdout="x", stderr=""))
+    reset_raw_cache()
+    model = BatModel()
+    text = "print('hello')"
+    first = model.highlight_text(text, "python")
+    
+    keys = []
+    monkeypatch.setattr(model, "_generate_text_cache_key", lambda *args: keys.append(args) or "key")
+    assert model.highlight_text(text, "python") == first
+    assert keys == []
+    
+    model.highlight_text(text, "python", theme="GitHub")
+    assert len(keys) == 1
+    model.clear_cache()
+    model.highlight_text(text, "python", theme="GitHub")
+    assert len(keys) == 2
+    reset_raw_cache()
+
+
+def test_chunked_renderer_appends_in_idle_ticks(qapp):
+    """測試大型輸出先同步寫入第一段，其餘在事件迴圈中補齊後才發出 finished"""
+    from tools.bat.bat_view import ChunkedAnsiRenderer, create_code_display
+    from PyQt5.QtGui import QTextCursor
+    
+    display = create_code_display()
+    renderer = ChunkedAnsiRenderer(display)
+    renderer.CHUNK_CHARS = 100
+    finished = []
+    renderer.finished.connect(lambda: finished.append(True))
+    
+    lines = [f"\x1b[3{i % 8}mline {i}\x1b[0m" for i in range(200)]
+    renderer.start("\n".join(lines) + "\n")
+    assert renderer.is_running() and not finished
+    assert 0 < display.blockCount() < 200
+    
+    deadline = time.monotonic() + 5
+    while renderer.is_running() and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert finished == [True]
+    assert display.toPlainText() == "\n".join(f"line {i}" for i in range(200))
+    
+    first_document = display.document()
+    renderer.start("\x1b[1;38;2;249;38;114mdef\x1b[0m f():\n\x1b]8;;x\x1b\\  pass\n")
+    assert not renderer.is_running() and finished == [True, True]
+    assert display.toPlainText() == "def f():\n  pass"
+    assert display.isReadOnly()
+    assert display.document() is not first_document
+    assert display.document().maximumBlockCount() == display.maximumBlockCount()
+    
+    # ANSI 樣式以文字格式片段寫入純文字顯示區，不經過 HTML
+    cursor = QTextCursor(display.document())
+    cursor.setPosition(1)
+    char_format = cursor.charFormat()
+    assert char_format.foreground().color().name() == "#f92672"
+    assert char_format.font().bold()
+
+
+def _wait_for_path_checks(qapp, view):
+    """等待視圖的背景路徑檢查全部回到 GUI 執行緒"""
+    deadline = time.monotonic() + 5
+    while view._stat_callbacks and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert not view._stat_callbacks
+
+
+def test_view_reuses_output_until_file_changes(qapp, tmp_path):
+    """測試同一檔案與設定重複高亮時由視圖快取直接顯示，檔案修改後重新請求"""
+    from tools.bat.bat_view import BatView
+    
+    sample = tmp_path / "sample.py"
+    sample.write_text("x = 1\n")
+    view = BatView()
+    view.recent_files_combo.addItem(str(sample))
+    view.recent_files_combo.setCurrentText(str(sample))
+    requests = []
+    view.file_highlight_requested.connect(lambda *args: requests.append(args))
+    
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    view.display_file_content("\x1b[31mx = 1\x1b[0m\n")
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    assert len(requests) == 1
+    assert view.file_display.toPlainText() == "x = 1"
+    assert view.status_label.text() == "檔案已顯示 (1 行)"
+    
+    sample.write_text("x = 22\n")
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    assert len(requests) == 2
+    view.display_file_content("x = 22\n")
+    assert len(view._render_cache) == 2
+    view.deleteLater()
+
+
+def test_view_cache_hit_cancels_pending_highlight(qapp, tmp_path):
+    """測試未命中的高亮仍在執行時，之後命中視圖快取會取消它，較晚的結果不會覆蓋畫面"""
+    import threading
+    from tools.bat.bat_controller import BatController
+    from tools.bat.bat_view import BatView
+    
+    sample = tmp_path / "sample.py"
+    sample.write_text("x = 1\n")
+    release = threading.Event()
+    outputs = iter(["first\n", "late\n"])
+    
+    def highlight_file(*args, **kwargs):
+        output = next(outputs)
+        if output == "late\n":
+            release.wait(5)
+        return True, output, ""
+    
+    model = BatModel()
+    model.highlight_file = highlight_file
+    view = BatView()
+    controller = BatController(view, model)
+    view.recent_files_combo.addItem(str(sample))
+    view.recent_files_combo.setCurrentText(str(sample))
+    
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    assert controller.file_highlight_worker.wait(5000)
+    qapp.processEvents()
+    assert view.file_display.toPlainText() == "first"
+    
+    view.tab_width_spin.setValue(8)
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    slow_worker = controller.file_highlight_worker
+    assert slow_worker is not None
+    
+    view.tab_width_spin.setValue(4)
+    view._request_file_highlight()
+    _wait_for_path_checks(qapp, view)
+    assert slow_worker.is_cancelled()
+    release.set()
+    assert slow_worker.wait(5000)
+    qapp.processEvents()
+    assert view.file_display.toPlainText() == "first"
+    controller.cleanup()
+    view.deleteLater()
+
+
+def test_recent_file_change_is_debounced(qapp, tmp_path, monkeypatch):
+    """測試連續輸入最近檔案路徑時只在停止輸入後檢查一次"""
+    from tools.bat.bat_view import BatView
+    
+    sample = tmp_path / "sample.py"
+    sample.write_text("x = 1\n")
+    view = BatView()
+    checked = []
+    stat_path_async = view._stat_path_async
+    view._stat_path_async = lambda path, callback: checked.append(path) or stat_path_async(path, callback)
+    
+    path = str(sample)
+    for end in range(1, len(path) + 1):
+        view._on_recent_file_changed(path[:end])
+    assert checked == [] and view.current_file != path
+    
+    deadline = time.monotonic() + 5
+    while view._recent_debounce.isActive() and time.monotonic() < deadline:
+        qapp.processEvents()
+    _wait_for_path_checks(qapp, view)
+    assert checked == [path]
+    assert view.current_file == path
+    view.deleteLater()
+
+
+def test_missing_file_checked_off_ui_thread(qapp, tmp_path):
+    """測試檔案不存在時由背景檢查回報，不發出高亮請求並結束處理狀態"""
+    from tools.bat.bat_view import BatView
+    
+    view = BatView()
+    missing = str(tmp_path / "missing.py")
+    view.recent_files_combo.setCurrentText(missing)
+    messages, requests = [], []
+    view._show_message = messages.append
+    view.file_highlight_requested.connect(lambda *args: requests.append(args))
+    
+    view._request_file_highlight()
+    assert messages == [] and not view.highlight_file_btn.isEnabled()
+    _wait_for_path_checks(qapp, view)
+    assert messages == [f"檔案不存在: {missing}"]
+    assert requests == [] and view.highlight_file_btn.isEnabled()
+    view.deleteLater()
+
+
+def test_combos_populated_in_one_pass(qapp):
+    """測試主題與語言下拉框批次填入後顯示文字、資料與預設選擇都正確"""
+    from tools.bat.bat_view import BatView, BAT_THEMES, COMMON_LANGUAGES
+    
+    view = BatView()
+    assert view.theme_combo.count() == len(BAT_THEMES)
+    assert view.theme_combo.currentData() == "Monokai Extended"
+    assert view.language_combo.count() == len(COMMON_LANGUAGES) + 1
+    assert view.language_combo.itemData(0) == ""
+    assert view.language_combo.itemText(1) == "Python"
+    assert view.text_language_combo.currentData() == "python"
+    assert [view.text_language_combo.itemData(i) for i in range(view.text_language_combo.count())] \
+        == [value for _, value in COMMON_LANGUAGES]
+    
+    view._set_theme_selection("Nord")
+    assert view.theme_combo.currentData() == "Nord"
+    view._set_theme_selection("不存在的主題")
+    assert view.theme_combo.currentData() == "Nord"
+    view.deleteLater()
+
+
+def test_recent_files_refresh_does_not_recheck_paths(qapp, tmp_path, monkeypatch):
+    """測試重建最近檔案下拉框時不觸發路徑檢查，顯示名稱只計算一次"""
+    from tools.bat.bat_view import BatView
+    
+    view = BatView()
+    changed = []
+    view.recent_files_combo.currentTextChanged.connect(changed.append)
+    paths = [str(tmp_path / f"file{i}.py") for i in range(3)]
+    for path in paths:
+        view._add_to_recent_files(path)
+    assert changed == []
+    assert list(view.recent_files) == paths[::-1]
+    assert view.recent_files_combo.itemText(0) == "file2.py"
+    assert view.recent_files_combo.itemData(2) == paths[0]
+    
+    basenames = []
+    monkeypatch.setattr(os.path, "basename", lambda path: basenames.append(path) or "x")
+    view._update_recent_files_combo()
+    assert basenames == []
+    monkeypatch.undo()
+    
+    view._add_to_recent_files(paths[0])
+    assert list(view.recent_files) == [paths[0], paths[2], paths[1]]
+    more = [str(tmp_path / f"more{i}.py") for i in range(view.max_recent_files)]
+    for path in more:
+        view._add_to_recent_files(path)
+    assert list(view.recent_files) == more[::-1]
+    assert set(view._recent_file_names) == set(more)
+    view.deleteLater()
+
+
+def test_default_theme_from_config(qapp, monkeypatch):
+    """測試主題下拉框的預設值取自設定檔，未知主題退回內建預設"""
+    from config.config_manager import config_manager
+    from tools.bat.bat_view import BatView, DEFAULT_THEME
+    
+    real_get = config_manager.get
+    configured = {"tools.bat.default_theme": "Nord"}
+    monkeypatch.setattr(config_manager, "get",
+                        lambda key, default=None: configured.get(key, real_get(key, default)))
+    view = BatView()
+    assert view.theme_combo.currentData() == "Nord"
+    view.deleteLater()
+    
+    configured["tools.bat.default_theme"] = "不存在的主題"
+    view = BatView()
+    assert view.theme_combo.currentData() == DEFAULT_THEME
+    view.deleteLater()
+
+
+def test_file_open_checks_extension_case_insensitively(monkeypatch):
+    """測試開啟檔案時副檔名以集合比對且不分大小寫"""
+    plugin = BatPlugin()
+    opened = []
+    monkeypatch.setattr(plugin, "is_initialized", lambda: True)
+    plugin._view = type("_View", (), {"_set_file_path": lambda self, path: opened.append(path)})()
+    plugin._controller = object()
+    
+    assert plugin.handle_file_open("/tmp/Script.PY")
+    assert plugin.handle_file_open("/tmp/analysis.R")
+    assert not plugin.handle_file_open("/tmp/archive.zip")
+    assert not plugin.handle_file_open("/tmp/python")
+    assert opened == ["/tmp/Script.PY", "/tmp/analysis.R"]
+    assert plugin.get_supported_file_types()[0] == ".py"
+
+
+def test_tool_availability_cached_with_ttl(monkeypatch):
+    """測試工具可用性檢查在有效期內沿用結果，過期後重新檢查"""
+    checks = []
+    monkeypatch.setattr(BatModel, "check_bat_availability",
+                        lambda self: checks.append(self) or (False, "", "missing"))
+    monkeypatch.setattr(BatPlugin, "_tool_check_cache", None)
+    plugin = BatPlugin()
+    plugin._model = BatModel()
+    
+    assert not plugin.check_tools_availability()
+    assert not plugin.check_tools_availability()
+    assert checks == [plugin._model]
+    
+    monkeypatch.setattr(BatPlugin, "TOOL_CHECK_TTL", 0.0)
+    plugin.check_tools_availability()
+    assert len(checks) == 2
+
+
+def test_initialize_defers_view_until_widget_requested(qapp):
+    """測試初始化只建立模型，視圖在取得 widget 時才建立並套用先前的設定"""
+    plugin = BatPlugin()
+    assert plugin.initialize()
+    assert plugin._model is not None
+    assert plugin._view is None and plugin._controller is None
+    assert plugin.get_settings()["theme"] == "Monokai Extended"
+    
+    plugin.apply_settings({"theme": "Nord", "tab_width": 8})
+    assert plugin.get_settings()["theme"] == "Nord"
+    
+    widget = plugin.get_widget()
+    assert widget is plugin._view and plugin._controller is not None
+    assert widget.theme_combo.currentData() == "Nord"
+    assert widget.tab_width_spin.value() == 8
+    assert plugin.get_settings() == widget.snapshot_settings()
+    assert plugin.get_settings()["tab_width"] == 8
+    assert plugin.get_widget() is widget
+    
+    assert plugin.execute_command("set_theme", {"theme": "Dracula"}) == {"status": "theme_set_to_Dracula"}
+    assert widget.theme_combo.currentData() == "Dracula"
+    assert plugin.execute_command("open_file") == {"error": "No file path provided"}
+    assert plugin.execute_command("nope") == {"error": "Unknown command: nope"}
+    plugin.cleanup()
+
+
+def test_partial_pending_settings_keep_defaults(qapp, monkeypatch):
+    """測試視圖建立前只套用部分設定時，其餘設定仍以預設值回報，主題預設值取自設定檔"""
+    from config.config_manager import config_manager
+    
+    real_get = config_manager.get
+    monkeypatch.setattr(config_manager, "get",
+                        lambda key, default=None: "Dracula" if key == "tools.bat.default_theme"
+                        else real_get(key, default))
+    plugin = BatPlugin()
+    assert plugin.initialize()
+    keys = {"theme", "show_line_numbers", "show_git_modifications", "tab_width",
+            "wrap_text", "use_cache", "recent_files"}
+    assert set(plugin.get_settings()) == keys
+    assert plugin.get_settings()["theme"] == "Dracula"
+    
+    plugin.apply_settings({"tab_width": 8})
+    settings = plugin.get_settings()
+    assert set(settings) == keys
+    assert settings["tab_width"] == 8 and settings["theme"] == "Dracula"
+    assert settings["show_line_numbers"] is True and settings["use_cache"] is True
+    plugin.cleanup()
+
+
+def test_pending_settings_merge_across_calls(qapp, monkeypatch):
+    """測試視圖建立前多次套用設定會合併，建立視圖時全部生效且不覆蓋未指定的項目"""
+    from config.config_manager import config_manager
+    
+    real_get = config_manager.get
+    monkeypatch.setattr(config_manager, "get",
+                        lambda key, default=None: "Dracula" if key == "tools.bat.default_theme"
+                        else real_get(key, default))
+    plugin = BatPlugin()
+    assert plugin.initialize()
+    plugin.apply_settings({"wrap_text": True})
+    plugin.apply_settings({"tab_width": 8})
+    settings = plugin.get_settings()
+    assert settings["wrap_text"] is True and settings["tab_width"] == 8
+    
+    widget = plugin.get_widget()
+    assert widget.wrap_text_check.isChecked()
+    assert widget.tab_width_spin.value() == 8
+    assert widget.theme_combo.currentData() == "Dracula"
+    plugin.cleanup()
+
+
+def test_pending_settings_applied_to_main_window_view(qapp):
+    """測試主窗口以 create_model/create_view/create_controller 建立元件時，暫存的設定同樣生效"""
+    plugin = BatPlugin()
+    assert plugin.initialize()
+    plugin.apply_settings({"tab_width": 8, "theme": "Nord"})
+    
+    model = plugin.create_model()
+    view = plugin.create_view()
+    plugin.create_controller(model, view)
+    settings = plugin.get_settings()
+    assert settings["tab_width"] == 8 and settings["theme"] == "Nord"
+    assert plugin._pending_settings is None
+    assert plugin.get_widget() is view
+    plugin.cleanup()
 
 
 def test_plugin_interface():
@@ -247,21 +896,19 @@ def test_plugin_interface():
     print(f"工具可用性: {'✓ 可用' if available else '✗ 不可用'}")
     
     # 測試插件初始化
-    init_success = plugin.initialize()
-    print(f"插件初始化: {'✓ 成功' if init_success else '✗ 失敗'}")
-    
-    if init_success:
-        print(f"插件已初始化: {'✓ 是' if plugin.is_initialized() else '✗ 否'}")
-        
-        # 測試狀態信息
-        status_info = plugin.get_status_info()
-        print(f"狀態信息: {status_info}")
-        
-        # 清理插件
-        plugin.cleanup()
-        print("✓ 插件清理完成")
-    
-    return available and init_success
+    assert plugin.initialize(), "插件初始化失敗"
+    assert plugin.is_initialized()
+    
+    # 測試狀態信息
+    status_info = plugin.get_status_info()
+    print(f"狀態信息: {status_info}")
+    assert status_info["initialized"] is True
+    assert status_info["tool_available"] == available
+    
+    # 清理插件
+    plugin.cleanup()
+    assert not plugin.is_initialized()
+    print("✓ 插件清理完成")
 
 
 def main():
@@ -284,8 +931,10 @@ def main():
     
     for test_name, test_func in tests:
         try:
-            result = test_func()
-            results.append((test_name, result))
+            test_func()
+            results.append((test_name, True))
+        except pytest.skip.Exception as e:
+            print(f"\n- {test_name} 已略過: {e}")
         except Exception as e:
             print(f"\n✗ {test_name} 測試出現異常: {e}")
             results.append((test_name, False))
@@ -5,81 +5,215 @@
 
 import sys
 import os
+import glob
+import shutil
+import re
 import subprocess
+import logging
+
+import pytest
 
 # 添加專案根目錄到 Python 路徑
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
 
 from tools.glow.glow_model import GlowModel
 
+logger = logging.getLogger(__name__)
+
+CHANGELOG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../CHANGELOG.md"))
+GLOW_BIN = shutil.which("glow")
+
+# HTML 格式檢查的標記，以單一正規表達式掃描一次找出全部
+HTML_MARKERS = ('<h1', '<h2', 'color:', 'style=')
+_HTML_MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in HTML_MARKERS))
+
+def find_html_markers(html_content):
+    """單次掃描 HTML，返回出現過的標記；全部找到後立即停止"""
+    found = set()
+    for match in _HTML_MARKER_RE.finditer(html_content):
+        found.add(match.group())
+        if len(found) == len(HTML_MARKERS):
+            break
+    return found
+
+# 會啟動 Glow 子程序的測試，並行執行時集中在同一個 worker，避免同時產生大量子程序
+glow_subprocess = pytest.mark.xdist_group(name="glow_subprocess")
+
+@glow_subprocess
+@pytest.mark.skipif(GLOW_BIN is None, reason="glow not installed")
 def test_glow_actual_output():
     """測試 Glow 實際輸出"""
-    print("=== 測試 Glow 實際命令輸出 ===")
+    logger.debug("=== 測試 Glow 實際命令輸出 ===")
+    
+    # 先確認 Glow 能在短時間內啟動，之後的渲染就可以使用較短的逾時
+    subprocess.run([GLOW_BIN, '--version'], capture_output=True, timeout=2, check=True)
     
     # 直接執行 Glow 命令
+    process = subprocess.Popen(
+        [GLOW_BIN, CHANGELOG_PATH, '--width', '80'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
     try:
-        process = subprocess.Popen(
-            ['glow', 'D:\\ClaudeCode\\projects\\cli_tool\\CHANGELOG.md', '--width', '80'],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            env=os.environ.copy()
-        )
-        stdout, stderr = process.communicate(timeout=10)
-        
-        print(f"Glow 命令執行結果:")
-        print(f"Return code: {process.returncode}")
-        print(f"輸出長度: {len(stdout)}")
-        print(f"錯誤: {stderr}")
-        print("前200字符:")
-        print(repr(stdout[:200]))
-        print("\n實際顯示:")
-        print(stdout[:500])
-        
-    except Exception as e:
-        print(f"執行 Glow 命令失敗: {e}")
+        # 以 bytes 讀取完整輸出後一次解碼，不經過逐塊解碼的文字層
+        stdout_bytes, _ = process.communicate(timeout=3)
+    finally:
+        # 逾時等失敗情況下不留下殘餘的子程序
+        if process.poll() is None:
+            process.kill()
+            process.communicate()
+    stdout = stdout_bytes.decode('utf-8', errors='replace')
+    
+    logger.debug("Glow 命令執行結果:")
+    logger.debug("Return code: %s", process.returncode)
+    logger.debug("輸出長度: %s", len(stdout))
+    logger.debug("前200字符:")
+    logger.debug("%r", stdout[:200])
+    logger.debug("\n實際顯示:")
+    logger.debug("%s", stdout[:500])
+    
+    assert process.returncode == 0
+    assert stdout.strip()
 
+@glow_subprocess
 def test_model_conversion():
     """測試 Model 轉換"""
-    print("\n=== 測試 Model HTML 轉換 ===")
+    logger.debug("\n=== 測試 Model HTML 轉換 ===")
     
     model = GlowModel()
     
     # 測試檔案渲染
     success, html_content, error = model.render_markdown(
-        "D:\\ClaudeCode\\projects\\cli_tool\\CHANGELOG.md",
+        CHANGELOG_PATH,
         "file",
         "auto",
         80,
         False
     )
     
-    print(f"Model 渲染結果:")
-    print(f"成功: {success}")
-    print(f"HTML 長度: {len(html_content)}")
-    print(f"錯誤: {error}")
+    logger.debug("Model 渲染結果:")
+    logger.debug("成功: %s", success)
+    logger.debug("HTML 長度: %s", len(html_content))
+    logger.debug("錯誤: %s", error)
     
     if success:
-        print("HTML 前500字符:")
-        print(html_content[:500])
+        logger.debug("HTML 前500字符:")
+        logger.debug("%s", html_content[:500])
         
         # 保存到檔案
         with open("test_output.html", "w", encoding="utf-8") as f:
             f.write(html_content)
-        print("\nHTML 已保存到 test_output.html")
+        logger.debug("\nHTML 已保存到 test_output.html")
         
         # 檢查關鍵字
-        has_h1 = '<h1' in html_content
-        has_h2 = '<h2' in html_content
-        has_color = 'color:' in html_content
-        has_style = 'style=' in html_content
+        markers = find_html_markers(html_content)
+        has_h1 = '<h1' in markers
+        has_h2 = '<h2' in markers
+        has_color = 'color:' in markers
+        has_style = 'style=' in markers
         
-        print(f"\n格式檢查:")
-        print(f"包含 H1 標題: {has_h1}")
-        print(f"包含 H2 標題: {has_h2}")
-        print(f"包含顏色樣式: {has_color}")
-        print(f"包含內聯樣式: {has_style}")
+        logger.debug("\n格式檢查:")
+        logger.debug("包含 H1 標題: %s", has_h1)
+        logger.debug("包含 H2 標題: %s", has_h2)
+        logger.debug("包含顏色樣式: %s", has_color)
+        logger.debug("包含內聯樣式: %s", has_style)
+
+def test_find_html_markers_single_pass():
+    """測試單次掃描能找出所有出現的格式標記"""
+    assert find_html_markers('<h1 style="color: red">x</h1>') == {'<h1', 'style=', 'color:'}
+    assert find_html_markers('<p>plain</p>') == set()
+
+def test_render_cache_key_tracks_file_mtime(tmp_path):
+    """測試檔案修改後渲染快取鍵值會改變"""
+    model = GlowModel()
+    doc = tmp_path / "doc.md"
+    doc.write_text("# Title\n", encoding="utf-8")
+    
+    first = model.get_render_cache_key(str(doc), "file", "auto", 80)
+    assert first == model.get_render_cache_key(str(doc), "file", "auto", 80)
+    
+    stat = doc.stat()
+    os.utime(doc, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert first != model.get_render_cache_key(str(doc), "file", "auto", 80)
+
+def test_render_markdown_many_preserves_order(monkeypatch):
+    """測試批次渲染結果與輸入順序一致"""
+    model = GlowModel()
+    monkeypatch.setattr(model, "render_markdown",
+                        lambda source, *args: (True, source, ""))
+    
+    paths = [f"doc{i}.md" for i in range(10)]
+    assert [html for _, html, _ in model.render_markdown_many(paths)] == paths
+    assert model.render_markdown_many([]) == []
+
+def test_render_markdown_many_converts_each_file(monkeypatch, tmp_path):
+    """測試並行渲染時每個檔案的 ANSI 輸出各自轉換，結果不會互相混入"""
+    import tools.glow.glow_model as glow_model
+    
+    class _FakeProcess:
+        returncode = 0
+        
+        def __init__(self, command, **kwargs):
+            self.path = command[-1]
+        
+        def communicate(self, input=None, timeout=None):
+            name = os.path.basename(self.path)
+            return f"\x1b[1;3{len(name) % 8}m{name}\x1b[0m\n".encode() * 200, b""
+    
+    monkeypatch.setattr(glow_model.subprocess, "Popen", _FakeProcess)
+    model = GlowModel()
+    paths = []
+    for i in range(16):
+        path = tmp_path / f"doc{i}.md"
+        path.write_text(f"# {i}\n")
+        paths.append(str(path))
+    
+    results = model.render_markdown_many(paths, use_cache=False)
+    for path, (success, html, _) in zip(paths, results):
+        name = os.path.basename(path)
+        assert success
+        assert html.count(name) == 200
+        assert all(other == name or f">{other}<" not in html
+                   for other in map(os.path.basename, paths))
+
+def test_render_markdown_memoized_in_process(monkeypatch, tmp_path):
+    """測試相同內容重複渲染時只執行一次 Glow，清除快取後重新渲染"""
+    import tools.glow.glow_model as glow_model
+    runs = []
+    
+    class _FakeProcess:
+        returncode = 0
+        
+        def __init__(self, command, **kwargs):
+            runs.append(command)
+        
+        def communicate(self, input=None, timeout=None):
+            return b"Title\n", b""
+    
+    monkeypatch.setattr(glow_model.subprocess, "Popen", _FakeProcess)
+    model = GlowModel()
+    model.cache_dir = str(tmp_path)
+    model.clear_cache()
+    
+    first = model.render_markdown("# Title", "text")
+    assert first == model.render_markdown("# Title", "text")
+    assert len(runs) == 1
+    
+    model.clear_cache()
+    model.render_markdown("# Title", "text")
+    assert len(runs) == 2
+
+@glow_subprocess
+@pytest.mark.skipif(GLOW_BIN is None, reason="glow not installed")
+def test_render_repo_markdown_in_bulk():
+    """一次渲染專案根目錄下所有 Markdown 檔案"""
+    paths = sorted(glob.glob(os.path.join(os.path.dirname(CHANGELOG_PATH), "*.md")))
+    results = GlowModel().render_markdown_many(paths, width=80, use_cache=False)
+    
+    assert len(results) == len(paths)
+    assert all(success for success, _, _ in results)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     test_glow_actual_output()
     test_model_conversion()
\ No newline at end of file
@@ -6,56 +6,47 @@
 
 import sys
 import time
+import shutil
+import logging
 from pathlib import Path
 
+import pytest
+
 project_root = Path(__file__).parent / "../../.."
 sys.path.insert(0, str(project_root))
 
-def test_navigation():
+logger = logging.getLogger(__name__)
+
+def test_navigation(initialized_plugin_manager):
     """測試導航功能"""
-    print("Testing navigation functionality...")
+    logger.debug("Testing navigation functionality...")
+    
+    plugin_manager = initialized_plugin_manager
+    
+    logger.debug("1. Getting available plugins...")
+    available_plugins = plugin_manager.get_available_plugins()
+    logger.debug("   Available plugins: %s", list(available_plugins.keys()))
+    
+    logger.debug("2. Getting all plugins...")
+    all_plugins = plugin_manager.get_all_plugins()
+    logger.debug("   All plugins: %s", list(all_plugins.keys()))
     
-    try:
-        # 導入並初始化插件管理器
-        from core.plugin_manager import plugin_manager
-        
-        print("1. Initializing plugin manager...")
-        plugin_manager.initialize()
-        
-        print("2. Getting available plugins...")
-        available_plugins = plugin_manager.get_available_plugins()
-        print(f"   Available plugins: {list(available_plugins.keys())}")
-        
-        print("3. Getting all plugins...")
-        all_plugins = plugin_manager.get_all_plugins()
-        print(f"   All plugins: {list(all_plugins.keys())}")
-        
-        # 檢查 Glances
-        if 'glances' in available_plugins:
-            print("✅ Glances plugin found in available plugins!")
-            glances_plugin = available_plugins['glances']
-            print(f"   Name: {glances_plugin.name}")
-            print(f"   Version: {glances_plugin.version}")
-            print(f"   Description: {glances_plugin.description}")
-        else:
-            print("❌ Glances plugin NOT found in available plugins")
-            
-        if 'glances' in all_plugins:
-            print("✅ Glances plugin found in all plugins!")
-        else:
-            print("❌ Glances plugin NOT found in all plugins")
-            
-        return 'glances' in available_plugins
-        
-    except Exception as e:
-        print(f"❌ Error during navigation test: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    # 檢查 Glances（工具未安裝時插件在載入階段就會被移除）
+    if shutil.which('glances') is None:
+        pytest.skip("glances not installed")
+    assert 'glances' in available_plugins, "Glances plugin NOT found in available plugins"
+    assert 'glances' in all_plugins, "Glances plugin NOT found in all plugins"
+    glances_plugin = available_plugins['glances']
+    logger.debug("✅ Glances plugin found in available plugins!")
+    logger.debug("   Name: %s", glances_plugin.name)
+    logger.debug("   Version: %s", glances_plugin.version)
+    logger.debug("   Description: %s", glances_plugin.description)
 
 if __name__ == "__main__":
-    print("Navigation Test")
-    print("=" * 50)
-    success = test_navigation()
-    print("=" * 50)
-    print(f"Result: {'SUCCESS' if success else 'FAILED'}")
\ No newline at end of file
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    logger.debug("Navigation Test")
+    logger.debug("=" * 50)
+    from core.plugin_manager import plugin_manager
+    test_navigation(plugin_manager.ensure_initialized())
+    logger.debug("=" * 50)
+    logger.debug("Result: SUCCESS")
\ No newline at end of file
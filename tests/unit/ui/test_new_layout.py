@@ -4,128 +4,112 @@
 驗證重新設計後的 csvkit 界面
 """
 
+import os
 import sys
+import logging
 from pathlib import Path
-from PyQt5.QtWidgets import QApplication
+
+# 預設以無頭模式執行；設定 VISUAL_TEST=1 時才開啟實體窗口供目視確認
+if not os.environ.get("VISUAL_TEST"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 
 # 添加專案根目錄到 Python 路徑
 project_root = Path(__file__).parent / "../../.."
 sys.path.insert(0, str(project_root))
 
-def test_new_layout():
+logger = logging.getLogger(__name__)
+
+def test_new_layout(qapp):
     """測試新版面佈局"""
-    print("Testing new csvkit layout...")
-    
-    try:
-        from tools.csvkit.csvkit_view import CsvkitView
-        from tools.csvkit.csvkit_controller import CsvkitController
-        
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication(sys.argv)
-        
-        # 創建控制器和視圖
-        controller = CsvkitController()
-        view = controller.view
-        
-        print("SUCCESS: Controller and view created")
-        
-        # 檢查新的界面元素是否存在
-        layout_checks = [
-            ("Main result display", hasattr(view, 'result_display')),
-            ("System response display", hasattr(view, 'system_response_display')),
-            ("Save button", hasattr(view, 'save_btn')),
-            ("Display system response method", hasattr(view, 'display_system_response'))
-        ]
-        
-        all_passed = True
-        print("\nLayout component checks:")
-        for check_name, result in layout_checks:
-            status = "PASS" if result else "FAIL"
-            print(f"  {check_name}: {status}")
-            if not result:
-                all_passed = False
-        
-        # 測試系統回應功能
-        print("\nTesting system response functionality...")
-        if hasattr(view, 'display_system_response'):
-            view.display_system_response("Test success message", is_error=False)
-            print("  SUCCESS: Success message displayed")
-            
-            view.display_system_response("Test error message", is_error=True)
-            print("  SUCCESS: Error message displayed")
-        else:
-            print("  ERROR: display_system_response method not found")
-            all_passed = False
-        
-        # 測試結果顯示功能
-        print("\nTesting result display functionality...")
-        test_csv_data = """name,age,city
+    logger.debug("Testing new csvkit layout...")
+    
+    from tools.csvkit.csvkit_controller import CsvkitController
+    
+    # 創建控制器和視圖
+    controller = CsvkitController()
+    view = controller.view
+    
+    logger.debug("SUCCESS: Controller and view created")
+    
+    # 檢查新的界面元素是否存在
+    layout_checks = [
+        ("Main result display", hasattr(view, 'result_display')),
+        ("Status label", hasattr(view, 'status_label')),
+        ("Save button", hasattr(view, 'save_btn')),
+        ("Display system response method", hasattr(view, 'display_system_response'))
+    ]
+    
+    logger.debug("\nLayout component checks:")
+    for check_name, result in layout_checks:
+        logger.debug("  %s: %s", check_name, "PASS" if result else "FAIL")
+    missing = [check_name for check_name, result in layout_checks if not result]
+    assert not missing, f"Missing layout components: {missing}"
+    
+    # 測試系統回應功能（系統回應顯示在狀態列）
+    logger.debug("\nTesting system response functionality...")
+    view.display_system_response("Test success message", is_error=False)
+    assert view.status_label.text() == "Test success message"
+    logger.debug("  SUCCESS: Success message displayed")
+    
+    view.display_system_response("Test error message", is_error=True)
+    assert view.status_label.text() == "Error: Test error message"
+    logger.debug("  SUCCESS: Error message displayed")
+    
+    # 測試結果顯示功能
+    logger.debug("\nTesting result display functionality...")
+    test_csv_data = """name,age,city
 John,25,NYC
 Jane,30,LA
 Bob,35,SF"""
-        
-        view.display_result(test_csv_data)
-        print("  SUCCESS: CSV data displayed in output panel")
-        
-        # 設置窗口並顯示
-        view.setWindowTitle("csvkit - New Layout Test")
-        view.resize(1200, 800)
-        
-        print("\n" + "="*50)
-        if all_passed:
-            print("ALL LAYOUT TESTS PASSED!")
-            print("\nNew layout features:")
-            print("  ✓ Output panel moved to right side (main area)")
-            print("  ✓ System response area in left panel (below controls)")
-            print("  ✓ Improved space utilization")
-            print("  ✓ Better visual separation")
-            print("  ✓ Enhanced user experience")
-            
-            print("\nLayout changes:")
-            print("  • Left panel: Tool controls + System response")
-            print("  • Right panel: Main output display + Save button")
-            print("  • Ratio: 2:3 (left:right) for better output visibility")
-        else:
-            print("SOME LAYOUT TESTS FAILED!")
-            print("Please check the implementation.")
-        
-        # 顯示界面進行視覺驗證（5秒後自動關閉）
+    
+    view.display_result(test_csv_data)
+    
+    # 處理排隊中的信號與重繪事件
+    for _ in range(5):
+        qapp.processEvents()
+    assert "Jane" in view.result_display.toPlainText()
+    logger.debug("  SUCCESS: CSV data displayed in output panel")
+    
+    # 設置窗口並顯示
+    view.setWindowTitle("csvkit - New Layout Test")
+    view.resize(1200, 800)
+    
+    logger.debug("\n" + "=" * 50)
+    logger.debug("ALL LAYOUT TESTS PASSED!")
+    logger.debug("\nNew layout features:")
+    logger.debug("  ✓ Output panel moved to right side (main area)")
+    logger.debug("  ✓ System responses shown in the status bar")
+    logger.debug("  ✓ Improved space utilization")
+    logger.debug("  ✓ Better visual separation")
+    logger.debug("  ✓ Enhanced user experience")
+    
+    logger.debug("\nLayout changes:")
+    logger.debug("  • Left panel: Tool controls")
+    logger.debug("  • Right panel: Main output display + Save button")
+    logger.debug("  • Ratio: 2:3 (left:right) for better output visibility")
+    
+    # 需要目視確認時才顯示界面
+    if os.environ.get("VISUAL_TEST"):
         view.show()
-        print(f"\nDisplaying interface for visual verification...")
-        print("Window will close automatically in 5 seconds...")
-        
-        from PyQt5.QtCore import QTimer
-        def close_window():
-            print("Closing test window.")
-            app.quit()
-        
-        QTimer.singleShot(5000, close_window)
-        app.exec_()
-        
-        return all_passed
-        
-    except Exception as e:
-        print(f"ERROR: Layout test failed - {e}")
-        return False
+        logger.debug("\nDisplaying interface for visual verification...")
+        qapp.exec_()
 
 def main():
     """主測試函數"""
-    print("csvkit New Layout Test")
-    print("=" * 30)
-    
-    success = test_new_layout()
-    
-    print("\n" + "=" * 30)
-    if success:
-        print("🎉 New layout implementation successful!")
-        print("\nThe redesigned interface provides:")
-        print("  • Better space utilization")
-        print("  • Clearer visual separation")
-        print("  • More prominent output display")
-        print("  • Immediate status feedback")
-    else:
-        print("❌ Layout test failed. Please check implementation.")
+    logger.debug("csvkit New Layout Test")
+    logger.debug("=" * 30)
+    
+    from PyQt5.QtWidgets import QApplication
+    test_new_layout(QApplication.instance() or QApplication(sys.argv))
+    
+    logger.debug("\n" + "=" * 30)
+    logger.debug("🎉 New layout implementation successful!")
+    logger.debug("\nThe redesigned interface provides:")
+    logger.debug("  • Better space utilization")
+    logger.debug("  • Clearer visual separation")
+    logger.debug("  • More prominent output display")
+    logger.debug("  • Immediate status feedback")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     main()
\ No newline at end of file
@@ -11,10 +11,14 @@ import random
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+# 預設以無頭模式執行；設定 VISUAL_TEST=1 時才開啟實體窗口供目視確認
+if not os.environ.get("VISUAL_TEST"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QPushButton, QLabel
-from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
-from collections import deque
+from PyQt5.QtCore import Qt, QPoint, QTimer
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap, QPolygon
+from array import array
 
 class SimpleChart(QWidget):
     """簡化圖表組件 - 無調試輸出"""
@@ -22,65 +26,113 @@ class SimpleChart(QWidget):
     def __init__(self, title="Test Chart", parent=None):
         super().__init__(parent)
         self.title = title
-        self.data_points = deque(maxlen=60)  # 最多60個點
+        # 固定大小的環形緩衝區：數值連續存放，head 指向下一個寫入位置
+        self.capacity = 60  # 最多60個點
+        self._buf = array('d', [0.0]) * self.capacity
+        self._head = 0
+        self._len = 0
+        self._x_cache = (None, [])  # (left, width, 點數) -> X 座標
+        self._bg_cache = (None, None)  # (尺寸, QPixmap)：背景、邊框與標題，尺寸變更時重建
         self.setMinimumHeight(200)
         
-        # 更新定時器
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update)
-        self.update_timer.start(1000)  # 每秒重繪
+        # 延遲重繪定時器：只在數據變更後觸發一次，合併短時間內的多次更新
+        self.redraw_interval = 250
+        self._dirty = False
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.timeout.connect(self._flush)
         
     def add_data_point(self, value):
         """添加數據點"""
-        self.data_points.append(value)
+        self._buf[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._len = min(self.capacity, self._len + 1)
         
-    def paintEvent(self, event):
-        """繪製圖表"""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        self._dirty = True
+        if not self.update_timer.isActive():
+            self.update_timer.start(self.redraw_interval)
+            
+    def _flush(self):
+        """數據有變更時才重繪"""
+        if self._dirty:
+            self._dirty = False
+            self.update()
         
-        # 繪製背景
-        chart_rect = self.rect().adjusted(40, 20, -20, -40)
+    @property
+    def data_points(self):
+        """依時間順序返回目前的數據點"""
+        if self._len < self.capacity:
+            return self._buf[:self._len]
+        return self._buf[self._head:] + self._buf[:self._head]
+        
+    def _x_positions(self, left, width, count):
+        """X 座標只與圖表寬度和點數有關，兩者不變時沿用上次的結果"""
+        key = (left, width, count)
+        if self._x_cache[0] != key:
+            step = width / max(1, count - 1)
+            self._x_cache = (key, [int(left + i * step) for i in range(count)])
+        return self._x_cache[1]
+        
+    def _build_background(self, chart_rect):
+        """將不會隨數據變化的背景、邊框與標題繪製到 QPixmap"""
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
         painter.fillRect(chart_rect, QColor(250, 250, 250))
         painter.setPen(QPen(QColor(200, 200, 200), 1))
         painter.drawRect(chart_rect)
         
-        # 繪製標題
         painter.setPen(QPen(QColor(50, 50, 50), 1))
         painter.setFont(QFont("Arial", 12, QFont.Bold))
         painter.drawText(10, 15, self.title)
+        painter.end()
+        return pixmap
+        
+    def paintEvent(self, event):
+        """繪製圖表"""
+        chart_rect = self.rect().adjusted(40, 20, -20, -40)
+        if self._bg_cache[0] != self.size():
+            self._bg_cache = (self.size(), self._build_background(chart_rect))
+        
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # 繪製背景與標題
+        painter.drawPixmap(0, 0, self._bg_cache[1])
         
         # 繪製數據線
-        if len(self.data_points) >= 2:
+        values = self.data_points
+        if len(values) >= 2:
             painter.setPen(QPen(QColor(0, 120, 255), 2))
             
             # 計算點位置
-            points = []
-            width = chart_rect.width()
-            height = chart_rect.height()
+            bottom = chart_rect.bottom()
+            y_scale = chart_rect.height() / 100  # 假設0-100範圍
+            xs = self._x_positions(chart_rect.left(), chart_rect.width(), len(values))
+            polygon = QPolygon([
+                QPoint(x, int(bottom - value * y_scale))
+                for x, value in zip(xs, values)
+            ])
             
-            for i, value in enumerate(self.data_points):
-                x = chart_rect.left() + (i * width / max(1, len(self.data_points) - 1))
-                y = chart_rect.bottom() - (value / 100 * height)  # 假設0-100範圍
-                points.append((int(x), int(y)))
+            # 繪製線段（一次呼叫完成整條折線）
+            painter.drawPolyline(polygon)
             
-            # 繪製線段
-            for i in range(len(points) - 1):
-                x1, y1 = points[i]
-                x2, y2 = points[i + 1]
-                painter.drawLine(x1, y1, x2, y2)
-            
-            # 繪製數據點
-            painter.setBrush(QBrush(QColor(0, 120, 255)))
-            for x, y in points:
-                painter.drawEllipse(x - 3, y - 3, 6, 6)
+            # 繪製數據點：圓頭粗筆的 drawPoints 一次畫出所有圓點
+            marker_pen = QPen(QColor(0, 120, 255), 6)
+            marker_pen.setCapStyle(Qt.RoundCap)
+            painter.setPen(marker_pen)
+            painter.drawPoints(polygon)
         
         # 顯示數據點數量
-        if self.data_points:
+        if values:
             painter.setPen(QPen(QColor(100, 100, 100), 1))
             painter.setFont(QFont("Arial", 10))
-            point_count = len(self.data_points)
-            last_value = self.data_points[-1] if self.data_points else 0
+            point_count = len(values)
+            last_value = values[-1]
             status_text = f"Points: {point_count}, Last: {last_value:.1f}"
             painter.drawText(chart_rect.right() - 120, chart_rect.bottom() + 15, status_text)
 
@@ -148,9 +200,64 @@ class SilentChartTest(QMainWindow):
             self.timer.stop()
         event.accept()
 
+def test_silent_chart_collects_points(qapp):
+    """直接驅動數據更新，不等待每秒一次的定時器"""
+    window = SilentChartTest()
+    window.start_test()
+    
+    for _ in range(30):
+        window.update_data()
+    qapp.processEvents()
+    
+    assert len(window.chart.data_points) == 30
+    assert not window.timer.isActive()
+    window.close()
+
+def test_simple_chart_ring_buffer_keeps_latest_points(qapp):
+    """環形緩衝區寫滿後覆蓋最舊的點，並依時間順序返回"""
+    chart = SimpleChart()
+    for value in range(chart.capacity + 5):
+        chart.add_data_point(value)
+    
+    assert list(chart.data_points) == list(range(5, chart.capacity + 5))
+    chart.deleteLater()
+
+def test_simple_chart_repaints_only_after_new_data(qapp):
+    """沒有新數據時不排程重繪，連續新增的數據合併為一次重繪"""
+    chart = SimpleChart()
+    assert not chart.update_timer.isActive()
+    
+    chart.add_data_point(10)
+    chart.add_data_point(20)
+    assert chart.update_timer.isActive()
+    
+    chart.update_timer.timeout.emit()
+    assert not chart._dirty
+    chart.deleteLater()
+
+def test_simple_chart_reuses_background_until_resized(qapp):
+    """背景快取在尺寸不變時重複使用，尺寸改變後重建"""
+    chart = SimpleChart()
+    chart.resize(400, 300)
+    chart.grab()
+    background = chart._bg_cache[1]
+    
+    chart.grab()
+    assert chart._bg_cache[1] is background
+    
+    chart.resize(500, 300)
+    chart.grab()
+    assert chart._bg_cache[1] is not background
+    chart.deleteLater()
+
 def main():
     """主函數"""
-    app = QApplication(sys.argv)
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    if not os.environ.get("VISUAL_TEST"):
+        test_silent_chart_collects_points(app)
+        print("Silent chart test passed: 30 data points collected")
+        return 0
     
     window = SilentChartTest()
     window.show()
@@ -7,7 +7,6 @@
 import sys
 import logging
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
 
 # 設置路徑
 sys.path.append('.')
@@ -16,12 +15,9 @@ sys.path.append('.')
 logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
 logger = logging.getLogger(__name__)
 
-def test_welcome_layout():
+def test_welcome_layout(qapp):
     """測試歡迎頁面佈局"""
     try:
-        # 創建應用程式
-        app = QApplication([])
-        
         # 導入主窗口類
         from ui.main_window import WelcomePage
         
@@ -118,7 +114,7 @@ def test_welcome_layout():
 if __name__ == "__main__":
     print("歡迎頁面佈局測試")
     print("=" * 50)
-    success = test_welcome_layout()
+    success = test_welcome_layout(QApplication.instance() or QApplication([]))
     if success:
         print("[SUCCESS] 測試成功！新的分行佈局已正確實現。")
     else:
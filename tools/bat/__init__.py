@@ -6,7 +6,14 @@ Bat 語法高亮顯示插件
 __version__ = "1.0.0"
 __author__ = "CLI Tool Developer"
 
-# 使插件模組可被導入
-from .plugin import BatPlugin, create_plugin
+__all__ = ['BatPlugin', 'create_plugin']
 
-__all__ = ['BatPlugin', 'create_plugin']
\ No newline at end of file
+
+def __getattr__(name):
+    """首次存取時才導入插件模組，避免導入套件即載入 Qt 與子程序封裝"""
+    if name in {'BatPlugin', 'create_plugin'}:
+        from . import plugin
+        value = getattr(plugin, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
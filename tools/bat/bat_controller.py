@@ -3,19 +3,48 @@ Bat 控制器類 - 連接視圖和模型
 """
 
 import logging
-from typing import Optional
+import subprocess
+from typing import Optional, Set
 from PyQt5.QtCore import QObject, QThread, pyqtSignal
-from .bat_model import BatModel
+from .bat_model import BatModel, OUTPUT_ANSI
 from .bat_view import BatView
 
 logger = logging.getLogger(__name__)
 
 
-class FileHighlightWorker(QThread):
+class CancellableWorker(QThread):
+    """可協作取消的工作線程，取消時直接終止持有的 bat 程序而非 terminate() 線程"""
+    
+    def __init__(self):
+        super().__init__()
+        self._cancelled = False
+        self._process: Optional[subprocess.Popen] = None
+    
+    def cancel(self):
+        """要求取消；正在執行的 bat 程序會被 kill，線程隨即返回"""
+        self._cancelled = True
+        self.requestInterruption()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+    
+    def is_cancelled(self) -> bool:
+        """是否已要求取消"""
+        return self._cancelled
+    
+    def _on_process(self, process: subprocess.Popen):
+        """記錄模型啟動的 bat 程序；若在啟動前已取消則立即終止"""
+        self._process = process
+        if self._cancelled:
+            process.kill()
+
+
+class FileHighlightWorker(CancellableWorker):
     """檔案高亮工作線程"""
     
     # 信號定義
-    highlight_completed = pyqtSignal(bool, str, str)  # (成功, HTML內容, 錯誤信息)
+    # (成功, ANSI 內容, 錯誤信息)；內容以 object 傳遞，跨線程只傳參考，不轉換成 QString 再轉回
+    highlight_completed = pyqtSignal(bool, object, str)
     
     def __init__(self, model: BatModel, file_path: str, theme: str, 
                  show_line_numbers: bool, show_git_modifications: bool,
@@ -34,24 +63,29 @@ class FileHighlightWorker(QThread):
     def run(self):
         """執行檔案高亮"""
         try:
-            success, html_content, error = self.model.highlight_file(
+            success, content, error = self.model.highlight_file(
                 self.file_path, self.theme, self.show_line_numbers,
                 self.show_git_modifications, self.tab_width, self.wrap_text,
-                self.language, self.use_cache
+                self.language, self.use_cache,
+                output_format=OUTPUT_ANSI, on_process=self._on_process
             )
             
-            self.highlight_completed.emit(success, html_content, error)
+            # 已被新請求取代的結果直接丟棄
+            if not self.is_cancelled():
+                self.highlight_completed.emit(success, content, error)
             
         except Exception as e:
             logger.error(f"Error in FileHighlightWorker: {e}")
-            self.highlight_completed.emit(False, "", str(e))
+            if not self.is_cancelled():
+                self.highlight_completed.emit(False, "", str(e))
 
 
-class TextHighlightWorker(QThread):
+class TextHighlightWorker(CancellableWorker):
     """文本高亮工作線程"""
     
     # 信號定義
-    highlight_completed = pyqtSignal(bool, str, str)  # (成功, HTML內容, 錯誤信息)
+    # (成功, ANSI 內容, 錯誤信息)；內容以 object 傳遞，跨線程只傳參考，不轉換成 QString 再轉回
+    highlight_completed = pyqtSignal(bool, object, str)
     
     def __init__(self, model: BatModel, text: str, language: str, theme: str,
                  show_line_numbers: bool, tab_width: int, wrap_text: bool, use_cache: bool):
@@ -68,19 +102,23 @@ class TextHighlightWorker(QThread):
     def run(self):
         """執行文本高亮"""
         try:
-            success, html_content, error = self.model.highlight_text(
+            success, content, error = self.model.highlight_text(
                 self.text, self.language, self.theme, self.show_line_numbers,
-                self.tab_width, self.wrap_text, self.use_cache
+                self.tab_width, self.wrap_text, self.use_cache,
+                output_format=OUTPUT_ANSI, on_process=self._on_process
             )
             
-            self.highlight_completed.emit(success, html_content, error)
+            # 已被新請求取代的結果直接丟棄
+            if not self.is_cancelled():
+                self.highlight_completed.emit(success, content, error)
             
         except Exception as e:
             logger.error(f"Error in TextHighlightWorker: {e}")
-            self.highlight_completed.emit(False, "", str(e))
+            if not self.is_cancelled():
+                self.highlight_completed.emit(False, "", str(e))
 
 
-class ToolCheckWorker(QThread):
+class ToolCheckWorker(CancellableWorker):
     """工具檢查工作線程"""
     
     # 信號定義
@@ -94,11 +132,13 @@ class ToolCheckWorker(QThread):
         """執行工具檢查"""
         try:
             available, version, error = self.model.check_bat_availability()
-            self.check_completed.emit(available, version, error)
+            if not self.is_cancelled():
+                self.check_completed.emit(available, version, error)
             
         except Exception as e:
             logger.error(f"Error in ToolCheckWorker: {e}")
-            self.check_completed.emit(False, "", str(e))
+            if not self.is_cancelled():
+                self.check_completed.emit(False, "", str(e))
 
 
 class BatController(QObject):
@@ -113,6 +153,8 @@ class BatController(QObject):
         self.file_highlight_worker: Optional[FileHighlightWorker] = None
         self.text_highlight_worker: Optional[TextHighlightWorker] = None
         self.tool_check_worker: Optional[ToolCheckWorker] = None
+        # 已取消但尚未結束的線程，保留參考直到 finished，避免 QThread 在執行中被回收
+        self._retired_workers: Set[CancellableWorker] = set()
         
         # 連接信號和槽
         self._connect_signals()
@@ -128,6 +170,7 @@ class BatController(QObject):
         self.view.text_highlight_requested.connect(self._handle_text_highlight_request)
         self.view.check_bat_requested.connect(self._handle_check_tool_request)
         self.view.clear_cache_requested.connect(self._handle_clear_cache_request)
+        self.view.cancel_file_highlight_requested.connect(self._stop_file_highlight_worker)
     
     def _handle_file_highlight_request(self, file_path: str, theme: str, 
                                      show_line_numbers: bool, show_git_modifications: bool,
@@ -214,26 +257,33 @@ class BatController(QObject):
             logger.error(f"Error clearing cache: {e}")
             self.view.show_error(f"清除快取失敗: {str(e)}")
     
-    def _on_file_highlight_completed(self, success: bool, html_content: str, error: str):
+    def _on_file_highlight_completed(self, success: bool, content: str, error: str):
         """檔案高亮完成處理"""
+        # 取消前已送出、仍在佇列中的舊線程結果直接丟棄
+        if self.sender() is not self.file_highlight_worker:
+            return
         if success:
-            self.view.display_file_content(html_content)
-            logger.info(f"File highlight completed successfully ({len(html_content)} chars)")
+            self.view.display_file_content(content)
+            logger.info(f"File highlight completed successfully ({len(content)} chars)")
         else:
             self.view.show_error(f"檔案高亮失敗: {error}")
             logger.error(f"File highlight failed: {error}")
     
-    def _on_text_highlight_completed(self, success: bool, html_content: str, error: str):
+    def _on_text_highlight_completed(self, success: bool, content: str, error: str):
         """文本高亮完成處理"""
+        if self.sender() is not self.text_highlight_worker:
+            return
         if success:
-            self.view.display_text_content(html_content)
-            logger.info(f"Text highlight completed successfully ({len(html_content)} chars)")
+            self.view.display_text_content(content)
+            logger.info(f"Text highlight completed successfully ({len(content)} chars)")
         else:
             self.view.show_error(f"文本高亮失敗: {error}")
             logger.error(f"Text highlight failed: {error}")
     
     def _on_tool_check_completed(self, available: bool, version: str, error: str):
         """工具檢查完成處理"""
+        if self.sender() is not self.tool_check_worker:
+            return
         self.view.update_tool_status(available, version, error)
         
         if available:
@@ -243,36 +293,42 @@ class BatController(QObject):
     
     def _on_file_highlight_finished(self):
         """檔案高亮線程結束處理"""
-        self.file_highlight_worker = None
+        if self.sender() is self.file_highlight_worker:
+            self.file_highlight_worker = None
     
     def _on_text_highlight_finished(self):
         """文本高亮線程結束處理"""
-        self.text_highlight_worker = None
+        if self.sender() is self.text_highlight_worker:
+            self.text_highlight_worker = None
     
     def _on_tool_check_finished(self):
         """工具檢查線程結束處理"""
-        self.tool_check_worker = None
+        if self.sender() is self.tool_check_worker:
+            self.tool_check_worker = None
+    
+    def _retire_worker(self, worker: Optional[CancellableWorker], timeout_ms: int = 100):
+        """協作取消工作線程；短暫等待後仍未結束的線程保留到 finished 為止"""
+        if worker is None or not worker.isRunning():
+            return
+        worker.cancel()
+        if not worker.wait(timeout_ms):
+            self._retired_workers.add(worker)
+            worker.finished.connect(lambda w=worker: self._retired_workers.discard(w))
     
-    def _stop_file_highlight_worker(self):
+    def _stop_file_highlight_worker(self, timeout_ms: int = 100):
         """停止檔案高亮工作線程"""
-        if self.file_highlight_worker and self.file_highlight_worker.isRunning():
-            self.file_highlight_worker.terminate()
-            self.file_highlight_worker.wait(3000)  # 等待3秒
-            self.file_highlight_worker = None
+        self._retire_worker(self.file_highlight_worker, timeout_ms)
+        self.file_highlight_worker = None
     
-    def _stop_text_highlight_worker(self):
+    def _stop_text_highlight_worker(self, timeout_ms: int = 100):
         """停止文本高亮工作線程"""
-        if self.text_highlight_worker and self.text_highlight_worker.isRunning():
-            self.text_highlight_worker.terminate()
-            self.text_highlight_worker.wait(3000)  # 等待3秒
-            self.text_highlight_worker = None
+        self._retire_worker(self.text_highlight_worker, timeout_ms)
+        self.text_highlight_worker = None
     
-    def _stop_tool_check_worker(self):
+    def _stop_tool_check_worker(self, timeout_ms: int = 100):
         """停止工具檢查工作線程"""
-        if self.tool_check_worker and self.tool_check_worker.isRunning():
-            self.tool_check_worker.terminate()
-            self.tool_check_worker.wait(3000)  # 等待3秒
-            self.tool_check_worker = None
+        self._retire_worker(self.tool_check_worker, timeout_ms)
+        self.tool_check_worker = None
     
     def _check_tool_status(self):
         """初始化檢查工具狀態"""
@@ -290,10 +346,12 @@ class BatController(QObject):
     def cleanup(self):
         """清理資源"""
         try:
-            # 停止所有工作線程
-            self._stop_file_highlight_worker()
-            self._stop_text_highlight_worker()
-            self._stop_tool_check_worker()
+            # 停止所有工作線程，關閉時多等一會讓被終止的 bat 程序收尾
+            self._stop_file_highlight_worker(3000)
+            self._stop_text_highlight_worker(3000)
+            self._stop_tool_check_worker(3000)
+            for worker in list(self._retired_workers):
+                worker.wait(3000)
             
             logger.info("BatController cleanup completed")
             
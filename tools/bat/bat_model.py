@@ -2,28 +2,379 @@
 Bat 模型類 - 處理 bat 命令執行和數據管理
 """
 
+import functools
 import os
+import re
+import shutil
 import sys
+import hashlib
 import subprocess
 import logging
+import threading
 import time
-from typing import Tuple, Dict, Any, Optional, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Any, Optional, List, Callable, Iterator
 from config.config_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
+# 高亮結果格式：HTML 給一般呼叫端，ANSI 給直接以文字格式繪製的檢視
+OUTPUT_HTML = 'html'
+OUTPUT_ANSI = 'ansi'
+
+# 快取鍵不涉及安全性；Python 3.9+ 標示 usedforsecurity=False，受限的 FIPS 環境也能使用
+_DIGEST_OPTIONS: Dict[str, Any] = {'digest_size': 16}
+if sys.version_info >= (3, 9):
+    _DIGEST_OPTIONS['usedforsecurity'] = False
+_new_cache_digest = functools.partial(hashlib.blake2b, **_DIGEST_OPTIONS)
+
+# Windows 上不為 bat 開啟主控台視窗，避免閃爍並略減建立程序的成本
+_SUBPROCESS_FLAGS: Dict[str, Any] = (
+    {'creationflags': subprocess.CREATE_NO_WINDOW} if sys.platform == 'win32' else {}
+)
+
+try:
+    from ansi2html import Ansi2HTMLConverter
+    # 轉換器只建立一次；convert() 會寫入實例狀態，批次高亮時需以鎖保護
+    _ANSI_CONVERTER = Ansi2HTMLConverter(inline=True, dark_bg=True)
+except ImportError:
+    _ANSI_CONVERTER = None
+_ANSI_CONVERTER_LOCK = threading.Lock()
+
+# 高亮結果的外層樣式，內容片段需自行保留空白與換行
+_WRAP_STYLE = ("font-family: 'Consolas', 'Monaco', 'Courier New', monospace; "
+               "font-size: 13px; "
+               "line-height: 1.4; "
+               "background-color: #1e1e1e; "
+               "color: #d4d4d4; "
+               "padding: 10px; "
+               "border-radius: 4px; "
+               "overflow-x: auto;")
+_ANSI_WRAP_PREFIX = f'<div style="{_WRAP_STYLE} white-space: pre;">'
+_PLAIN_WRAP_PREFIX = f'<div style="{_WRAP_STYLE} white-space: pre-wrap;">'
+_WRAP_SUFFIX = "</div>"
+# (前綴, 後綴)；快取只存內文與對應的共用外層常數，讀取時才組合
+_ANSI_WRAP = (_ANSI_WRAP_PREFIX, _WRAP_SUFFIX)
+_PLAIN_WRAP = (_PLAIN_WRAP_PREFIX, _WRAP_SUFFIX)
+_PRE_WRAP = ("<pre>", "</pre>")
+_NO_WRAP = ("", "")
+
+# bat 只輸出 SGR 顏色序列，直接以狀態機轉換，比逐一交給 ansi2html 解析快得多
+_SGR_RE = re.compile(r'\x1b\[([0-9;]*)m')
+_HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+# 與 ansi2html 預設配色相同，轉換結果的外觀不變
+_BASE_COLORS = ('#000316', '#aa0000', '#00aa00', '#aa5500', '#0000aa', '#E850A8', '#00aaaa', '#F5F1DE',
+                '#7f7f7f', '#ff0000', '#00ff00', '#ffff00', '#5c5cff', '#ff00ff', '#00ffff', '#ffffff')
+_CUBE_LEVELS = (0x00, 0x5f, 0x87, 0xaf, 0xd7, 0xff)
+# CSI 與 OSC 控制序列（SGR 以外的部分在純文字顯示時移除）
+_CONTROL_SEQUENCE_RE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|\][^\x07\x1b]*(?:\x07|\x1b\\)?)')
+# (粗體, 斜體, 底線, 前景色, 背景色)
+SgrState = Tuple[bool, bool, bool, Optional[str], Optional[str]]
+_SGR_DEFAULT: SgrState = (False, False, False, None, None)
+_SGR_STYLE_CACHE: Dict[SgrState, str] = {}
+# (目前狀態, SGR 參數) -> (新狀態, inline CSS)；同一主題反覆出現的組合只解析一次
+_SGR_TRANSITIONS: Dict[Tuple[SgrState, str], Tuple[SgrState, str]] = {}
+_SGR_TRANSITIONS_LIMIT = 4096
+
+
+def _xterm_color(index: int) -> str:
+    """將 256 色索引轉為 #rrggbb"""
+    if index < 16:
+        return _BASE_COLORS[index]
+    if index < 232:
+        index -= 16
+        return "#%02x%02x%02x" % (_CUBE_LEVELS[index // 36], _CUBE_LEVELS[index // 6 % 6],
+                                  _CUBE_LEVELS[index % 6])
+    gray = 8 + 10 * (index - 232)
+    return "#%02x%02x%02x" % (gray, gray, gray)
+
+
+def _extended_color(codes: List[int], i: int) -> Tuple[Optional[str], int]:
+    """解析 38/48 之後的 5;n 或 2;r;g;b 參數，回傳 (顏色, 下一個參數位置)"""
+    if i + 1 < len(codes) and codes[i] == 5:
+        return _xterm_color(codes[i + 1] & 0xff), i + 2
+    if i + 3 < len(codes) and codes[i] == 2:
+        return "#%02x%02x%02x" % (codes[i + 1] & 0xff, codes[i + 2] & 0xff, codes[i + 3] & 0xff), i + 4
+    return None, len(codes)
+
+
+def _apply_sgr(state: SgrState, params: str) -> SgrState:
+    """依 SGR 參數更新樣式狀態，不支援的參數忽略"""
+    if not params:
+        return _SGR_DEFAULT
+    bold, italic, underline, fg, bg = state
+    codes = [int(code) if code else 0 for code in params.split(';')]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        i += 1
+        if code == 0:
+            bold, italic, underline, fg, bg = _SGR_DEFAULT
+        elif code == 1:
+            bold = True
+        elif code == 3:
+            italic = True
+        elif code == 4:
+            underline = True
+        elif code == 22:
+            bold = False
+        elif code == 23:
+            italic = False
+        elif code == 24:
+            underline = False
+        elif 30 <= code <= 37:
+            fg = _BASE_COLORS[code - 30]
+        elif 90 <= code <= 97:
+            fg = _BASE_COLORS[code - 90 + 8]
+        elif code == 38:
+            fg, i = _extended_color(codes, i)
+        elif code == 39:
+            fg = None
+        elif 40 <= code <= 47:
+            bg = _BASE_COLORS[code - 40]
+        elif 100 <= code <= 107:
+            bg = _BASE_COLORS[code - 100 + 8]
+        elif code == 48:
+            bg, i = _extended_color(codes, i)
+        elif code == 49:
+            bg = None
+    return bold, italic, underline, fg, bg
+
+
+def _sgr_style(state: SgrState) -> str:
+    """將樣式狀態轉為 inline CSS，同一狀態只組字串一次"""
+    style = _SGR_STYLE_CACHE.get(state)
+    if style is None:
+        bold, italic, underline, fg, bg = state
+        declarations = []
+        if bold:
+            declarations.append("font-weight: bold")
+        if italic:
+            declarations.append("font-style: italic")
+        if underline:
+            declarations.append("text-decoration: underline")
+        if fg:
+            declarations.append(f"color: {fg}")
+        if bg:
+            declarations.append(f"background: {bg}")
+        style = _SGR_STYLE_CACHE[state] = "; ".join(declarations)
+    return style
+
+
+def _sgr_transition(state: SgrState, params: str) -> Tuple[SgrState, str]:
+    """套用 SGR 參數並取得新狀態的樣式，結果依 (狀態, 參數) 記憶"""
+    key = (state, params)
+    transition = _SGR_TRANSITIONS.get(key)
+    if transition is None:
+        if len(_SGR_TRANSITIONS) >= _SGR_TRANSITIONS_LIMIT:
+            _SGR_TRANSITIONS.clear()
+        new_state = _apply_sgr(state, params)
+        transition = _SGR_TRANSITIONS[key] = (new_state, _sgr_style(new_state))
+    return transition
+
+
+def iter_ansi_runs(ansi_text: str) -> Iterator[Tuple[str, SgrState]]:
+    """
+    依 SGR 序列將 ANSI 文本切成 (文字, 樣式狀態) 片段
+    
+    相同樣式的連續片段合併為一段，沒有底線與背景色的空白看不出顏色差異，直接併入目前片段；
+    SGR 以外的控制序列（例如超連結）原樣留在文字中，由呼叫端決定如何處理
+    """
+    run: List[str] = []
+    run_state = _SGR_DEFAULT
+    run_style = ""
+    state = _SGR_DEFAULT
+    style = ""
+    pos = 0
+    
+    matches = _SGR_RE.finditer(ansi_text)
+    while True:
+        match = next(matches, None)
+        end = match.start() if match else len(ansi_text)
+        if end > pos:
+            segment = ansi_text[pos:end]
+            invisible = not state[2] and state[4] is None and segment.isspace()
+            if style != run_style and not (run and invisible):
+                if run:
+                    yield "".join(run), run_state
+                run = []
+                run_state = state
+                run_style = style
+            run.append(segment)
+        if match is None:
+            break
+        state, style = _sgr_transition(state, match.group(1))
+        pos = match.end()
+    
+    if run:
+        yield "".join(run), run_state
+
+
+def strip_control_sequences(text: str) -> str:
+    """移除 SGR 以外殘留的 ANSI 控制序列"""
+    return _CONTROL_SEQUENCE_RE.sub("", text) if '\x1b' in text else text
+
+
+def _ansi_to_html_fragment(ansi_text: str) -> Optional[str]:
+    """
+    將只含 SGR 序列的 ANSI 文本轉為 HTML 片段，每個樣式片段一個 <span>；
+    遇到其他控制序列時回傳 None，由呼叫端改用 ansi2html
+    """
+    out: List[str] = []
+    for text, state in iter_ansi_runs(ansi_text):
+        if '\x1b' in text:
+            return None
+        text = text.translate(_HTML_ESCAPE_TABLE)
+        style = _sgr_style(state)
+        out.append(f'<span style="{style}">{text}</span>' if style else text)
+    return "".join(out)
+
+# bat 原始 ANSI 輸出快取，以完整命令參數與文本摘要為鍵，所有 BatModel 實例共用
+_RAW_CACHE: "OrderedDict[Tuple[Tuple[str, ...], str], str]" = OrderedDict()
+_RAW_CACHE_LOCK = threading.Lock()
+_RAW_CACHE_MAX_ENTRIES = 128
+
+# 超長單行（例如壓縮過的 JSON／JS）會讓語法正規表示式退化，改以純文字顯示
+_PLAIN_TEXT_LANGUAGE = 'txt'
+_LINE_SCAN_CHUNK = 64 * 1024
+
+
+def _text_has_long_line(text: str, max_line_length: int) -> bool:
+    """檢查文本是否有超過長度上限的單行"""
+    if len(text) <= max_line_length:
+        return False
+    return max(map(len, text.splitlines())) > max_line_length
+
+
+def _file_has_long_line(file_path: str, file_size: int, max_line_length: int) -> bool:
+    """分塊掃描檔案，檢查是否有超過長度上限（位元組）的單行"""
+    if file_size <= max_line_length:
+        return False
+    
+    run = 0  # 目前這一行已累積的長度
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(_LINE_SCAN_CHUNK)
+            if not chunk:
+                return False
+            first = chunk.find(b'\n')
+            if first == -1:
+                run += len(chunk)
+            else:
+                last = chunk.rfind(b'\n')
+                if run + first > max_line_length:
+                    return True
+                if last > first and max(map(len, chunk[first + 1:last].split(b'\n'))) > max_line_length:
+                    return True
+                run = len(chunk) - last - 1
+            if run > max_line_length:
+                return True
+
+# bat 的版本、主題與語言清單在程序生命週期內不變，成功取得後以 (執行檔, 項目) 為鍵共用
+_CAPABILITIES: Dict[Tuple[str, str], Any] = {}
+_CAPABILITIES_LOCK = threading.Lock()
+# 已啟動預熱的執行檔，每個程序只預熱一次
+_WARMED_UP: set = set()
+
+
+def _warm_up_bat(executable_path: str):
+    """
+    背景執行一次 bat，讓執行檔與語法／主題資產進入作業系統快取，
+    並順便快取版本資訊；bat 不可用時安靜結束
+    """
+    try:
+        result = subprocess.run(
+            [executable_path, '--version'],
+            capture_output=True,
+            text=True,
+            timeout=10,
+            encoding='utf-8',
+            errors='replace',
+            **_SUBPROCESS_FLAGS
+        )
+        if result.returncode != 0:
+            return
+        with _CAPABILITIES_LOCK:
+            _CAPABILITIES.setdefault((executable_path, 'version'), result.stdout.strip())
+        
+        # 高亮一段空輸入，實際載入語法與主題資產
+        subprocess.run(
+            [executable_path, '--color', 'always', '--language', _PLAIN_TEXT_LANGUAGE],
+            input='',
+            capture_output=True,
+            text=True,
+            timeout=10,
+            **_SUBPROCESS_FLAGS
+        )
+        logger.debug(f"bat warmed up: {executable_path}")
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"bat warm-up skipped: {e}")
+
+# 大段文本分塊寫入 bat 的 stdin，避免先編碼出一份完整的 bytes 副本
+_STDIN_CHUNK_CHARS = 64 * 1024
+_BAT_TIMEOUT = 30
+
+
+def reset_raw_cache():
+    """清除共用的 bat 原始輸出快取"""
+    with _RAW_CACHE_LOCK:
+        _RAW_CACHE.clear()
+
+
+def _get_raw_output(key: Tuple[Tuple[str, ...], str]) -> Optional[str]:
+    """讀取原始輸出快取，命中時標記為最近使用"""
+    with _RAW_CACHE_LOCK:
+        output = _RAW_CACHE.get(key)
+        if output is not None:
+            _RAW_CACHE.move_to_end(key)
+        return output
+
+
+def _store_raw_output(key: Tuple[Tuple[str, ...], str], output: str):
+    """寫入原始輸出快取，超過項目上限時淘汰最久未使用的項目"""
+    with _RAW_CACHE_LOCK:
+        _RAW_CACHE[key] = output
+        _RAW_CACHE.move_to_end(key)
+        while len(_RAW_CACHE) > _RAW_CACHE_MAX_ENTRIES:
+            _RAW_CACHE.popitem(last=False)
+
 
 class BatModel:
     """Bat 工具的模型類，負責命令執行和數據處理"""
     
     def __init__(self):
-        self.executable_path = config_manager.get('tools.bat.executable_path', 'bat')
-        self.cache = {}
+        # 只查一次 PATH，之後每次啟動 bat 都直接使用絕對路徑
+        configured_path = config_manager.get('tools.bat.executable_path', 'bat')
+        self.executable_path = shutil.which(configured_path) or configured_path
+        # 依最近使用順序排列，最舊的項目在前，超出大小上限時從前端淘汰
+        self.cache = OrderedDict()
+        self._total_size = 0
+        # 批次高亮時多個執行緒會同時寫入快取；可重入，讓持鎖的輔助方法互相呼叫
+        self._cache_lock = threading.RLock()
+        # 正在產生中的快取鍵，同一份輸入的並行請求等待第一個完成，不重複執行 bat
+        self._inflight: Dict[str, threading.Event] = {}
+        # 最近一次成功結果的單格快取 (請求參數, HTML)，完全相同的重複請求不必雜湊與查表；
+        # 文本請求保存文本物件本身並以 is 比對，避免 id() 在物件回收後被重用
+        self._last_file_result: Optional[Tuple[tuple, str]] = None
+        self._last_text_result: Optional[Tuple[str, tuple, str]] = None
         self.cache_ttl = config_manager.get('tools.bat.cache_ttl', 1800)  # 30分鐘
         self.max_cache_size = config_manager.get('tools.bat.max_cache_size', 52428800)  # 50MB
+        self.max_line_length = config_manager.get('tools.bat.max_line_length', 16384)  # 16KB
+        
+        self._start_warm_up()
         
         logger.info(f"BatModel initialized with executable: {self.executable_path}")
     
+    def _start_warm_up(self):
+        """首次建立模型時在背景預熱 bat，使用者的第一次高亮不必承擔冷啟動延遲"""
+        with _CAPABILITIES_LOCK:
+            if self.executable_path in _WARMED_UP:
+                return
+            _WARMED_UP.add(self.executable_path)
+        threading.Thread(target=_warm_up_bat, args=(self.executable_path,),
+                         name="bat-warm-up", daemon=True).start()
+    
     def check_bat_availability(self) -> Tuple[bool, str, str]:
         """
         檢查 bat 工具是否可用
@@ -31,6 +382,10 @@ class BatModel:
         Returns:
             Tuple[bool, str, str]: (是否可用, 版本信息, 錯誤信息)
         """
+        cached_version = self._get_capability('version')
+        if cached_version is not None:
+            return True, cached_version, ""
+        
         try:
             result = subprocess.run(
                 [self.executable_path, '--version'],
@@ -38,12 +393,14 @@ class BatModel:
                 text=True,
                 timeout=10,
                 encoding='utf-8',
-                errors='replace'
+                errors='replace',
+                **_SUBPROCESS_FLAGS
             )
             
             if result.returncode == 0:
                 version_info = result.stdout.strip()
                 logger.info(f"bat tool available: {version_info}")
+                self._set_capability('version', version_info)
                 return True, version_info, ""
             else:
                 error_msg = f"bat command failed with return code {result.returncode}"
@@ -70,6 +427,10 @@ class BatModel:
         Returns:
             List[str]: 主題名稱列表
         """
+        cached_themes = self._get_capability('themes')
+        if cached_themes is not None:
+            return list(cached_themes)
+        
         try:
             result = subprocess.run(
                 [self.executable_path, '--list-themes'],
@@ -77,7 +438,8 @@ class BatModel:
                 text=True,
                 timeout=10,
                 encoding='utf-8',
-                errors='replace'
+                errors='replace',
+                **_SUBPROCESS_FLAGS
             )
             
             if result.returncode == 0:
@@ -85,6 +447,7 @@ class BatModel:
                 for line in result.stdout.strip().split('\n'):
                     if line.strip():
                         themes.append(line.strip())
+                self._set_capability('themes', tuple(themes))
                 return themes
             else:
                 logger.error(f"Failed to get themes: {result.stderr}")
@@ -101,6 +464,10 @@ class BatModel:
         Returns:
             List[str]: 語言名稱列表
         """
+        cached_languages = self._get_capability('languages')
+        if cached_languages is not None:
+            return list(cached_languages)
+        
         try:
             result = subprocess.run(
                 [self.executable_path, '--list-languages'],
@@ -108,7 +475,8 @@ class BatModel:
                 text=True,
                 timeout=10,
                 encoding='utf-8',
-                errors='replace'
+                errors='replace',
+                **_SUBPROCESS_FLAGS
             )
             
             if result.returncode == 0:
@@ -117,6 +485,7 @@ class BatModel:
                     if ':' in line:
                         lang_info = line.split(':')[0].strip()
                         languages.append(lang_info)
+                self._set_capability('languages', tuple(languages))
                 return languages
             else:
                 logger.error(f"Failed to get languages: {result.stderr}")
@@ -126,10 +495,28 @@ class BatModel:
             logger.error(f"Error getting supported languages: {e}")
             return []
     
+    def _get_capability(self, name: str) -> Any:
+        """讀取目前執行檔已快取的 bat 能力資訊，未快取時回傳 None"""
+        with _CAPABILITIES_LOCK:
+            return _CAPABILITIES.get((self.executable_path, name))
+    
+    def _set_capability(self, name: str, value: Any):
+        """快取成功取得的 bat 能力資訊；失敗結果不快取，之後安裝 bat 仍可重新偵測"""
+        with _CAPABILITIES_LOCK:
+            _CAPABILITIES[(self.executable_path, name)] = value
+    
+    def invalidate_capabilities(self):
+        """清除目前執行檔的版本、主題與語言快取"""
+        with _CAPABILITIES_LOCK:
+            for key in [key for key in _CAPABILITIES if key[0] == self.executable_path]:
+                del _CAPABILITIES[key]
+    
     def highlight_file(self, file_path: str, theme: str = "Monokai Extended", 
                       show_line_numbers: bool = True, show_git_modifications: bool = True,
                       tab_width: int = 4, wrap_text: bool = False, 
-                      language: Optional[str] = None, use_cache: bool = True) -> Tuple[bool, str, str]:
+                      language: Optional[str] = None, use_cache: bool = True,
+                      output_format: str = OUTPUT_HTML,
+                      on_process: Optional[Callable[[subprocess.Popen], None]] = None) -> Tuple[bool, str, str]:
         """
         使用 bat 高亮顯示檔案內容
         
@@ -142,28 +529,41 @@ class BatModel:
             wrap_text: 是否自動換行
             language: 指定語言（可選）
             use_cache: 是否使用快取
+            output_format: OUTPUT_HTML 回傳 HTML，OUTPUT_ANSI 回傳 bat 的原始 ANSI 輸出
+            on_process: bat 程序啟動後的回呼，呼叫端可藉此在取消時終止程序
             
         Returns:
-            Tuple[bool, str, str]: (成功狀態, HTML內容, 錯誤信息)
+            Tuple[bool, str, str]: (成功狀態, HTML 或 ANSI 內容, 錯誤信息)
         """
+        inflight = None
         try:
-            # 檢查檔案是否存在
-            if not os.path.exists(file_path):
+            # 檢查檔案是否存在，同一次 stat 的結果也用於快取鍵與長行檢查
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
                 error_msg = f"File not found: {file_path}"
                 logger.error(error_msg)
                 return False, "", error_msg
             
+            request = (file_path, theme, show_line_numbers, show_git_modifications, tab_width,
+                       wrap_text, language, file_stat.st_mtime_ns, file_stat.st_size, output_format)
+            last = self._last_file_result
+            if use_cache and last is not None and last[0] == request:
+                return True, last[1], ""
+            
             # 生成快取鍵
             cache_key = self._generate_cache_key(file_path, theme, show_line_numbers, 
                                                 show_git_modifications, tab_width, 
-                                                wrap_text, language)
+                                                wrap_text, language,
+                                                file_stat.st_mtime_ns, file_stat.st_size, output_format)
             
             # 檢查快取
-            if use_cache and cache_key in self.cache:
-                cache_entry = self.cache[cache_key]
-                if time.time() - cache_entry['timestamp'] < self.cache_ttl:
+            if use_cache:
+                cached_content, inflight = self._await_or_claim(cache_key)
+                if cached_content is not None:
                     logger.debug(f"Using cached result for: {file_path}")
-                    return True, cache_entry['content'], ""
+                    self._last_file_result = (request, cached_content)
+                    return True, cached_content, ""
             
             # 構建 bat 命令
             cmd = [self.executable_path]
@@ -187,6 +587,10 @@ class BatModel:
             else:
                 cmd.append('--wrap=never')
             
+            if _file_has_long_line(file_path, file_stat.st_size, self.max_line_length):
+                logger.info(f"Line longer than {self.max_line_length} bytes in {file_path}, showing as plain text")
+                language = _PLAIN_TEXT_LANGUAGE
+            
             if language:
                 cmd.extend(['--language', language])
             
@@ -198,38 +602,23 @@ class BatModel:
             
             logger.debug(f"Executing bat command: {' '.join(cmd)}")
             
-            # 執行命令，使用 bytes 模式避免編碼問題
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=False,  # 使用 bytes 模式
-                timeout=30
-            )
+            # 執行命令
+            result = self._run_bat(cmd, on_process=on_process)
             
             if result.returncode == 0:
-                # 解碼輸出，處理編碼問題
-                try:
-                    stdout_text = result.stdout.decode('utf-8', errors='replace')
-                except UnicodeDecodeError:
-                    stdout_text = result.stdout.decode('cp950', errors='replace')
-                
                 # 轉換 ANSI 到 HTML
-                html_content = self._convert_ansi_to_html(stdout_text)
+                wrap, html_body = self._render_output(result.stdout, output_format)
+                html_content = wrap[0] + html_body + wrap[1]
                 
                 # 快取結果
                 if use_cache:
-                    self._cache_result(cache_key, html_content)
+                    self._cache_result(cache_key, html_body, wrap)
+                    self._last_file_result = (request, html_content)
                 
                 logger.debug(f"Successfully highlighted file: {file_path} ({len(html_content)} chars)")
                 return True, html_content, ""
             else:
-                # 解碼錯誤輸出
-                try:
-                    stderr_text = result.stderr.decode('utf-8', errors='replace')
-                except UnicodeDecodeError:
-                    stderr_text = result.stderr.decode('cp950', errors='replace')
-                
-                error_msg = f"bat command failed: {stderr_text or 'Unknown error'}"
+                error_msg = f"bat command failed: {result.stderr or 'Unknown error'}"
                 logger.error(error_msg)
                 return False, "", error_msg
                 
@@ -241,10 +630,39 @@ class BatModel:
             error_msg = f"Error highlighting file {file_path}: {str(e)}"
             logger.error(error_msg)
             return False, "", error_msg
+        finally:
+            if inflight is not None:
+                self._release_inflight(cache_key, inflight)
+    
+    def highlight_files(self, file_paths: List[str], **options) -> List[Tuple[bool, str, str]]:
+        """
+        並行高亮多個檔案
+        
+        bat 每次執行只處理一份輸入，無法讓同一個程序持續接收新工作；
+        因此以有上限的執行緒池同時等待多個 bat 子程序，快取命中的檔案不會啟動子程序
+        
+        Args:
+            file_paths: 檔案路徑列表
+            **options: 傳給 highlight_file 的其他參數（theme、language 等）
+            
+        Returns:
+            List[Tuple[bool, str, str]]: 與 file_paths 順序相同的 (成功狀態, HTML內容, 錯誤信息) 列表
+        """
+        if not file_paths:
+            return []
+        
+        max_workers = min(8, os.cpu_count() or 4, len(file_paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda path: self.highlight_file(path, **options),
+                file_paths
+            ))
     
     def highlight_text(self, text: str, language: str, theme: str = "Monokai Extended",
                       show_line_numbers: bool = True, tab_width: int = 4, 
-                      wrap_text: bool = False, use_cache: bool = True) -> Tuple[bool, str, str]:
+                      wrap_text: bool = False, use_cache: bool = True,
+                      output_format: str = OUTPUT_HTML,
+                      on_process: Optional[Callable[[subprocess.Popen], None]] = None) -> Tuple[bool, str, str]:
         """
         高亮顯示文本內容
         
@@ -256,21 +674,35 @@ class BatModel:
             tab_width: Tab 寬度
             wrap_text: 是否自動換行
             use_cache: 是否使用快取
+            output_format: OUTPUT_HTML 回傳 HTML，OUTPUT_ANSI 回傳 bat 的原始 ANSI 輸出
+            on_process: bat 程序啟動後的回呼，呼叫端可藉此在取消時終止程序
             
         Returns:
-            Tuple[bool, str, str]: (成功狀態, HTML內容, 錯誤信息)
+            Tuple[bool, str, str]: (成功狀態, HTML 或 ANSI 內容, 錯誤信息)
         """
+        inflight = None
         try:
+            request = (language, theme, show_line_numbers, tab_width, wrap_text, output_format)
+            last = self._last_text_result
+            if use_cache and last is not None and last[0] is text and last[1] == request:
+                return True, last[2], ""
+            
             # 生成快取鍵
             cache_key = self._generate_text_cache_key(text, language, theme, 
-                                                     show_line_numbers, tab_width, wrap_text)
+                                                     show_line_numbers, tab_width, wrap_text,
+                                                     output_format)
             
             # 檢查快取
-            if use_cache and cache_key in self.cache:
-                cache_entry = self.cache[cache_key]
-                if time.time() - cache_entry['timestamp'] < self.cache_ttl:
+            if use_cache:
+                cached_content, inflight = self._await_or_claim(cache_key)
+                if cached_content is not None:
                     logger.debug("Using cached result for text highlighting")
-                    return True, cache_entry['content'], ""
+                    self._last_text_result = (text, request, cached_content)
+                    return True, cached_content, ""
+            
+            if _text_has_long_line(text, self.max_line_length):
+                logger.info(f"Line longer than {self.max_line_length} chars, showing text as plain text")
+                language = _PLAIN_TEXT_LANGUAGE
             
             # 構建 bat 命令
             cmd = [self.executable_path]
@@ -296,41 +728,37 @@ class BatModel:
             cmd.extend(['--terminal-width', '120'])
             cmd.extend(['--color', 'always'])
             
-            logger.debug(f"Executing bat command for text: {' '.join(cmd)}")
-            
-            # 執行命令，通過 stdin 傳入文本，使用 bytes 模式
-            result = subprocess.run(
-                cmd,
-                input=text.encode('utf-8'),
-                capture_output=True,
-                text=False,  # 使用 bytes 模式
-                timeout=30
-            )
+            # 相同內容與參數的 bat 輸出可跨實例重用，串流重繪時不必重新執行 bat；
+            # 文本摘要已包含在 cache_key 中，不必再雜湊一次
+            raw_key = (tuple(cmd), cache_key)
+            raw_output = _get_raw_output(raw_key) if use_cache else None
             
-            if result.returncode == 0:
-                # 解碼輸出，處理編碼問題
-                try:
-                    stdout_text = result.stdout.decode('utf-8', errors='replace')
-                except UnicodeDecodeError:
-                    stdout_text = result.stdout.decode('cp950', errors='replace')
+            if raw_output is None:
+                logger.debug(f"Executing bat command for text: {' '.join(cmd)}")
                 
+                # 執行命令，通過 stdin 傳入文本
+                result = self._run_bat(cmd, text, on_process=on_process)
+                if result.returncode == 0:
+                    raw_output = result.stdout
+                    if use_cache:
+                        _store_raw_output(raw_key, raw_output)
+            else:
+                logger.debug("Using cached bat output for text highlighting")
+            
+            if raw_output is not None:
                 # 轉換 ANSI 到 HTML
-                html_content = self._convert_ansi_to_html(stdout_text)
+                wrap, html_body = self._render_output(raw_output, output_format)
+                html_content = wrap[0] + html_body + wrap[1]
                 
                 # 快取結果
                 if use_cache:
-                    self._cache_result(cache_key, html_content)
+                    self._cache_result(cache_key, html_body, wrap)
+                    self._last_text_result = (text, request, html_content)
                 
                 logger.debug(f"Successfully highlighted text ({len(html_content)} chars)")
                 return True, html_content, ""
             else:
-                # 解碼錯誤輸出
-                try:
-                    stderr_text = result.stderr.decode('utf-8', errors='replace')
-                except UnicodeDecodeError:
-                    stderr_text = result.stderr.decode('cp950', errors='replace')
-                
-                error_msg = f"bat command failed: {stderr_text or 'Unknown error'}"
+                error_msg = f"bat command failed: {result.stderr or 'Unknown error'}"
                 logger.error(error_msg)
                 return False, "", error_msg
                 
@@ -342,8 +770,97 @@ class BatModel:
             error_msg = f"Error highlighting text: {str(e)}"
             logger.error(error_msg)
             return False, "", error_msg
+        finally:
+            if inflight is not None:
+                self._release_inflight(cache_key, inflight)
     
-    def _convert_ansi_to_html(self, ansi_text: str) -> str:
+    def _run_bat(self, cmd: List[str], input_text: Optional[str] = None,
+                 on_process: Optional[Callable[[subprocess.Popen], None]] = None) -> subprocess.CompletedProcess:
+        """
+        執行 bat 並以 UTF-8 收集文字輸出，行為等同
+        subprocess.run(capture_output=True, encoding='utf-8', errors='replace', timeout=30)
+        
+        與 subprocess.run 不同之處在於程序物件會交給 on_process，
+        讓工作線程取消時能直接 kill() 正在執行的 bat，而不必等它跑完
+        """
+        with subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input_text is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding='utf-8',
+            errors='replace',  # 無效位元組以替代字元呈現，不會拋出 UnicodeDecodeError
+            **_SUBPROCESS_FLAGS
+        ) as process:
+            if on_process is not None:
+                on_process(process)
+            if input_text is not None and len(input_text) > _STDIN_CHUNK_CHARS:
+                stdout, stderr = self._communicate_streaming(cmd, process, input_text)
+            else:
+                try:
+                    stdout, stderr = process.communicate(input_text, timeout=_BAT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    raise
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+    
+    def _communicate_streaming(self, cmd: List[str], process: subprocess.Popen,
+                               input_text: str) -> Tuple[str, str]:
+        """
+        由背景線程分塊寫入 stdin，同時在目前線程讀取 stdout
+        
+        communicate() 會先把整段輸入編碼成一份 bytes 再寫出，大段貼上時峰值記憶體加倍；
+        這裡每次只編碼一個區塊，逾時則 kill 程序並拋出 TimeoutExpired
+        """
+        timed_out = threading.Event()
+        stderr_parts: List[str] = []
+        
+        def feed_stdin():
+            try:
+                for start in range(0, len(input_text), _STDIN_CHUNK_CHARS):
+                    process.stdin.write(input_text[start:start + _STDIN_CHUNK_CHARS])
+            except (BrokenPipeError, ValueError):
+                # bat 提前結束或被取消時管道已關閉，剩餘輸入直接丟棄
+                pass
+            finally:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+        
+        def drain_stderr():
+            stderr_parts.append(process.stderr.read())
+        
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        
+        workers = [threading.Thread(target=feed_stdin, daemon=True),
+                   threading.Thread(target=drain_stderr, daemon=True)]
+        for worker in workers:
+            worker.start()
+        timer = threading.Timer(_BAT_TIMEOUT, kill_on_timeout)
+        timer.start()
+        try:
+            stdout = process.stdout.read()
+        finally:
+            timer.cancel()
+            for worker in workers:
+                worker.join()
+            process.wait()
+        
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, _BAT_TIMEOUT)
+        return stdout, ''.join(stderr_parts)
+    
+    def _render_output(self, ansi_text: str, output_format: str) -> Tuple[Tuple[str, str], str]:
+        """依輸出格式轉換 bat 的輸出，回傳 (外層前後綴, 內文)；ANSI 格式原樣回傳"""
+        if output_format == OUTPUT_ANSI:
+            return _NO_WRAP, ansi_text
+        return self._convert_ansi_to_html(ansi_text)
+    
+    def _convert_ansi_to_html(self, ansi_text: str) -> Tuple[Tuple[str, str], str]:
         """
         將 ANSI 顏色代碼轉換為 HTML
         
@@ -351,95 +868,108 @@ class BatModel:
             ansi_text: 包含 ANSI 代碼的文本
             
         Returns:
-            str: 轉換後的 HTML
+            Tuple[Tuple[str, str], str]: (外層前後綴, HTML 內文)，完整 HTML 為 前綴 + 內文 + 後綴
         """
         try:
-            # 使用 ansi2html 轉換
-            from ansi2html import Ansi2HTMLConverter
-            converter = Ansi2HTMLConverter(inline=True, dark_bg=True)
-            html = converter.convert(ansi_text)
-            
-            # 添加自定義樣式
-            styled_html = f"""
-            <div style="font-family: 'Consolas', 'Monaco', 'Courier New', monospace; 
-                        font-size: 13px; 
-                        line-height: 1.4; 
-                        background-color: #1e1e1e; 
-                        color: #d4d4d4; 
-                        padding: 10px; 
-                        border-radius: 4px;
-                        overflow-x: auto;">
-                {html}
-            </div>
-            """
-            
-            return styled_html
-            
-        except ImportError:
+            html = _ansi_to_html_fragment(ansi_text)
+            if html is None and _ANSI_CONVERTER is not None:
+                # 含有 SGR 以外的控制序列時改用 ansi2html，只取內容片段，不產生完整文件外殼
+                with _ANSI_CONVERTER_LOCK:
+                    html = _ANSI_CONVERTER.convert(ansi_text, full=False)
+            if html is not None:
+                return _ANSI_WRAP, html
+            
             # 如果沒有 ansi2html，使用簡單的 HTML 包裝
             logger.warning("ansi2html not available, using simple HTML wrapper")
             escaped_text = (ansi_text.replace('&', '&amp;')
                                     .replace('<', '&lt;')
                                     .replace('>', '&gt;'))
-            
-            return f"""
-            <div style="font-family: 'Consolas', 'Monaco', 'Courier New', monospace; 
-                        font-size: 13px; 
-                        line-height: 1.4; 
-                        background-color: #1e1e1e; 
-                        color: #d4d4d4; 
-                        padding: 10px; 
-                        border-radius: 4px;
-                        white-space: pre-wrap;
-                        overflow-x: auto;">
-                {escaped_text}
-            </div>
-            """
+            return _PLAIN_WRAP, escaped_text
         except Exception as e:
             logger.error(f"Error converting ANSI to HTML: {e}")
-            return f"<pre>{ansi_text}</pre>"
+            return _PRE_WRAP, ansi_text
     
     def _generate_cache_key(self, file_path: str, theme: str, show_line_numbers: bool,
                            show_git_modifications: bool, tab_width: int, wrap_text: bool,
-                           language: Optional[str]) -> str:
-        """生成檔案快取鍵"""
-        import hashlib
-        
-        # 獲取檔案修改時間
-        try:
-            mtime = os.path.getmtime(file_path)
-        except OSError:
-            mtime = 0
-        
+                           language: Optional[str], mtime_ns: int, size: int,
+                           output_format: str = OUTPUT_HTML) -> str:
+        """生成檔案快取鍵，納入檔案大小以分辨修改時間相同的原子替換"""
         # 生成參數字符串
-        params = f"{file_path}|{theme}|{show_line_numbers}|{show_git_modifications}|{tab_width}|{wrap_text}|{language}|{mtime}"
+        params = f"{file_path}|{theme}|{show_line_numbers}|{show_git_modifications}|{tab_width}|{wrap_text}|{language}|{mtime_ns}|{size}|{output_format}"
         
-        return hashlib.md5(params.encode('utf-8')).hexdigest()
+        return _new_cache_digest(params.encode('utf-8')).hexdigest()
     
     def _generate_text_cache_key(self, text: str, language: str, theme: str,
-                                show_line_numbers: bool, tab_width: int, wrap_text: bool) -> str:
-        """生成文本快取鍵"""
-        import hashlib
+                                show_line_numbers: bool, tab_width: int, wrap_text: bool,
+                                output_format: str = OUTPUT_HTML) -> str:
+        """生成文本快取鍵（雜湊完整文本，避免只取樣時內容不同卻命中舊結果）"""
+        # 參數與文本分開送入雜湊，不為大型文本再組出一份合併字串
+        digest = _new_cache_digest()
+        digest.update(f"{language}|{theme}|{show_line_numbers}|{tab_width}|{wrap_text}|{output_format}|".encode('utf-8'))
+        digest.update(text.encode('utf-8', errors='surrogatepass'))
+        return digest.hexdigest()
+    
+    def _get_cached_result(self, cache_key: str) -> Optional[str]:
+        """讀取未過期的快取內容並套上外層，命中時標記為最近使用"""
+        with self._cache_lock:
+            cache_entry = self.cache.get(cache_key)
+            if cache_entry is None:
+                return None
+            if time.time() - cache_entry['timestamp'] >= self.cache_ttl:
+                return None
+            self.cache.move_to_end(cache_key)
+        prefix, suffix = cache_entry['wrap']
+        return prefix + cache_entry['content'] + suffix
+    
+    def _await_or_claim(self, cache_key: str) -> Tuple[Optional[str], Optional[threading.Event]]:
+        """
+        讀取快取；未命中時若同一個鍵正由其他線程產生，等待其完成後再讀一次，
+        否則登記為產生者並回傳事件，呼叫端完成後須交給 _release_inflight
         
-        # 生成參數字符串
-        params = f"{text}|{language}|{theme}|{show_line_numbers}|{tab_width}|{wrap_text}"
+        Returns:
+            Tuple[Optional[str], Optional[threading.Event]]: (快取內容, 登記的事件)
+        """
+        with self._cache_lock:
+            cached_content = self._get_cached_result(cache_key)
+            if cached_content is not None:
+                return cached_content, None
+            event = self._inflight.get(cache_key)
+            if event is None:
+                event = self._inflight[cache_key] = threading.Event()
+                return None, event
         
-        return hashlib.md5(params.encode('utf-8')).hexdigest()
+        event.wait(_BAT_TIMEOUT)
+        # 對方失敗或被取消而未寫入快取時，由目前線程自行執行
+        return self._get_cached_result(cache_key), None
     
-    def _cache_result(self, cache_key: str, content: str):
-        """快取結果"""
+    def _release_inflight(self, cache_key: str, event: threading.Event):
+        """結束產生中的登記並喚醒等待者"""
+        with self._cache_lock:
+            if self._inflight.get(cache_key) is event:
+                del self._inflight[cache_key]
+        event.set()
+    
+    def _cache_result(self, cache_key: str, content: str, wrap: Tuple[str, str] = _NO_WRAP):
+        """快取結果；只存 HTML 內文，外層以共用常數記錄，不計入快取大小"""
         try:
-            # 檢查快取大小限制
-            total_size = sum(len(entry['content']) for entry in self.cache.values())
-            
-            # 如果超過限制，清理舊的快取項
-            if total_size > self.max_cache_size:
-                self._cleanup_cache()
-            
-            self.cache[cache_key] = {
-                'content': content,
-                'timestamp': time.time()
-            }
+            size = len(content)
+            with self._cache_lock:
+                # 覆寫同一個鍵時先扣除舊內容的大小
+                previous = self.cache.pop(cache_key, None)
+                if previous is not None:
+                    self._total_size -= len(previous['content'])
+                
+                # 超過大小限制時從最久未使用的項目開始淘汰
+                while self.cache and self._total_size + size > self.max_cache_size:
+                    _, evicted = self.cache.popitem(last=False)
+                    self._total_size -= len(evicted['content'])
+                
+                self.cache[cache_key] = {
+                    'content': content,
+                    'wrap': wrap,
+                    'timestamp': time.time()
+                }
+                self._total_size += size
             
             logger.debug(f"Cached result with key: {cache_key[:16]}...")
             
@@ -450,14 +980,12 @@ class BatModel:
         """清理過期的快取項"""
         try:
             current_time = time.time()
-            expired_keys = []
-            
-            for key, entry in self.cache.items():
-                if current_time - entry['timestamp'] > self.cache_ttl:
-                    expired_keys.append(key)
             
-            for key in expired_keys:
-                del self.cache[key]
+            with self._cache_lock:
+                expired_keys = [key for key, entry in self.cache.items()
+                                if current_time - entry['timestamp'] > self.cache_ttl]
+                for key in expired_keys:
+                    self._total_size -= len(self.cache.pop(key)['content'])
             
             logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
             
@@ -467,8 +995,13 @@ class BatModel:
     def clear_cache(self):
         """清除所有快取"""
         try:
-            cache_size = len(self.cache)
-            self.cache.clear()
+            with self._cache_lock:
+                cache_size = len(self.cache)
+                self.cache.clear()
+                self._total_size = 0
+                self._last_file_result = None
+                self._last_text_result = None
+            self.invalidate_capabilities()
             logger.info(f"Cleared {cache_size} cache entries")
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
@@ -476,7 +1009,7 @@ class BatModel:
     def get_cache_info(self) -> Dict[str, Any]:
         """獲取快取信息"""
         try:
-            total_size = sum(len(entry['content']) for entry in self.cache.values())
+            total_size = self._total_size
             current_time = time.time()
             
             # 統計有效和過期的快取項
@@ -4,18 +4,258 @@ Bat 視圖類 - PyQt5 用戶界面
 
 import os
 import logging
-from typing import List, Optional
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, 
-    QCheckBox, QSpinBox, QPushButton, QTextBrowser, QFileDialog,
+    QCheckBox, QSpinBox, QPushButton, QPlainTextEdit, QPlainTextDocumentLayout, QFileDialog,
     QSplitter, QGroupBox, QGridLayout, QProgressBar, QFrame,
     QTextEdit, QTabWidget, QLineEdit, QMessageBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QTextCursor
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QObject, QRunnable, QThreadPool, QSignalBlocker
+from PyQt5.QtGui import QFont, QTextCursor, QTextCharFormat, QColor, QTextDocument
+
+from config.config_manager import config_manager
+from .bat_model import SgrState, iter_ansi_runs, strip_control_sequences
 
 logger = logging.getLogger(__name__)
 
+# 顯示區的行數上限，避免超大檔案無限制佔用記憶體
+MAX_DISPLAY_BLOCKS = 500000
+# 視圖層保留的檔案輸出數量，重複高亮同一檔案與設定時不必再經過控制器
+RENDER_CACHE_SIZE = 32
+# 與過去 HTML 外層相同的底色與預設文字色
+_DISPLAY_STYLE = "QPlainTextEdit { background-color: #1e1e1e; color: #d4d4d4; }"
+_CHAR_FORMAT_CACHE: Dict[SgrState, QTextCharFormat] = {}
+_MONO_FONT: Optional[QFont] = None
+
+# 主題下拉框的 (顯示名稱, bat 主題名稱)
+BAT_THEMES = (
+    ("1337", "1337"),
+    ("Coldark-Cold", "Coldark-Cold"),
+    ("Coldark-Dark", "Coldark-Dark"),
+    ("DarkNeon", "DarkNeon"),
+    ("Dracula", "Dracula"),
+    ("GitHub", "GitHub"),
+    ("Monokai Extended", "Monokai Extended"),
+    ("Monokai Extended Bright", "Monokai Extended Bright"),
+    ("Monokai Extended Light", "Monokai Extended Light"),
+    ("Monokai Extended Origin", "Monokai Extended Origin"),
+    ("Nord", "Nord"),
+    ("OneHalfDark", "OneHalfDark"),
+    ("OneHalfLight", "OneHalfLight"),
+    ("Solarized (dark)", "Solarized (dark)"),
+    ("Solarized (light)", "Solarized (light)"),
+    ("Sublime Snazzy", "Sublime Snazzy"),
+    ("Visual Studio Dark+", "Visual Studio Dark+"),
+    ("ansi", "ansi"),
+    ("base16", "base16"),
+    ("gruvbox-dark", "gruvbox-dark"),
+)
+# bat 主題名稱 -> 主題下拉框索引
+_THEME_INDEX = {value: index for index, (_, value) in enumerate(BAT_THEMES)}
+DEFAULT_THEME = "Monokai Extended"
+# 檔案與文本語言下拉框共用的 (顯示名稱, bat 語言名稱)
+COMMON_LANGUAGES = (
+    ("Python", "python"),
+    ("JavaScript", "javascript"),
+    ("TypeScript", "typescript"),
+    ("HTML", "html"),
+    ("CSS", "css"),
+    ("JSON", "json"),
+    ("XML", "xml"),
+    ("YAML", "yaml"),
+    ("C", "c"),
+    ("C++", "cpp"),
+    ("Java", "java"),
+    ("Go", "go"),
+    ("Rust", "rust"),
+    ("Ruby", "ruby"),
+    ("PHP", "php"),
+    ("Shell", "bash"),
+    ("PowerShell", "powershell"),
+    ("SQL", "sql"),
+    ("Markdown", "markdown"),
+)
+
+
+def _char_format(state: SgrState) -> QTextCharFormat:
+    """將 SGR 樣式狀態轉為 QTextCharFormat，同一狀態只建立一次"""
+    char_format = _CHAR_FORMAT_CACHE.get(state)
+    if char_format is None:
+        bold, italic, underline, fg, bg = state
+        char_format = QTextCharFormat()
+        if bold:
+            char_format.setFontWeight(QFont.Bold)
+        if italic:
+            char_format.setFontItalic(True)
+        if underline:
+            char_format.setFontUnderline(True)
+        if fg:
+            char_format.setForeground(QColor(fg))
+        if bg:
+            char_format.setBackground(QColor(bg))
+        _CHAR_FORMAT_CACHE[state] = char_format
+    return char_format
+
+
+def _fill_combo(combo: QComboBox, items: Tuple[Tuple[str, str], ...]):
+    """一次插入所有列再逐列寫入顯示文字與資料，不逐項 addItem 觸發信號"""
+    model = combo.model()
+    start = model.rowCount()
+    with QSignalBlocker(combo):
+        model.insertRows(start, len(items))
+        for row, (display_name, value) in enumerate(items, start):
+            index = model.index(row, 0)
+            model.setData(index, display_name, Qt.DisplayRole)
+            model.setData(index, value, Qt.UserRole)
+
+
+def _mono_font() -> QFont:
+    """程式碼區共用的等寬字型，第一次使用時才建立（需在 QApplication 之後）"""
+    global _MONO_FONT
+    if _MONO_FONT is None:
+        _MONO_FONT = QFont("Consolas", 11)
+        # 沒有 Consolas 的平台直接以等寬字型替代
+        _MONO_FONT.setStyleHint(QFont.Monospace)
+    return _MONO_FONT
+
+
+def create_code_display() -> QPlainTextEdit:
+    """建立唯讀的程式碼顯示區；bat 已處理換行，顯示區不再自動換行"""
+    display = QPlainTextEdit()
+    display.setReadOnly(True)
+    display.setUndoRedoEnabled(False)  # 唯讀顯示不需要復原紀錄
+    display.setFont(_mono_font())
+    display.setLineWrapMode(QPlainTextEdit.NoWrap)
+    display.setMaximumBlockCount(MAX_DISPLAY_BLOCKS)
+    display.setStyleSheet(_DISPLAY_STYLE)
+    return display
+
+
+def _insert_runs(cursor: QTextCursor, runs: Iterator[Tuple[str, SgrState]],
+                 max_chars: Optional[int] = None) -> bool:
+    """
+    以一個編輯區塊插入帶格式的文字片段，直接使用 QTextCursor，不經過 QTextDocument 的 HTML／CSS 解析
+    
+    Returns:
+        bool: 片段是否已全部寫完；達到 max_chars 時提前停止並回傳 False
+    """
+    written = 0
+    cursor.beginEditBlock()
+    try:
+        for text, state in runs:
+            cursor.insertText(strip_control_sequences(text), _char_format(state))
+            written += len(text)
+            if max_chars is not None and written >= max_chars:
+                return False
+        return True
+    finally:
+        cursor.endEditBlock()
+
+
+class ChunkedAnsiRenderer(QObject):
+    """
+    分段將 ANSI 輸出寫入顯示區：第一段同步寫入讓畫面立即可見，
+    其餘在事件迴圈空檔逐段附加，大型檔案不會長時間凍結介面
+    
+    每次顯示新內容都先在未掛上檢視的新文件中寫好第一段再一次換上，
+    不在可見的文件上清空舊內容並觸發中間的版面配置
+    """
+    
+    finished = pyqtSignal()
+    
+    CHUNK_CHARS = 64 * 1024
+    
+    def __init__(self, display: QPlainTextEdit, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.display = display
+        self._runs: Optional[Iterator[Tuple[str, SgrState]]] = None
+        self._cursor: Optional[QTextCursor] = None
+        self._document: Optional[QTextDocument] = None  # 由渲染器建立、目前掛在顯示區的文件
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._append_chunk)
+    
+    def start(self, ansi_text: str):
+        """開始顯示新內容，尚未寫完的舊內容直接放棄"""
+        self.cancel()
+        document = self._create_document()
+        self._runs = iter_ansi_runs(ansi_text.rstrip('\n'))
+        self._cursor = QTextCursor(document)
+        done = _insert_runs(self._cursor, self._runs, self.CHUNK_CHARS)
+        
+        # 一次換上已寫好第一段的文件，舊文件隨後釋放
+        self.display.setDocument(document)
+        if self._document is not None:
+            self._document.deleteLater()
+        self._document = document
+        self.display.moveCursor(QTextCursor.Start)
+        self._chunk_written(done)
+    
+    def _create_document(self) -> QTextDocument:
+        """建立與顯示區設定相同、尚未掛上檢視的純文字文件"""
+        document = QTextDocument(self)
+        document.setDocumentLayout(QPlainTextDocumentLayout(document))
+        document.setDefaultFont(self.display.font())
+        document.setUndoRedoEnabled(False)
+        document.setMaximumBlockCount(self.display.maximumBlockCount())
+        return document
+    
+    def cancel(self):
+        """停止尚未完成的分段寫入"""
+        self._timer.stop()
+        self._runs = None
+        self._cursor = None
+    
+    def is_running(self) -> bool:
+        """是否仍有片段等待寫入"""
+        return self._runs is not None
+    
+    def _append_chunk(self):
+        """寫入一段內容"""
+        if self._runs is None:
+            return
+        self._cursor.movePosition(QTextCursor.End)
+        self._chunk_written(_insert_runs(self._cursor, self._runs, self.CHUNK_CHARS))
+    
+    def _chunk_written(self, done: bool):
+        """全部寫完時發出 finished，否則排程下一段"""
+        if done:
+            self._runs = None
+            self._cursor = None
+            self.finished.emit()
+        else:
+            self._timer.start()
+
+
+class _PathStatNotifier(QObject):
+    """將背景 stat 結果以佇列連線送回 GUI 執行緒"""
+    
+    done = pyqtSignal(int, object)  # (請求編號, os.stat_result 或 None)
+
+
+class _PathStatTask(QRunnable):
+    """在執行緒池中對路徑做 stat，網路磁碟反應慢時不會卡住介面"""
+    
+    def __init__(self, path: str, token: int, notifier: _PathStatNotifier):
+        super().__init__()
+        self.path = path
+        self.token = token
+        self.notifier = notifier
+    
+    def run(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            stat = None
+        try:
+            self.notifier.done.emit(self.token, stat)
+        except RuntimeError:
+            # 視圖已關閉，結果直接丟棄
+            pass
+
 
 class BatView(QWidget):
     """Bat 工具的視圖類"""
@@ -25,20 +265,43 @@ class BatView(QWidget):
     text_highlight_requested = pyqtSignal(str, str, str, bool, int, bool, bool)  # 文本高亮請求
     check_bat_requested = pyqtSignal()  # 檢查 bat 工具
     clear_cache_requested = pyqtSignal()  # 清除快取請求
+    cancel_file_highlight_requested = pyqtSignal()  # 取消進行中的檔案高亮請求
     
     def __init__(self):
         super().__init__()
         self.current_file = ""
-        self.recent_files = []
         self.max_recent_files = 10
+        self.recent_files = deque(maxlen=self.max_recent_files)
+        # 路徑 -> 顯示名稱，recent_files 仍只存路徑以維持設定檔格式
+        self._recent_file_names: Dict[str, str] = {}
+        
+        # (檔案路徑, mtime, 大小, 各項設定) -> bat 輸出；mtime 變動時舊項目自然不再命中
+        self._render_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._last_request_key: Optional[tuple] = None
+        
+        # 路徑檢查在執行緒池中進行，結果依請求編號交給對應的回呼
+        self._stat_notifier = _PathStatNotifier(self)
+        self._stat_notifier.done.connect(self._on_path_stat)
+        self._stat_callbacks: Dict[int, Callable] = {}
+        self._stat_token = 0
+        self._file_request_token = 0
+        self._recent_check_token = 0
+        
+        # 最近檔案輸入停止 200ms 後才檢查路徑，避免每個按鍵都做一次檔案系統查詢
+        self._pending_recent_text = ""
+        self._recent_debounce = QTimer(self)
+        self._recent_debounce.setSingleShot(True)
+        self._recent_debounce.setInterval(200)
+        self._recent_debounce.timeout.connect(self._commit_recent_file_change)
         
         # 初始化界面
         self.init_ui()
         
-        # 設置定時器用於狀態更新
-        self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self._update_status)
-        self.status_timer.start(5000)  # 每5秒更新一次狀態
+        # 大型輸出分段寫入，全部寫完後才結束處理狀態
+        self._file_renderer = ChunkedAnsiRenderer(self.file_display, self)
+        self._file_renderer.finished.connect(self._on_file_render_finished)
+        self._text_renderer = ChunkedAnsiRenderer(self.text_display, self)
+        self._text_renderer.finished.connect(self._on_text_render_finished)
         
         logger.info("BatView initialized")
     
@@ -76,6 +339,9 @@ class BatView(QWidget):
         status_layout.addWidget(self.progress_bar)
         
         layout.addLayout(status_layout)
+        
+        # 處理期間一併停用的按鈕
+        self._toggle_buttons = (self.highlight_file_btn, self.highlight_text_btn, self.check_tool_btn)
     
     def _create_control_panel(self) -> QWidget:
         """創建控制面板"""
@@ -199,8 +465,7 @@ class BatView(QWidget):
         self.content_tabs = QTabWidget()
         
         # 檔案顯示標籤頁
-        self.file_display = QTextBrowser()
-        self.file_display.setFont(QFont("Consolas", 11))
+        self.file_display = create_code_display()
         self.content_tabs.addTab(self.file_display, "檔案內容")
         
         # 文本輸入標籤頁
@@ -227,12 +492,11 @@ class BatView(QWidget):
         text_splitter = QSplitter(Qt.Vertical)
         
         self.text_input = QTextEdit()
-        self.text_input.setFont(QFont("Consolas", 11))
+        self.text_input.setFont(_mono_font())
         self.text_input.setPlaceholderText("在此輸入要高亮顯示的程式碼...")
         text_splitter.addWidget(self.text_input)
         
-        self.text_display = QTextBrowser()
-        self.text_display.setFont(QFont("Consolas", 11))
+        self.text_display = create_code_display()
         text_splitter.addWidget(self.text_display)
         
         text_splitter.setSizes([200, 400])
@@ -246,83 +510,20 @@ class BatView(QWidget):
     
     def _populate_theme_combo(self):
         """填充主題下拉框"""
-        themes = [
-            ("1337", "1337"),
-            ("Coldark-Cold", "Coldark-Cold"), 
-            ("Coldark-Dark", "Coldark-Dark"),
-            ("DarkNeon", "DarkNeon"),
-            ("Dracula", "Dracula"),
-            ("GitHub", "GitHub"),
-            ("Monokai Extended", "Monokai Extended"),
-            ("Monokai Extended Bright", "Monokai Extended Bright"),
-            ("Monokai Extended Light", "Monokai Extended Light"),
-            ("Monokai Extended Origin", "Monokai Extended Origin"),
-            ("Nord", "Nord"),
-            ("OneHalfDark", "OneHalfDark"),
-            ("OneHalfLight", "OneHalfLight"),
-            ("Solarized (dark)", "Solarized (dark)"),
-            ("Solarized (light)", "Solarized (light)"),
-            ("Sublime Snazzy", "Sublime Snazzy"),
-            ("Visual Studio Dark+", "Visual Studio Dark+"),
-            ("ansi", "ansi"),
-            ("base16", "base16"),
-            ("gruvbox-dark", "gruvbox-dark")
-        ]
-        
-        for display_name, value in themes:
-            self.theme_combo.addItem(display_name, value)
-        
-        # 設置預設值
-        self._set_theme_selection("Monokai Extended")
+        _fill_combo(self.theme_combo, BAT_THEMES)
+        
+        # 設置預設值：填入時就以設定檔的預設主題決定索引，設定值不在列表中時退回內建預設
+        default_theme = config_manager.get('tools.bat.default_theme', DEFAULT_THEME)
+        self.theme_combo.setCurrentIndex(
+            _THEME_INDEX.get(default_theme, _THEME_INDEX[DEFAULT_THEME]))
     
     def _populate_language_combo(self):
         """填充語言下拉框"""
-        common_languages = [
-            ("Python", "python"),
-            ("JavaScript", "javascript"),
-            ("TypeScript", "typescript"),
-            ("HTML", "html"),
-            ("CSS", "css"),
-            ("JSON", "json"),
-            ("XML", "xml"),
-            ("YAML", "yaml"),
-            ("C", "c"),
-            ("C++", "cpp"),
-            ("Java", "java"),
-            ("Go", "go"),
-            ("Rust", "rust"),
-            ("Ruby", "ruby"),
-            ("PHP", "php"),
-            ("Shell", "bash"),
-            ("PowerShell", "powershell"),
-            ("SQL", "sql"),
-            ("Markdown", "markdown")
-        ]
-        
-        for display_name, value in common_languages:
-            self.language_combo.addItem(display_name, value)
+        _fill_combo(self.language_combo, COMMON_LANGUAGES)
     
     def _populate_text_language_combo(self):
         """填充文本語言下拉框"""
-        self.text_language_combo.addItem("Python", "python")
-        self.text_language_combo.addItem("JavaScript", "javascript")
-        self.text_language_combo.addItem("TypeScript", "typescript")
-        self.text_language_combo.addItem("HTML", "html")
-        self.text_language_combo.addItem("CSS", "css")
-        self.text_language_combo.addItem("JSON", "json")
-        self.text_language_combo.addItem("XML", "xml")
-        self.text_language_combo.addItem("YAML", "yaml")
-        self.text_language_combo.addItem("C", "c")
-        self.text_language_combo.addItem("C++", "cpp")
-        self.text_language_combo.addItem("Java", "java")
-        self.text_language_combo.addItem("Go", "go")
-        self.text_language_combo.addItem("Rust", "rust")
-        self.text_language_combo.addItem("Ruby", "ruby")
-        self.text_language_combo.addItem("PHP", "php")
-        self.text_language_combo.addItem("Shell", "bash")
-        self.text_language_combo.addItem("PowerShell", "powershell")
-        self.text_language_combo.addItem("SQL", "sql")
-        self.text_language_combo.addItem("Markdown", "markdown")
+        _fill_combo(self.text_language_combo, COMMON_LANGUAGES)
     
     def _browse_file(self):
         """瀏覽選擇檔案"""
@@ -349,35 +550,72 @@ class BatView(QWidget):
     
     def _add_to_recent_files(self, file_path: str):
         """添加到最近檔案列表"""
-        if file_path in self.recent_files:
+        try:
             self.recent_files.remove(file_path)
+        except ValueError:
+            # 保持最大數量限制，被擠出的路徑一併移除顯示名稱
+            if len(self.recent_files) == self.recent_files.maxlen:
+                self._recent_file_names.pop(self.recent_files.pop(), None)
         
-        self.recent_files.insert(0, file_path)
-        
-        # 保持最大數量限制
-        if len(self.recent_files) > self.max_recent_files:
-            self.recent_files = self.recent_files[:self.max_recent_files]
-        
+        self.recent_files.appendleft(file_path)
+        self._recent_file_names[file_path] = os.path.basename(file_path)
+        self._update_recent_files_combo()
+    
+    def set_recent_files(self, file_paths: List[str]):
+        """以設定檔中的路徑列表取代最近檔案"""
+        self.recent_files = deque(file_paths, maxlen=self.max_recent_files)
+        self._recent_file_names = {}
         self._update_recent_files_combo()
     
     def _update_recent_files_combo(self):
         """更新最近檔案下拉框"""
         current_text = self.recent_files_combo.currentText()
         
-        self.recent_files_combo.clear()
-        
-        for file_path in self.recent_files:
-            self.recent_files_combo.addItem(os.path.basename(file_path), file_path)
-        
-        # 如果當前文本不在列表中，添加它
-        if current_text and current_text not in self.recent_files:
-            self.recent_files_combo.setCurrentText(current_text)
+        # 重建與還原文字期間不觸發 currentTextChanged，避免連帶檢查路徑
+        names = self._recent_file_names
+        with QSignalBlocker(self.recent_files_combo):
+            self.recent_files_combo.clear()
+            for file_path in self.recent_files:
+                name = names.get(file_path)
+                if name is None:
+                    name = names[file_path] = os.path.basename(file_path)
+                self.recent_files_combo.addItem(name, file_path)
+            
+            # 如果當前文本不在列表中，添加它
+            if current_text and current_text not in self.recent_files:
+                self.recent_files_combo.setCurrentText(current_text)
     
     def _on_recent_file_changed(self, file_path: str):
         """最近檔案改變時的處理"""
-        if file_path and os.path.exists(file_path):
+        self._pending_recent_text = file_path
+        self._recent_debounce.start()
+    
+    def _commit_recent_file_change(self):
+        """輸入停止後確認最近檔案路徑"""
+        file_path = self._pending_recent_text
+        if file_path:
+            self._recent_check_token = self._stat_path_async(
+                file_path, lambda stat, token: self._on_recent_file_stat(file_path, stat, token))
+    
+    def _on_recent_file_stat(self, file_path: str, stat, token: int):
+        """最近檔案路徑檢查完成"""
+        if token == self._recent_check_token and stat is not None:
             self.current_file = file_path
     
+    def _stat_path_async(self, path: str, callback: Callable) -> int:
+        """在背景執行緒 stat 路徑，完成後於 GUI 執行緒呼叫 callback(stat, token)"""
+        self._stat_token += 1
+        token = self._stat_token
+        self._stat_callbacks[token] = callback
+        QThreadPool.globalInstance().start(_PathStatTask(path, token, self._stat_notifier))
+        return token
+    
+    def _on_path_stat(self, token: int, stat):
+        """背景 stat 完成"""
+        callback = self._stat_callbacks.pop(token, None)
+        if callback is not None:
+            callback(stat, token)
+    
     def _request_file_highlight(self):
         """請求檔案高亮"""
         file_path = self.recent_files_combo.currentText().strip()
@@ -385,27 +623,47 @@ class BatView(QWidget):
             self._show_message("請選擇要高亮顯示的檔案")
             return
         
-        if not os.path.exists(file_path):
+        # 獲取設定
+        settings = (
+            self.theme_combo.currentData() or DEFAULT_THEME,
+            self.line_numbers_check.isChecked(),
+            self.git_modifications_check.isChecked(),
+            self.tab_width_spin.value(),
+            self.wrap_text_check.isChecked(),
+            self.language_combo.currentData() or "",
+        )
+        use_cache = self.use_cache_check.isChecked()
+        
+        # 檔案檢查在背景進行，期間先顯示處理狀態
+        self._last_request_key = None
+        self._set_processing_state(True, "正在高亮顯示檔案...")
+        self._file_request_token = self._stat_path_async(
+            file_path,
+            lambda stat, token: self._on_file_stat(file_path, settings, use_cache, stat, token))
+    
+    def _on_file_stat(self, file_path: str, settings: tuple, use_cache: bool, stat, token: int):
+        """檔案檢查完成後決定重用快取或發出高亮請求"""
+        if token != self._file_request_token:
+            return
+        if stat is None:
+            self._set_processing_state(False)
             self._show_message(f"檔案不存在: {file_path}")
             return
         
-        # 獲取設定
-        theme = self.theme_combo.currentData() or "Monokai Extended"
-        show_line_numbers = self.line_numbers_check.isChecked()
-        show_git_modifications = self.git_modifications_check.isChecked()
-        tab_width = self.tab_width_spin.value()
-        wrap_text = self.wrap_text_check.isChecked()
-        language = self.language_combo.currentData() or ""
-        use_cache = self.use_cache_check.isChecked()
+        # 檔案與設定都沒變時直接重用上次的輸出
+        if use_cache:
+            key = (file_path, stat.st_mtime_ns, stat.st_size) + settings
+            content = self._render_cache.get(key)
+            if content is not None:
+                self._render_cache.move_to_end(key)
+                # 先取消較早未命中時發出的高亮，避免其較晚送達的結果覆蓋這次的內容
+                self.cancel_file_highlight_requested.emit()
+                self.display_file_content(content)
+                return
+            self._last_request_key = key
         
         # 發送信號
-        self.file_highlight_requested.emit(
-            file_path, theme, show_line_numbers, show_git_modifications,
-            tab_width, wrap_text, language, use_cache
-        )
-        
-        # 更新界面狀態
-        self._set_processing_state(True, "正在高亮顯示檔案...")
+        self.file_highlight_requested.emit(file_path, *settings, use_cache)
     
     def _request_text_highlight(self):
         """請求文本高亮"""
@@ -416,7 +674,7 @@ class BatView(QWidget):
         
         # 獲取設定
         language = self.text_language_combo.currentData() or "python"
-        theme = self.theme_combo.currentData() or "Monokai Extended"
+        theme = self.theme_combo.currentData() or DEFAULT_THEME
         show_line_numbers = self.line_numbers_check.isChecked()
         tab_width = self.tab_width_spin.value()
         wrap_text = self.wrap_text_check.isChecked()
@@ -438,6 +696,8 @@ class BatView(QWidget):
     
     def _request_clear_cache(self):
         """請求清除快取"""
+        self._render_cache.clear()
+        self._last_request_key = None
         self.clear_cache_requested.emit()
         self._show_message("快取已清除")
     
@@ -455,54 +715,65 @@ class BatView(QWidget):
         # 這個方法將由控制器調用來獲取實際的快取信息
         pass
     
+    def snapshot_settings(self) -> Dict[str, object]:
+        """一次讀出所有可保存的設定"""
+        return {
+            "theme": self.theme_combo.currentData() or DEFAULT_THEME,
+            "show_line_numbers": self.line_numbers_check.isChecked(),
+            "show_git_modifications": self.git_modifications_check.isChecked(),
+            "tab_width": self.tab_width_spin.value(),
+            "wrap_text": self.wrap_text_check.isChecked(),
+            "use_cache": self.use_cache_check.isChecked(),
+            "recent_files": list(self.recent_files),
+        }
+    
     def _set_theme_selection(self, theme: str):
         """設置主題選擇"""
-        for i in range(self.theme_combo.count()):
-            if self.theme_combo.itemData(i) == theme:
-                self.theme_combo.setCurrentIndex(i)
-                break
+        index = _THEME_INDEX.get(theme)
+        if index is not None:
+            self.theme_combo.setCurrentIndex(index)
     
     def _set_processing_state(self, processing: bool, status_text: str = ""):
         """設置處理狀態"""
-        if processing:
-            self.progress_bar.setVisible(True)
+        if not processing and not status_text:
+            status_text = "準備就緒"
+        
+        # 暫停重繪，所有元件更新完後只重繪一次
+        self.setUpdatesEnabled(False)
+        try:
+            self.progress_bar.setVisible(processing)
             self.status_label.setText(status_text)
-            
-            # 禁用相關按鈕
-            self.highlight_file_btn.setEnabled(False)
-            self.highlight_text_btn.setEnabled(False)
-            self.check_tool_btn.setEnabled(False)
-            
-        else:
-            self.progress_bar.setVisible(False)
-            if not status_text:
-                self.status_label.setText("準備就緒")
-            else:
-                self.status_label.setText(status_text)
-            
-            # 啟用按鈕
-            self.highlight_file_btn.setEnabled(True)
-            self.highlight_text_btn.setEnabled(True)
-            self.check_tool_btn.setEnabled(True)
-    
-    def _update_status(self):
-        """更新狀態"""
-        # 定期狀態更新（由定時器調用）
-        pass
+            for button in self._toggle_buttons:
+                button.setEnabled(not processing)
+        finally:
+            self.setUpdatesEnabled(True)
     
     def _show_message(self, message: str):
         """顯示消息"""
         QMessageBox.information(self, "bat 工具", message)
     
-    def display_file_content(self, html_content: str):
-        """顯示檔案內容"""
-        self.file_display.setHtml(html_content)
-        self._set_processing_state(False, f"檔案已顯示 ({len(html_content)} 字符)")
+    def display_file_content(self, ansi_content: str):
+        """顯示檔案內容（bat 的 ANSI 輸出）"""
+        key, self._last_request_key = self._last_request_key, None
+        if key is not None:
+            self._render_cache[key] = ansi_content
+            self._render_cache.move_to_end(key)
+            while len(self._render_cache) > RENDER_CACHE_SIZE:
+                self._render_cache.popitem(last=False)
+        self._file_renderer.start(ansi_content)
+    
+    def display_text_content(self, ansi_content: str):
+        """顯示文本內容（bat 的 ANSI 輸出）"""
+        self._text_renderer.start(ansi_content)
+    
+    def _on_file_render_finished(self):
+        """檔案內容全部寫入後結束處理狀態"""
+        # 以顯示區的行數回報，不計入 ANSI 控制碼，也不必保留輸出字串
+        self._set_processing_state(False, f"檔案已顯示 ({self.file_display.blockCount()} 行)")
     
-    def display_text_content(self, html_content: str):
-        """顯示文本內容"""
-        self.text_display.setHtml(html_content)
-        self._set_processing_state(False, f"文本已高亮 ({len(html_content)} 字符)")
+    def _on_text_render_finished(self):
+        """文本內容全部寫入後結束處理狀態"""
+        self._set_processing_state(False, f"文本已高亮 ({self.text_display.blockCount()} 行)")
     
     def update_tool_status(self, available: bool, version: str, error: str):
         """更新工具狀態"""
@@ -533,6 +804,7 @@ class BatView(QWidget):
     
     def show_error(self, error_message: str):
         """顯示錯誤消息"""
+        self._last_request_key = None
         self.status_label.setText(f"錯誤: {error_message}")
         self._set_processing_state(False)
         QMessageBox.critical(self, "錯誤", error_message)
\ No newline at end of file
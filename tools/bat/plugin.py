@@ -3,26 +3,65 @@ Bat 語法高亮顯示插件實現
 實現 PluginInterface 接口，整合到 CLI 工具系統
 """
 
+import os
+import time
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from PyQt5.QtWidgets import QWidget
 from core.plugin_manager import PluginInterface
+from config.config_manager import config_manager
 from .bat_model import BatModel
-from .bat_view import BatView
+from .bat_view import BatView, DEFAULT_THEME
 from .bat_controller import BatController
 
 logger = logging.getLogger(__name__)
 
+# 支援的副檔名（保留原順序供顯示），判斷時以小寫集合查詢
+_SUPPORTED_FILE_TYPES = (
+    ".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".css", ".scss", ".sass",
+    ".json", ".xml", ".yaml", ".yml", ".toml", ".ini", ".cfg",
+    ".c", ".cpp", ".cc", ".cxx", ".h", ".hpp", ".hxx",
+    ".java", ".kt", ".scala", ".go", ".rs", ".rb", ".php",
+    ".sh", ".bash", ".zsh", ".fish", ".ps1", ".bat", ".cmd",
+    ".sql", ".r", ".R", ".m", ".swift", ".dart", ".lua",
+    ".md", ".markdown", ".txt", ".log", ".conf", ".config"
+)
+_SUPPORTED_EXTENSIONS = frozenset(ext.lower() for ext in _SUPPORTED_FILE_TYPES)
+
+# 視圖尚未建立時回報的設定（主題預設值依設定檔，於 get_settings 時決定）
+_DEFAULT_SETTINGS: Dict[str, Any] = {
+    "show_line_numbers": True,
+    "show_git_modifications": True,
+    "tab_width": 4,
+    "wrap_text": False,
+    "use_cache": True,
+    "recent_files": [],
+}
+
 
 class BatPlugin(PluginInterface):
     """Bat 語法高亮顯示插件"""
     
+    # 工具可用性檢查結果 (檢查時間, 是否可用)，狀態刷新時在有效期內直接沿用
+    TOOL_CHECK_TTL = 30.0
+    _tool_check_cache: Optional[Tuple[float, bool]] = None
+    
     def __init__(self):
         super().__init__()
         self._model = None
         self._view = None
         self._controller = None
         self._initialized = False
+        # 視圖建立前收到的設定，建立視圖時才套用
+        self._pending_settings: Optional[Dict[str, Any]] = None
+        # 命令名稱 -> 處理方法，execute_command 以查表分派
+        self._command_handlers = {
+            "highlight": self._command_highlight,
+            "check_tool": self._command_check_tool,
+            "clear_cache": self._command_clear_cache,
+            "set_theme": self._command_set_theme,
+            "open_file": self._command_open_file,
+        }
         
         logger.info("BatPlugin initialized")
     
@@ -53,10 +92,8 @@ class BatPlugin(PluginInterface):
                 logger.warning("BatPlugin already initialized")
                 return True
             
-            # 創建 MVC 組件
+            # 只先建立模型；視圖與控制器等到真正需要介面時才由 _ensure_view() 建立
             self._model = self.create_model()
-            self._view = self.create_view()
-            self._controller = self.create_controller(self._model, self._view)
             
             self._initialized = True
             logger.info("BatPlugin initialized successfully")
@@ -66,17 +103,46 @@ class BatPlugin(PluginInterface):
             logger.error(f"Failed to initialize BatPlugin: {e}")
             return False
     
-    def create_view(self):
-        """創建插件的 GUI 視圖"""
-        return BatView()
+    def _ensure_view(self) -> BatView:
+        """第一次需要介面時才建立視圖與控制器"""
+        if self._view is None or self._controller is None:
+            view = self.create_view()
+            self.create_controller(self.create_model(), view)
+        return self._view
+    
+    def create_view(self, fresh: bool = False):
+        """創建插件的 GUI 視圖（預設重用已建立的實例，fresh=True 時另建新實例）"""
+        if fresh:
+            return BatView()
+        if self._view is None:
+            self._view = BatView()
+            self._apply_pending_settings()
+        return self._view
+    
+    def _apply_pending_settings(self):
+        """將視圖建立前暫存的設定套用到剛建立的插件視圖"""
+        if self._pending_settings is None:
+            return
+        # 未暫存的項目保留視圖目前的值（例如設定檔的預設主題）
+        settings = {**self._view.snapshot_settings(), **self._pending_settings}
+        self._pending_settings = None
+        self.apply_settings(settings)
     
-    def create_model(self):
-        """創建插件的數據模型"""
-        return BatModel()
+    def create_model(self, fresh: bool = False):
+        """創建插件的數據模型（預設重用已建立的實例，fresh=True 時另建新實例）"""
+        if fresh:
+            return BatModel()
+        if self._model is None:
+            self._model = BatModel()
+        return self._model
     
-    def create_controller(self, model, view):
-        """創建插件的控制器"""
-        return BatController(view, model)
+    def create_controller(self, model, view, fresh: bool = False):
+        """創建插件的控制器（僅在傳入的是插件自身的 model/view 時重用）"""
+        if fresh or model is not self._model or view is not self._view:
+            return BatController(view, model)
+        if self._controller is None:
+            self._controller = BatController(view, model)
+        return self._controller
     
     def cleanup(self):
         """清理插件資源"""
@@ -88,6 +154,7 @@ class BatPlugin(PluginInterface):
             self._controller = None
             self._view = None
             self._model = None
+            self._pending_settings = None
             self._initialized = False
             
             logger.info("BatPlugin cleanup completed")
@@ -97,10 +164,15 @@ class BatPlugin(PluginInterface):
     
     def check_tools_availability(self) -> bool:
         """檢查所需工具是否可用"""
+        cached = BatPlugin._tool_check_cache
+        if cached is not None and time.monotonic() - cached[0] < self.TOOL_CHECK_TTL:
+            return cached[1]
+        
         try:
-            # 創建臨時模型實例進行檢查
-            temp_model = BatModel()
-            available, _, _ = temp_model.check_bat_availability()
+            # 已初始化時沿用插件的模型，否則才建立臨時模型
+            model = self._model or BatModel()
+            available, _, _ = model.check_bat_availability()
+            BatPlugin._tool_check_cache = (time.monotonic(), available)
             return available
         except Exception as e:
             logger.error(f"Error checking bat tool availability: {e}")
@@ -112,7 +184,7 @@ class BatPlugin(PluginInterface):
             if not self.initialize():
                 return None
         
-        return self._view
+        return self._ensure_view()
     
     def is_initialized(self) -> bool:
         """檢查插件是否已初始化"""
@@ -132,15 +204,7 @@ class BatPlugin(PluginInterface):
     
     def get_supported_file_types(self) -> List[str]:
         """獲取支援的檔案類型"""
-        return [
-            ".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".css", ".scss", ".sass",
-            ".json", ".xml", ".yaml", ".yml", ".toml", ".ini", ".cfg",
-            ".c", ".cpp", ".cc", ".cxx", ".h", ".hpp", ".hxx",
-            ".java", ".kt", ".scala", ".go", ".rs", ".rb", ".php",
-            ".sh", ".bash", ".zsh", ".fish", ".ps1", ".bat", ".cmd",
-            ".sql", ".r", ".R", ".m", ".swift", ".dart", ".lua",
-            ".md", ".markdown", ".txt", ".log", ".conf", ".config"
-        ]
+        return list(_SUPPORTED_FILE_TYPES)
     
     def get_configuration_schema(self) -> Dict[str, Any]:
         """獲取配置模式"""
@@ -203,6 +267,13 @@ class BatPlugin(PluginInterface):
                 "maximum": 536870912,
                 "description": "最大快取大小（位元組）"
             },
+            "max_line_length": {
+                "type": "integer",
+                "default": 16384,
+                "minimum": 1024,
+                "maximum": 1048576,
+                "description": "單行長度上限，超過時改以純文字顯示"
+            },
             "recent_files": {
                 "type": "array",
                 "default": [],
@@ -215,17 +286,19 @@ class BatPlugin(PluginInterface):
         if not self.is_initialized():
             return {}
         
-        try:
-            # 從 View 獲取當前設定
-            return {
-                "theme": self._view.theme_combo.currentData() if self._view else "Monokai Extended",
-                "show_line_numbers": self._view.line_numbers_check.isChecked() if self._view else True,
-                "show_git_modifications": self._view.git_modifications_check.isChecked() if self._view else True,
-                "tab_width": self._view.tab_width_spin.value() if self._view else 4,
-                "wrap_text": self._view.wrap_text_check.isChecked() if self._view else False,
-                "use_cache": self._view.use_cache_check.isChecked() if self._view else True,
-                "recent_files": self._view.recent_files if self._view else []
+        if self._view is None:
+            # 暫存的設定可能只有部分項目，其餘沿用預設值
+            settings = {
+                "theme": config_manager.get('tools.bat.default_theme', DEFAULT_THEME),
+                **_DEFAULT_SETTINGS,
+                **(self._pending_settings or {}),
             }
+            settings["recent_files"] = list(settings["recent_files"])
+            return settings
+        
+        try:
+            # 從 View 一次取得當前設定
+            return self._view.snapshot_settings()
         except Exception as e:
             logger.error(f"Error getting bat settings: {e}")
             return {}
@@ -237,6 +310,8 @@ class BatPlugin(PluginInterface):
         
         try:
             if not self._view:
+                # 視圖尚未建立，與先前暫存的設定合併，建立時再一次套用
+                self._pending_settings = {**(self._pending_settings or {}), **settings}
                 return
             
             # 應用主題設定
@@ -263,8 +338,7 @@ class BatPlugin(PluginInterface):
             # 應用最近檔案設定
             recent_files = settings.get("recent_files", [])
             if isinstance(recent_files, list):
-                self._view.recent_files = recent_files
-                self._view._update_recent_files_combo()
+                self._view.set_recent_files(recent_files)
             
             logger.info("Bat settings applied successfully")
             
@@ -279,13 +353,12 @@ class BatPlugin(PluginInterface):
                     return False
             
             # 檢查檔案類型是否支援
-            supported_types = self.get_supported_file_types()
-            if not any(file_path.lower().endswith(ext) for ext in supported_types):
+            if os.path.splitext(file_path)[1].lower() not in _SUPPORTED_EXTENSIONS:
                 logger.warning(f"Unsupported file type: {file_path}")
                 return False
             
             # 設定檔案路徑
-            self._view._set_file_path(file_path)
+            self._ensure_view()._set_file_path(file_path)
             
             logger.info(f"File opened in bat plugin: {file_path}")
             return True
@@ -321,46 +394,44 @@ class BatPlugin(PluginInterface):
         if not self.is_initialized():
             return {"error": "Plugin not initialized"}
         
-        args = args or {}
+        handler = self._command_handlers.get(command)
+        if handler is None:
+            return {"error": f"Unknown command: {command}"}
         
         try:
-            if command == "highlight":
-                # 觸發語法高亮
-                self._view._request_highlight()
-                return {"status": "highlight_started"}
-                
-            elif command == "check_tool":
-                # 檢查工具
-                self._view.check_bat_requested.emit()
-                return {"status": "check_started"}
-                
-            elif command == "clear_cache":
-                # 清除快取
-                self._view.clear_cache_requested.emit()
-                return {"status": "cache_clear_started"}
-                
-            elif command == "set_theme":
-                # 設定主題
-                theme = args.get("theme", "Monokai Extended")
-                self._view._set_theme_selection(theme)
-                return {"status": f"theme_set_to_{theme}"}
-                
-            elif command == "open_file":
-                # 開啟檔案
-                file_path = args.get("file_path", "")
-                if file_path:
-                    self._view._set_file_path(file_path)
-                    return {"status": f"file_opened", "file_path": file_path}
-                else:
-                    return {"error": "No file path provided"}
-                    
-            else:
-                return {"error": f"Unknown command: {command}"}
-                
+            return handler(self._ensure_view(), args or {})
         except Exception as e:
             logger.error(f"Error executing bat command '{command}': {e}")
             return {"error": str(e)}
-
+    
+    def _command_highlight(self, view: BatView, args: Dict[str, Any]) -> Dict[str, Any]:
+        """觸發語法高亮"""
+        view._request_highlight()
+        return {"status": "highlight_started"}
+    
+    def _command_check_tool(self, view: BatView, args: Dict[str, Any]) -> Dict[str, Any]:
+        """檢查工具"""
+        view.check_bat_requested.emit()
+        return {"status": "check_started"}
+    
+    def _command_clear_cache(self, view: BatView, args: Dict[str, Any]) -> Dict[str, Any]:
+        """清除快取"""
+        view.clear_cache_requested.emit()
+        return {"status": "cache_clear_started"}
+    
+    def _command_set_theme(self, view: BatView, args: Dict[str, Any]) -> Dict[str, Any]:
+        """設定主題"""
+        theme = args.get("theme", "Monokai Extended")
+        view._set_theme_selection(theme)
+        return {"status": f"theme_set_to_{theme}"}
+    
+    def _command_open_file(self, view: BatView, args: Dict[str, Any]) -> Dict[str, Any]:
+        """開啟檔案"""
+        file_path = args.get("file_path", "")
+        if not file_path:
+            return {"error": "No file path provided"}
+        view._set_file_path(file_path)
+        return {"status": "file_opened", "file_path": file_path}
 
 # 插件工廠函式
 def create_plugin() -> PluginInterface:
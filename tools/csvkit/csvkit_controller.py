@@ -4,7 +4,10 @@ csvkit 控制器類 - 連接視圖和模型，處理用戶交互
 """
 
 import logging
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+import os
+import re
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import QApplication
 import ansi2html
 
@@ -13,53 +16,62 @@ from .csvkit_view import CsvkitView
 
 logger = logging.getLogger(__name__)
 
+# ANSI 控制序列或 csvlook 表格框線，輸出中只需掃描一次
+_HTML_SNIFF_RE = re.compile(r'\x1b\[|[│─┌└]')
 
-class CsvkitWorker(QThread):
-    """csvkit 工作線程 - 處理耗時的命令執行"""
+# 命令類型 -> 模型方法名稱
+_CMD_TABLE = {
+    'in2csv': 'execute_in2csv',
+    'csvcut': 'execute_csvcut',
+    'csvgrep': 'execute_csvgrep',
+    'csvstat': 'execute_csvstat',
+    'csvlook': 'execute_csvlook',
+    'csvjson': 'execute_csvjson',
+    'csvsql': 'execute_csvsql',
+    'csvjoin': 'execute_csvjoin',
+    'custom': 'execute_custom_command',
+    'help': 'get_tool_help',
+}
+
+# 結果只取決於參數（與輸入檔案內容）的命令，成功結果可直接重用
+_CACHEABLE_FILE_COMMANDS = frozenset({'csvstat', 'csvlook'})
+_RESULT_CACHE_SIZE = 64
+
+
+class WorkerSignals(QObject):
+    """csvkit 任務的信號，在 GUI 執行緒建立，背景任務發出時以佇列連線送回"""
     
     finished = pyqtSignal(str, str, int)  # stdout, stderr, returncode
     status_update = pyqtSignal(str)
+
+
+class CsvkitTask(QRunnable):
+    """csvkit 背景任務 - 在控制器的執行緒池中處理耗時的命令執行"""
     
     def __init__(self, model, command_type, *args):
         super().__init__()
         self.model = model
         self.command_type = command_type
         self.args = args
+        self.signals = WorkerSignals()
         
     def run(self):
         """執行命令"""
         try:
-            self.status_update.emit("執行命令中...")
+            self.signals.status_update.emit("執行命令中...")
             
             # 根據命令類型調用相應的模型方法
-            if self.command_type == 'in2csv':
-                result = self.model.execute_in2csv(*self.args)
-            elif self.command_type == 'csvcut':
-                result = self.model.execute_csvcut(*self.args)
-            elif self.command_type == 'csvgrep':
-                result = self.model.execute_csvgrep(*self.args)
-            elif self.command_type == 'csvstat':
-                result = self.model.execute_csvstat(*self.args)
-            elif self.command_type == 'csvlook':
-                result = self.model.execute_csvlook(*self.args)
-            elif self.command_type == 'csvjson':
-                result = self.model.execute_csvjson(*self.args)
-            elif self.command_type == 'csvsql':
-                result = self.model.execute_csvsql(*self.args)
-            elif self.command_type == 'csvjoin':
-                result = self.model.execute_csvjoin(*self.args)
-            elif self.command_type == 'custom':
-                result = self.model.execute_custom_command(*self.args)
-            elif self.command_type == 'help':
-                result = self.model.get_tool_help(*self.args)
+            method_name = _CMD_TABLE.get(self.command_type)
+            if method_name is not None:
+                result = getattr(self.model, method_name)(*self.args)
             else:
                 result = ("", f"Unknown command type: {self.command_type}", 1)
             
-            self.finished.emit(*result)
+            self.signals.finished.emit(*result)
             
         except Exception as e:
             logger.error(f"Error in worker thread: {e}")
-            self.finished.emit("", str(e), 1)
+            self.signals.finished.emit("", str(e), 1)
 
 
 class CsvkitController(QObject):
@@ -69,7 +81,15 @@ class CsvkitController(QObject):
         super().__init__()
         self.model = model if model is not None else CsvkitModel()
         self.view = view if view is not None else CsvkitView()
-        self.worker = None
+        # 單一執行緒的池：一次只執行一個命令，執行緒在命令之間重複使用
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._task_signals = None  # 執行中任務的信號，完成前保持參考
+        # ansi2html 轉換器第一次需要時才建立，之後重複使用（只在 GUI 執行緒使用）
+        self._ansi_converter = None
+        # (命令類型, 參數, 檔案 mtime/大小) -> (stdout, stderr, returncode)
+        self._result_cache = OrderedDict()
+        self._pending_cache_key = None
         
         self._connect_signals()
         self._initialize_view()
@@ -222,27 +242,63 @@ class CsvkitController(QObject):
                 f"保存檔案時發生錯誤:\n{str(e)}"
             )
     
+    def _result_cache_key(self, command_type, args):
+        """建立結果快取鍵；不可快取的命令或檔案無法讀取時回傳 None"""
+        if command_type != 'help' and command_type not in _CACHEABLE_FILE_COMMANDS:
+            return None
+        
+        # 參數中的列表轉為 tuple 才能作為字典鍵
+        key_args = tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+        if command_type == 'help':
+            return command_type, key_args, None
+        
+        # 檔案修改後舊結果自然不再命中
+        try:
+            stat = os.stat(args[0])
+        except (OSError, IndexError, TypeError):
+            return None
+        return command_type, key_args, (stat.st_mtime_ns, stat.st_size)
+    
     def _execute_command(self, command_type, *args):
         """執行命令（在工作線程中）"""
-        if self.worker and self.worker.isRunning():
+        if self._task_signals is not None:
             self.view.set_status("另一個命令正在執行中...")
             self.view.display_system_response("另一個命令正在執行中，請稍候...", is_error=True)
             return
         
+        # 相同命令與未變更的檔案直接使用上次的結果，不再啟動子程序
+        cache_key = self._result_cache_key(command_type, args)
+        cached = self._result_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            self._pending_cache_key = None
+            self._on_command_finished(*cached)
+            return
+        self._pending_cache_key = cache_key
+        
         # 禁用按鈕並顯示進度
         self.view.set_buttons_enabled(False)
         self.view.show_progress(True)
         self.view.set_status("執行命令中...")
         self.view.display_system_response("執行命令中...", is_error=False)
         
-        # 創建並啟動工作線程
-        self.worker = CsvkitWorker(self.model, command_type, *args)
-        self.worker.finished.connect(self._on_command_finished)
-        self.worker.status_update.connect(self.view.set_status)
-        self.worker.start()
+        # 交給執行緒池執行
+        task = CsvkitTask(self.model, command_type, *args)
+        task.signals.finished.connect(self._on_command_finished)
+        task.signals.status_update.connect(self.view.set_status)
+        self._task_signals = task.signals
+        self._pool.start(task)
     
     def _on_command_finished(self, stdout, stderr, returncode):
         """命令執行完成的回調"""
+        self._task_signals = None
+        cache_key, self._pending_cache_key = self._pending_cache_key, None
+        if cache_key is not None and returncode == 0:
+            self._result_cache[cache_key] = (stdout, stderr, returncode)
+            self._result_cache.move_to_end(cache_key)
+            while len(self._result_cache) > _RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        
         # 重新啟用按鈕
         self.view.set_buttons_enabled(True)
         self.view.show_progress(False)
@@ -254,17 +310,13 @@ class CsvkitController(QObject):
             if stdout:
                 # 檢查是否需要 HTML 轉換
                 # 只有包含 ANSI 顏色代碼或特殊格式的輸出才轉換為 HTML
-                needs_html_conversion = (
-                    '\x1b[' in stdout or  # ANSI escape sequences
-                    '│' in stdout or      # Table borders from csvlook
-                    '─' in stdout or      # Table borders
-                    '┌' in stdout or      # Table borders
-                    '└' in stdout         # Table borders
-                )
+                needs_html_conversion = _HTML_SNIFF_RE.search(stdout) is not None
                 
                 if needs_html_conversion:
                     try:
-                        html_output = ansi2html.Ansi2HTMLConverter().convert(stdout)
+                        if self._ansi_converter is None:
+                            self._ansi_converter = ansi2html.Ansi2HTMLConverter()
+                        html_output = self._ansi_converter.convert(stdout)
                         self.view.display_result(html_output)
                     except:
                         # 如果轉換失敗，使用純文本
@@ -313,8 +365,10 @@ class CsvkitController(QObject):
     
     def cleanup(self):
         """清理資源"""
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()
-            self.worker.wait()
+        # 執行緒池中的任務無法強制終止，等待目前命令結束（最多 3 秒）
+        self._pool.clear()
+        self._pool.waitForDone(3000)
+        self._task_signals = None
+        self._result_cache.clear()
         
         logger.info("csvkit controller cleanup completed")
\ No newline at end of file
@@ -39,6 +39,12 @@ class CsvkitModel:
         'csvstat': '計算 CSV 資料的描述性統計'
     }
     
+    # 讀取命令輸出時依序嘗試的編碼
+    SUPPORTED_READ_ENCODINGS = ('utf-8', 'cp950', 'big5', 'gbk', 'latin-1')
+    
+    # 保存結果檔案時依序嘗試的編碼
+    SUPPORTED_SAVE_ENCODINGS = ('utf-8-sig', 'utf-8', 'cp950', 'big5')
+    
     def __init__(self):
         self.csvkit_available = self._check_csvkit_availability()
         self.available_tools = self._get_available_tools()
@@ -275,7 +281,7 @@ class CsvkitModel:
             logger.info(f"Executing command: {' '.join(command)}")
             
             # 嘗試多種編碼處理方式
-            encodings_to_try = ['utf-8', 'cp950', 'big5', 'gbk', 'latin-1']
+            encodings_to_try = self.SUPPORTED_READ_ENCODINGS
             
             for encoding in encodings_to_try:
                 try:
@@ -384,7 +390,7 @@ class CsvkitModel:
                 file_path = suggested_filename
             
             # 嘗試不同編碼保存檔案
-            encodings_to_try = ['utf-8-sig', 'utf-8', 'cp950', 'big5']
+            encodings_to_try = self.SUPPORTED_SAVE_ENCODINGS
             
             for encoding in encodings_to_try:
                 try:
@@ -15,6 +15,12 @@ logger = logging.getLogger(__name__)
 class CsvkitPlugin(PluginInterface):
     """csvkit 插件類"""
     
+    def __init__(self):
+        super().__init__()
+        self._model = None
+        self._view = None
+        self._controller = None
+    
     @property
     def name(self) -> str:
         return "csvkit"
@@ -38,7 +44,7 @@ class CsvkitPlugin(PluginInterface):
             logger.info("Initializing csvkit plugin...")
             
             # 檢查 csvkit 是否可用
-            model = CsvkitModel()
+            model = self.create_model()
             if not model.csvkit_available:
                 logger.warning("csvkit not available")
                 return False
@@ -50,22 +56,37 @@ class CsvkitPlugin(PluginInterface):
             logger.error(f"Failed to initialize csvkit plugin: {e}")
             return False
     
-    def create_model(self):
-        """創建模型"""
-        return CsvkitModel()
+    def create_model(self, fresh: bool = False):
+        """創建模型（預設重用已建立的實例）"""
+        if fresh:
+            return CsvkitModel()
+        if self._model is None:
+            self._model = CsvkitModel()
+        return self._model
     
-    def create_view(self):
-        """創建視圖"""
-        return CsvkitView()
+    def create_view(self, fresh: bool = False):
+        """創建視圖（預設重用已建立的實例）"""
+        if fresh:
+            return CsvkitView()
+        if self._view is None:
+            self._view = CsvkitView()
+        return self._view
     
-    def create_controller(self, model, view):
+    def create_controller(self, model, view, fresh: bool = False):
         """創建控制器"""
-        # 直接使用傳入的 model 和 view 創建控制器
-        return CsvkitController(model, view)
+        # 直接使用傳入的 model 和 view 創建控制器，僅在是插件自身的實例時重用
+        if fresh or model is not self._model or view is not self._view:
+            return CsvkitController(model, view)
+        if self._controller is None:
+            self._controller = CsvkitController(model, view)
+        return self._controller
     
     def cleanup(self):
         """清理插件資源"""
         logger.info("Cleaning up csvkit plugin...")
+        self._controller = None
+        self._view = None
+        self._model = None
 
 
 def create_plugin():
@@ -66,17 +66,29 @@ class DustPlugin(PluginInterface):
             logger.error(f"Failed to initialize DustPlugin: {e}")
             return False
     
-    def create_view(self):
-        """創建插件的 GUI 視圖"""
-        return DustViewRedesigned()
+    def create_view(self, fresh: bool = False):
+        """創建插件的 GUI 視圖（預設重用已建立的實例，fresh=True 時另建新實例）"""
+        if fresh:
+            return DustViewRedesigned()
+        if self._view is None:
+            self._view = DustViewRedesigned()
+        return self._view
     
-    def create_model(self):
-        """創建插件的數據模型"""
-        return DustModel()
+    def create_model(self, fresh: bool = False):
+        """創建插件的數據模型（預設重用已建立的實例，fresh=True 時另建新實例）"""
+        if fresh:
+            return DustModel()
+        if self._model is None:
+            self._model = DustModel()
+        return self._model
     
-    def create_controller(self, model, view):
-        """創建插件的控制器"""
-        return DustController(view, model)
+    def create_controller(self, model, view, fresh: bool = False):
+        """創建插件的控制器（僅在傳入的是插件自身的 model/view 時重用）"""
+        if fresh or model is not self._model or view is not self._view:
+            return DustController(view, model)
+        if self._controller is None:
+            self._controller = DustController(view, model)
+        return self._controller
     
     def cleanup(self):
         """清理插件資源"""
@@ -7,8 +7,8 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QFrame, QComboBox, QCheckBox, QPushButton
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPoint, QRect
+from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QPixmap, QPolygon
 import logging
 from collections import deque
 from typing import Dict, List, Any, Optional
@@ -92,14 +92,15 @@ class RealTimeChart(QWidget):
         
         # 簡化的重繪控制
         self.needs_redraw = False
+        self.redraw_interval = 250
         
         self.setup_ui()
         self.setup_chart_area()
         
-        # 優化的更新定時器 - 使用較快的檢查頻率但智能重繪
-        self.update_timer = QTimer()
+        # 延遲重繪定時器 - 只在數據更新後單次觸發，閒置時不做任何重繪
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.smart_update_chart)
-        self.update_timer.start(250)  # 每250ms檢查一次是否需要重繪
         
         logger.info(f"RealTimeChart initialized: {title}")
         
@@ -179,6 +180,7 @@ class RealTimeChart(QWidget):
     def setup_chart_area(self):
         """設置圖表繪製區域"""
         self.chart_rect = None
+        self._static_layer = None  # (快取條件, QPixmap)：背景、邊框與網格線
         self.margin_left = 60   # 左邊距 (Y軸標籤)
         self.margin_right = 20  # 右邊距 (圖例空間)
         self.margin_top = 20    # 上邊距
@@ -219,8 +221,10 @@ class RealTimeChart(QWidget):
         points_count = len(self.series_data[name].values)
         print(f"         [DEBUG] 系列 '{name}' 現在有 {points_count} 個數據點")
         
-        # 簡化重繪控制：只標記需要重繪
+        # 簡化重繪控制：標記需要重繪，並在 redraw_interval 後合併為一次重繪
         self.needs_redraw = True
+        if not self.update_timer.isActive():
+            self.update_timer.start(self.redraw_interval)
         print(f"         [DEBUG] 數據已更新，標記需要重繪")
         
     def remove_series(self, name: str) -> bool:
@@ -313,12 +317,8 @@ class RealTimeChart(QWidget):
         
         print(f"            📐 [DEBUG] 圖表區域: {self.chart_rect.width()}x{self.chart_rect.height()}")
         
-        # 繪製背景
-        self.draw_background(painter)
-        
-        # 繪製網格
-        if self.grid_enabled:
-            self.draw_grid(painter)
+        # 繪製背景與網格（尺寸與網格設定不變時直接使用快取）
+        painter.drawPixmap(0, 0, self._get_static_layer())
             
         # 繪製軸線
         self.draw_axes(painter)
@@ -332,6 +332,24 @@ class RealTimeChart(QWidget):
             
         print(f"         [DEBUG] {self.title} 繪製完成")
             
+    def _get_static_layer(self) -> QPixmap:
+        """取得背景與網格的快取圖層，圖表尺寸或網格設定改變時重建"""
+        key = (self.size(), QRect(self.chart_rect), self.grid_enabled, self.devicePixelRatioF())
+        if self._static_layer is None or self._static_layer[0] != key:
+            ratio = key[3]
+            pixmap = QPixmap(self.size() * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+            
+            layer_painter = QPainter(pixmap)
+            self.draw_background(layer_painter)
+            if self.grid_enabled:
+                self.draw_grid(layer_painter)
+            layer_painter.end()
+            
+            self._static_layer = (key, pixmap)
+        return self._static_layer[1]
+        
     def draw_background(self, painter: QPainter):
         """繪製背景"""
         painter.fillRect(self.chart_rect, QColor(250, 250, 250))
@@ -408,48 +426,36 @@ class RealTimeChart(QWidget):
             
             print(f"               [DEBUG] 系列 '{series_name}' 使用顏色: {series.color.name()}")
             
-            # 轉換為圖表座標
-            points = []
-            valid_points = 0
-            for ts, val in zip(timestamps, values):
-                if ts < start_time:
-                    continue
-                    
-                # X座標（時間）
-                time_ratio = (ts - start_time) / self.chart_range
-                x = int(self.chart_rect.left() + (self.chart_rect.width() * time_ratio))
-                
-                # Y座標（數值）
-                if self.y_max > self.y_min:
-                    value_ratio = (val - self.y_min) / (self.y_max - self.y_min)
-                    y = int(self.chart_rect.bottom() - (self.chart_rect.height() * value_ratio))
-                else:
-                    y = int(self.chart_rect.bottom())
-                    
-                points.append((x, y))
-                valid_points += 1
+            # 轉換為圖表座標，座標直接寫入 QPolygon，繪製時各只需一次 Qt 呼叫
+            left = self.chart_rect.left()
+            bottom = self.chart_rect.bottom()
+            x_scale = self.chart_rect.width() / self.chart_range
+            if self.y_max > self.y_min:
+                y_scale = self.chart_rect.height() / (self.y_max - self.y_min)
+            else:
+                y_scale = 0.0
+            polygon = QPolygon([
+                QPoint(int(left + (ts - start_time) * x_scale),
+                       int(bottom - (val - self.y_min) * y_scale))
+                for ts, val in zip(timestamps, values)
+                if ts >= start_time
+            ])
                 
-            print(f"               [DEBUG] 系列 '{series_name}' 轉換了 {valid_points} 個有效點，Y範圍: {self.y_min:.1f} - {self.y_max:.1f}")
+            print(f"               [DEBUG] 系列 '{series_name}' 轉換了 {polygon.size()} 個有效點，Y範圍: {self.y_min:.1f} - {self.y_max:.1f}")
                 
-            # 繪製線段（需要至少2個點）
-            if len(points) >= 2:
-                lines_drawn = 0
-                for i in range(len(points) - 1):
-                    x1, y1 = points[i]
-                    x2, y2 = points[i + 1]
-                    painter.drawLine(x1, y1, x2, y2)
-                    lines_drawn += 1
-                print(f"               [DEBUG] 系列 '{series_name}' 繪製了 {lines_drawn} 條線段")
+            # 繪製折線（需要至少2個點）
+            if polygon.size() >= 2:
+                painter.drawPolyline(polygon)
+                print(f"               [DEBUG] 系列 '{series_name}' 繪製了 {polygon.size() - 1} 條線段")
             else:
-                print(f"               [DEBUG] 系列 '{series_name}' 點數不足，無法繪製線段 (只有 {len(points)} 個點)")
+                print(f"               [DEBUG] 系列 '{series_name}' 點數不足，無法繪製線段 (只有 {polygon.size()} 個點)")
                 
-            # 繪製數據點（即使只有1個點也顯示）
-            painter.setBrush(QBrush(series.color))
-            dots_drawn = 0
-            for x, y in points:
-                painter.drawEllipse(x - 3, y - 3, 6, 6)  # 稍大一點的點
-                dots_drawn += 1
-            print(f"               [DEBUG] 系列 '{series_name}' 繪製了 {dots_drawn} 個數據點")
+            # 繪製數據點（即使只有1個點也顯示），圓頭粗筆一次畫出所有圓點
+            marker_pen = QPen(series.color, 6)
+            marker_pen.setCapStyle(Qt.RoundCap)
+            painter.setPen(marker_pen)
+            painter.drawPoints(polygon)
+            print(f"               [DEBUG] 系列 '{series_name}' 繪製了 {polygon.size()} 個數據點")
                 
     def draw_legend(self, painter: QPainter):
         """繪製圖例"""
@@ -34,8 +34,17 @@ class GlancesView(QWidget):
         self.auto_start_attempted = False
         logger.info("GlancesView initialized")
         
+        # 自動啟動用的單次計時器以視圖為父物件，關閉視圖時可一併停止
+        self._init_start_timer = QTimer(self)
+        self._init_start_timer.setSingleShot(True)
+        self._init_start_timer.timeout.connect(self._try_auto_start_monitoring)
+        self._show_start_timer = QTimer(self)
+        self._show_start_timer.setSingleShot(True)
+        self._show_start_timer.setInterval(1000)
+        self._show_start_timer.timeout.connect(self._auto_start_monitoring)
+        
         # 延遲自動啟動監控（在視圖完全初始化後）
-        QTimer.singleShot(2000, self._try_auto_start_monitoring)
+        self._init_start_timer.start(2000)
         
     def showEvent(self, event):
         """視圖顯示事件 - 自動啟動監控"""
@@ -47,7 +56,13 @@ class GlancesView(QWidget):
             self.auto_start_attempted = True
             logger.info("Scheduling auto-start monitoring in 1 second")
             # 延遲 1 秒啟動，確保視圖完全載入
-            QTimer.singleShot(1000, self._auto_start_monitoring)
+            self._show_start_timer.start()
+            
+    def closeEvent(self, event):
+        """視圖關閉事件 - 停止尚未觸發的自動啟動計時器"""
+        self._init_start_timer.stop()
+        self._show_start_timer.stop()
+        super().closeEvent(event)
             
     def _try_auto_start_monitoring(self):
         """嘗試自動啟動監控（從初始化後延遲調用）"""
@@ -752,7 +767,7 @@ class GlancesView(QWidget):
         if not self.is_monitoring_started and hasattr(self, 'parent') and hasattr(self.parent(), 'parent'):
             try:
                 # 嘗試通過信號啟動監控
-                QTimer.singleShot(1000, self._auto_start_monitoring)
+                self._show_start_timer.start()
             except Exception as e:
                 logger.error(f"Error in showEvent: {e}")
     
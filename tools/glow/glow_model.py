@@ -5,11 +5,15 @@ Glow Markdown 閱讀器的業務邏輯模型
 
 import subprocess
 import os
+import shutil
 import re
 import hashlib
 import tempfile
 import time
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Union
 from urllib.parse import urlparse, quote
 from ansi2html import Ansi2HTMLConverter
@@ -17,10 +21,30 @@ from config.config_manager import config_manager
 
 logger = logging.getLogger(__name__)
 
+# 模組載入時預先編譯的正規表達式，避免每一行輸出都重新查詢 re 的內部快取
+_GITHUB_SHORTCUT_RE = re.compile(r'^([a-zA-Z0-9._-]+)/([a-zA-Z0-9._-]+)(?:@([a-zA-Z0-9._/-]+))?(?::(.+))?$')
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC_RE = re.compile(r'\*(.*?)\*(?!\*)')
+_ITALIC_BASIC_RE = re.compile(r'\*(.*?)\*')
+_INLINE_CODE_RE = re.compile(r'`(.*?)`')
+_URL_RE = re.compile(r'(https?://[^\s]+)')
+
+# 模擬終端環境，讓 Glow 輸出 ANSI 格式
+_GLOW_TERMINAL_ENV = {
+    'TERM': 'xterm-256color',  # 模擬支持 256 色的終端
+    'FORCE_COLOR': '1',        # 強制彩色輸出
+    'COLORTERM': 'truecolor',  # 支持真彩色
+}
+
 
 class GlowModel:
     """Glow CLI 工具的業務邏輯模型"""
     
+    # 行程內的渲染結果快取，所有實例共用：快取鍵 -> (建立時間, HTML)
+    _memory_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    _memory_cache_lock = threading.Lock()
+    memory_cache_size = 64
+    
     def __init__(self):
         # 從配置管理器獲取 Glow 工具路徑
         glow_config = config_manager.get_tool_config('glow')
@@ -53,11 +77,15 @@ class GlowModel:
         # 確保快取目錄存在
         os.makedirs(self.cache_dir, exist_ok=True)
         
+        # Glow 執行檔指紋（路徑與修改時間），升級 Glow 後快取自動失效
+        self._glow_fingerprint: Optional[str] = None
+        
         # 強制清除舊版本快取（防止舊快取干擾新的 HTML 轉換邏輯）
         self._clear_legacy_cache()
         
-        # ANSI 到 HTML 轉換器
+        # ANSI 到 HTML 轉換器；convert() 會寫入實例狀態，批次渲染時需以鎖保護
         self.ansi_converter = Ansi2HTMLConverter(dark_bg=True)
+        self._ansi_converter_lock = threading.Lock()
         
         logger.info("GlowModel initialized with configuration")
     
@@ -164,8 +192,7 @@ class GlowModel:
         url = url.strip()
         
         # 檢查是否為 GitHub 快捷方式 (user/repo 格式)
-        github_pattern = r'^([a-zA-Z0-9._-]+)/([a-zA-Z0-9._-]+)(?:@([a-zA-Z0-9._/-]+))?(?::(.+))?$'
-        github_match = re.match(github_pattern, url)
+        github_match = _GITHUB_SHORTCUT_RE.match(url)
         
         if github_match:
             user, repo, branch_or_tag, file_path = github_match.groups()
@@ -208,6 +235,30 @@ class GlowModel:
         versioned_source = f"{content_source}:{self.html_conversion_version}"
         return hashlib.md5(versioned_source.encode('utf-8')).hexdigest()
     
+    def _get_glow_fingerprint(self) -> str:
+        """取得 Glow 執行檔指紋，只查詢一次檔案系統，不啟動子程序"""
+        if self._glow_fingerprint is None:
+            resolved = shutil.which(self.glow_executable) or self.glow_executable
+            try:
+                self._glow_fingerprint = f"{resolved}@{os.stat(resolved).st_mtime_ns}"
+            except OSError:
+                self._glow_fingerprint = resolved
+        return self._glow_fingerprint
+    
+    def get_render_cache_key(self, source: str, source_type: str, theme: str, width: int) -> str:
+        """
+        生成渲染結果的快取鍵值
+        
+        檔案來源會加入檔案修改時間，檔案內容變更後不會再讀到舊的渲染結果
+        """
+        parts = [source_type, source, theme, str(width), self._get_glow_fingerprint()]
+        if source_type == "file":
+            try:
+                parts.append(str(os.stat(source).st_mtime_ns))
+            except OSError:
+                pass
+        return self.get_cache_key(":".join(parts))
+    
     def get_cached_content(self, cache_key: str) -> Optional[str]:
         """
         獲取快取內容
@@ -246,12 +297,40 @@ class GlowModel:
         """
         try:
             cache_file = os.path.join(self.cache_dir, f"{cache_key}.cache")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # 先寫入暫存檔再替換，避免其他程序讀到寫到一半的快取
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, cache_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
             logger.info(f"Content cached with key: {cache_key}")
         except Exception as e:
             logger.warning(f"Error saving cache {cache_key}: {e}")
     
+    def _get_memory_cached(self, cache_key: str) -> Optional[str]:
+        """從記憶體快取讀取渲染結果，過期項目會被移除"""
+        with self._memory_cache_lock:
+            entry = self._memory_cache.get(cache_key)
+            if entry is None:
+                return None
+            created, content = entry
+            if time.time() - created >= self.cache_ttl:
+                del self._memory_cache[cache_key]
+                return None
+            self._memory_cache.move_to_end(cache_key)
+            return content
+    
+    def _set_memory_cached(self, cache_key: str, content: str):
+        """寫入記憶體快取，超過上限時淘汰最久未使用的項目"""
+        with self._memory_cache_lock:
+            self._memory_cache[cache_key] = (time.time(), content)
+            self._memory_cache.move_to_end(cache_key)
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+    
     def render_markdown(
         self, 
         source: str, 
@@ -280,11 +359,16 @@ class GlowModel:
             logger.warning(f"Unknown theme '{theme}', using 'auto'")
             theme = "auto"
         
-        # 檢查快取
+        # 檢查快取：先查記憶體，再查磁碟
+        if use_cache:
+            cache_key = self.get_render_cache_key(source, source_type, theme, width)
+            cached_content = self._get_memory_cached(cache_key)
+            if cached_content:
+                return True, cached_content, ""
         if use_cache and source_type in ["file", "url"]:
-            cache_key = self.get_cache_key(f"{source_type}:{source}:{theme}:{width}")
             cached_content = self.get_cached_content(cache_key)
             if cached_content:
+                self._set_memory_cached(cache_key, cached_content)
                 return True, cached_content, ""
         
         try:
@@ -299,10 +383,7 @@ class GlowModel:
             command.extend(['--width', str(width)])
             
             # 設置環境變量模擬終端環境，讓 Glow 輸出 ANSI 格式
-            env = os.environ.copy()
-            env['TERM'] = 'xterm-256color'  # 模擬支持 256 色的終端
-            env['FORCE_COLOR'] = '1'        # 強制彩色輸出
-            env['COLORTERM'] = 'truecolor'  # 支持真彩色
+            env = {**os.environ, **_GLOW_TERMINAL_ENV}
             
             # 根據來源類型處理輸入
             if source_type == "file":
@@ -363,7 +444,8 @@ class GlowModel:
                     logger.info(f"[DEBUG] ANSI sequences detected: {has_ansi}")
                     
                     if has_ansi:  # 檢查是否包含 ANSI 轉義序列
-                        html_content = self.ansi_converter.convert(stdout, full=False)
+                        with self._ansi_converter_lock:
+                            html_content = self.ansi_converter.convert(stdout, full=False)
                         logger.info(f"[DEBUG] Used ANSI converter. HTML length: {len(html_content)}")
                     else:
                         # 純文本，需要手動轉換為 HTML
@@ -387,6 +469,8 @@ class GlowModel:
                 logger.info(f"[DEBUG] Final HTML contains <h2> tag: {'<h2' in styled_html}")
                 
                 # 保存到快取
+                if use_cache:
+                    self._set_memory_cached(cache_key, styled_html)
                 if use_cache and source_type in ["file", "url"]:
                     self.save_to_cache(cache_key, styled_html)
                 
@@ -407,6 +491,37 @@ class GlowModel:
             logger.error(error_msg)
             return False, "", error_msg
     
+    def render_markdown_many(
+        self,
+        paths: List[str],
+        theme: str = "auto",
+        width: int = 120,
+        use_cache: bool = True
+    ) -> List[Tuple[bool, str, str]]:
+        """
+        並行渲染多個 Markdown 檔案
+        
+        每個工作執行緒大部分時間都在等待 Glow 子程序，因此以執行緒並行即可
+        
+        Args:
+            paths: Markdown 檔案路徑列表
+            theme: Glow 主題樣式
+            width: 顯示寬度
+            use_cache: 是否使用快取
+        
+        Returns:
+            list: 與 paths 順序相同的 (是否成功, HTML內容, 錯誤訊息) 列表
+        """
+        if not paths:
+            return []
+        
+        max_workers = min(8, os.cpu_count() or 4, len(paths))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda path: self.render_markdown(path, "file", theme, width, use_cache),
+                paths
+            ))
+    
     def _convert_plain_text_to_html(self, text: str) -> str:
         """
         將 Glow 的純文本輸出轉換為 HTML
@@ -486,11 +601,11 @@ class GlowModel:
                 processed_line = html.escape(line)
                 
                 # 粗體格式
-                processed_line = re.sub(r'\*\*(.*?)\*\*', r'<strong style="color: #1976D2;">\1</strong>', processed_line)
+                processed_line = _BOLD_RE.sub(r'<strong style="color: #1976D2;">\1</strong>', processed_line)
                 # 斜體格式
-                processed_line = re.sub(r'\*(.*?)\*(?!\*)', r'<em style="color: #7B1FA2;">\1</em>', processed_line)
+                processed_line = _ITALIC_RE.sub(r'<em style="color: #7B1FA2;">\1</em>', processed_line)
                 # URL 連結
-                processed_line = re.sub(r'(https?://[^\s]+)', r'<a href="\1" style="color: #1976D2; text-decoration: underline;">\1</a>', processed_line)
+                processed_line = _URL_RE.sub(r'<a href="\1" style="color: #1976D2; text-decoration: underline;">\1</a>', processed_line)
                 
                 # 保持原有縮進
                 if line.startswith(' '):
@@ -552,9 +667,9 @@ class GlowModel:
             else:
                 # 處理內聯格式
                 processed_line = html.escape(line)
-                processed_line = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', processed_line)
-                processed_line = re.sub(r'\*(.*?)\*', r'<em>\1</em>', processed_line)
-                processed_line = re.sub(r'`(.*?)`', r'<code>\1</code>', processed_line)
+                processed_line = _BOLD_RE.sub(r'<strong>\1</strong>', processed_line)
+                processed_line = _ITALIC_BASIC_RE.sub(r'<em>\1</em>', processed_line)
+                processed_line = _INLINE_CODE_RE.sub(r'<code>\1</code>', processed_line)
                 formatted_lines.append(f'<p>{processed_line}</p>')
         
         return ''.join(formatted_lines)
@@ -679,11 +794,14 @@ class GlowModel:
     
     def clear_cache(self) -> Tuple[bool, str]:
         """
-        清除所有快取檔案
+        清除所有快取檔案與記憶體中的渲染結果
         
         Returns:
             tuple: (是否成功, 訊息)
         """
+        with self._memory_cache_lock:
+            self._memory_cache.clear()
+        
         try:
             if not os.path.exists(self.cache_dir):
                 return True, "快取目錄不存在，無需清理"
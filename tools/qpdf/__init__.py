@@ -3,6 +3,14 @@ QPDF 插件包
 提供 PDF 處理、檢查、修復、加密解密等功能
 """
 
-from .plugin import create_plugin
+__all__ = ['create_plugin']
 
-__all__ = ['create_plugin']
\ No newline at end of file
+
+def __getattr__(name):
+    """首次存取時才導入插件模組，避免導入套件即載入 Qt 與子程序封裝"""
+    if name in {'create_plugin'}:
+        from . import plugin
+        value = getattr(plugin, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,10 +3,18 @@ YT-DLP 插件包
 支援多平台影音下載工具整合
 """
 
-from .plugin import create_plugin
-
 __version__ = "1.0.0"
 __author__ = "CLI Tool Integration Team"
 __description__ = "YT-DLP 影音下載工具插件"
 
-__all__ = ['create_plugin']
\ No newline at end of file
+__all__ = ['create_plugin']
+
+
+def __getattr__(name):
+    """首次存取時才導入插件模組，避免導入套件即載入 Qt 與子程序封裝"""
+    if name in {'create_plugin'}:
+        from . import plugin
+        value = getattr(plugin, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
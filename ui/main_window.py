@@ -26,6 +26,39 @@ from ui.theme_manager import theme_manager
 
 logger = logging.getLogger(__name__)
 
+# 導航吐司通知使用的頁面名稱與圖示
+NAVIGATION_PAGE_NAMES = {
+    "welcome": "歡迎頁面",
+    "fd": "檔案搜尋",
+    "ripgrep": "文本搜尋",
+    "poppler": "PDF 處理",
+    "glow": "Markdown 閱讀器",
+    "pandoc": "文檔轉換",
+    "bat": "語法高亮查看器",
+    "dust": "磁碟空間分析器",
+    "csvkit": "CSV 數據處理",
+    "glances": "系統監控",
+    "yt_dlp": "影音下載",
+    "themes": "主題設定",
+    "components": "UI 組件"
+}
+
+NAVIGATION_ICONS = {
+    "welcome": "🏠",
+    "fd": "🔍",
+    "ripgrep": "🔎",
+    "poppler": "📄",
+    "glow": "📖",
+    "pandoc": "🔄",
+    "bat": "🌈",
+    "dust": "💾",
+    "csvkit": "📊",
+    "glances": "📈",
+    "yt_dlp": "🎬",
+    "themes": "🎨",
+    "components": "🧩"
+}
+
 
 class WelcomePage(QWidget):
     """歡迎頁面組件"""
@@ -245,9 +278,12 @@ class NavigationSidebar(QFrame):
         button.setChecked(selected)
         button.clicked.connect(lambda: self.on_navigation_clicked(key))
         
-        # 添加入場動畫
-        QTimer.singleShot(len(self.navigation_buttons) * 50, 
-                         lambda: animate_widget(button, 'slide_in', direction='left', duration=300))
+        # 添加入場動畫（計時器掛在按鈕下，按鈕先被銷毀時不會再觸發）
+        entrance_timer = QTimer(button)
+        entrance_timer.setSingleShot(True)
+        entrance_timer.timeout.connect(
+            lambda: animate_widget(button, 'slide_in', direction='left', duration=300))
+        entrance_timer.start(len(self.navigation_buttons) * 50)
         
         self.navigation_buttons[key] = button
         layout.addWidget(button)
@@ -765,39 +801,8 @@ class ModernMainWindow(QMainWindow):
     def show_navigation_toast(self, key: str):
         """顯示導航切換吐司通知"""
         try:
-            page_names = {
-                "welcome": "歡迎頁面",
-                "fd": "檔案搜尋",
-                "ripgrep": "文本搜尋",
-                "poppler": "PDF 處理",
-                "glow": "Markdown 閱讀器",
-                "pandoc": "文檔轉換",
-                "bat": "語法高亮查看器",
-                "dust": "磁碟空間分析器",
-                "csvkit": "CSV 數據處理",
-                "glances": "系統監控",
-                "yt_dlp": "影音下載",
-                "themes": "主題設定",
-                "components": "UI 組件"
-            }
-            
-            page_name = page_names.get(key, key.title())
-            icon_map = {
-                "welcome": "🏠",
-                "fd": "🔍", 
-                "ripgrep": "🔎",
-                "poppler": "📄",
-                "glow": "📖",
-                "pandoc": "🔄",
-                "bat": "🌈",
-                "dust": "💾",
-                "csvkit": "📊",
-                "glances": "📈",
-                "yt_dlp": "🎬",
-                "themes": "🎨",
-                "components": "🧩"
-            }
-            icon = icon_map.get(key, "🔧")
+            page_name = NAVIGATION_PAGE_NAMES.get(key, key.title())
+            icon = NAVIGATION_ICONS.get(key, "🔧")
             
             if self.toast_manager:
                 self.toast_manager.show_progress_toast(
@@ -936,6 +941,12 @@ class ModernMainWindow(QMainWindow):
             
             # 清理插件資源
             plugin_manager.cleanup()
+            
+            # 將插件視圖從堆疊中移除，讓 Python 端的引用可以被釋放
+            for view in self.plugin_views.values():
+                self.content_stack.removeWidget(view)
+                view.setParent(None)
+            self.plugin_views.clear()
             logger.info("Application closed successfully")
             
         except Exception as e: